@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import csv
+import os
+import random
+import statistics
+import sys
+import time
+
+# Battery Estimator Benchmark
+# Replays a discharge trace through battery_estimator.Estimator, the way
+# battery-dynamic.py feeds it on every battery read, and reports:
+# - the cost of one update (must be negligible next to the sysfs read)
+# - how far the time-to-empty estimate is from what really happened, when
+#   the trace runs down to (almost) empty
+# - a load step (STEP_BEFORE W, then a steady STEP_AFTER W): the window must
+#   restart once and settle on the new rate; the run fails otherwise
+#
+# Trace: CSV with a header 't,energy_now,power_now,status' (seconds, µWh,
+# µW, sysfs status; power_now may be empty). Without a file a synthetic
+# trace is used: a 50 Wh battery, phases of light and heavy load, noise and
+# single-sample spikes, read every 2 s until empty.
+#
+# Usage: ./battery_estimator_bench.py [trace.csv]
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "polybar", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import battery_estimator
+
+ENERGY_FULL = 50_000_000 # µWh
+INTERVAL = 2
+PHASES = [(1800, 6.0), (900, 18.0), (3600, 8.0), (600, 25.0), (7200, 7.0)] # (s, W)
+STEP_BEFORE, STEP_AFTER = 10.0, 30.0 # W
+STEP_AT, STEP_SAMPLES = 20, 120
+
+def synthetic_trace(seed=1):
+    rnd = random.Random(seed)
+    energy = ENERGY_FULL * 0.95
+    t = 0
+    phase = 0
+    phase_end = PHASES[0][0]
+    while energy > 0:
+        if t >= phase_end:
+            phase = (phase + 1) % len(PHASES)
+            phase_end = t + PHASES[phase][0]
+        watts = PHASES[phase][1] * rnd.uniform(0.9, 1.1)
+        reported = watts * (rnd.uniform(3, 6) if rnd.random() < 0.01 else 1) # Spikes
+        energy -= watts * 1e6 * INTERVAL / 3600
+        yield t, max(int(energy), 0), int(reported * 1e6), "Discharging"
+        t += INTERVAL
+
+def step_trace(seed=1):
+    rnd = random.Random(seed)
+    energy = ENERGY_FULL * 0.9
+    for i in range(STEP_SAMPLES):
+        watts = (STEP_BEFORE if i < STEP_AT else STEP_AFTER) * rnd.uniform(0.9, 1.1)
+        energy -= watts * 1e6 * INTERVAL / 3600
+        yield i * INTERVAL, int(energy), int(watts * 1e6), "Discharging"
+
+def check_step():
+    # Regime restarts after the step, and the rate it ends on
+    est = battery_estimator.Estimator()
+    restarts = 0
+    for i, (t, energy, power, _) in enumerate(step_trace()):
+        count = est.count
+        est.update(t, False, energy, ENERGY_FULL, power)
+        if i >= STEP_AT and est.count < count:
+            restarts += 1
+    ok = restarts == 1 and abs(est.watts() - STEP_AFTER) < STEP_AFTER * 0.05
+    print(f"{'step restarts / rate':<26} {restarts:>9} / {est.watts():.2f} W "
+          f"({STEP_BEFORE:g} -> {STEP_AFTER:g} W){'' if ok else '  FAIL'}")
+    return ok
+
+def load_trace(path):
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            power = row.get("power_now") or ""
+            yield (float(row["t"]), int(row["energy_now"]),
+                   int(power) if power.strip() else None, row.get("status", "Discharging"))
+
+def main():
+    trace = list(load_trace(sys.argv[1]) if len(sys.argv) > 1 else synthetic_trace())
+    if not trace:
+        print("empty trace")
+        return 1
+    energy_full = max(e for _, e, _, _ in trace) if len(sys.argv) > 1 else ENERGY_FULL
+
+    est = battery_estimator.Estimator()
+    estimates = []
+    start = time.perf_counter()
+    for t, energy, power, status in trace:
+        charging = {"Charging": True, "Discharging": False}.get(status)
+        est.update(t, charging, energy, energy_full, power)
+        estimates.append(est.remaining())
+    elapsed = time.perf_counter() - start
+
+    print(f"{'samples':<26} {len(trace):>9}")
+    print(f"{'update cost':<26} {elapsed / len(trace) * 1e6:9.2f} us")
+    if not check_step():
+        return 1
+
+    t_end, e_end, _, _ = trace[-1]
+    if e_end > energy_full * 0.01:
+        print("trace doesn't run down to empty: no accuracy figures")
+        return 0
+
+    # Relative error against the real time left, skipping the first minutes
+    errors = []
+    for (t, _, _, _), estimate in zip(trace, estimates):
+        actual = t_end - t
+        if estimate is None or t < 300 or actual < 600:
+            continue
+        errors.append(abs(estimate - actual) / actual * 100)
+    print(f"{'error (median / p90)':<26} {statistics.median(errors):8.1f}% / "
+          f"{statistics.quantiles(errors, n=10)[-1]:.1f}%")
+    print(f"{'final rate':<26} {est.watts():9.2f} W")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
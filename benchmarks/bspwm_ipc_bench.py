@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# BSPWM IPC Benchmark
+# Against a local stand-in for the bspwm socket (no running window manager
+# needed), compares:
+# - in-process queries (bspwm_ipc.Client, what the resident scripts use)
+# - one bspwm_ipc.py CLI process per query
+# - one bspc process per query (if bspc is installed)
+# The CLI pays for a Python start-up, so one-shot single queries (keybind
+# scripts) stay on bspc; the CLI only pays off where it batches (--each).
+#
+# Usage: ./bspwm_ipc_bench.py [calls]
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "polybar", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import bspwm_ipc
+
+# Canned answers (roughly the size of a real session)
+NODES = "".join(f"0x{0x01C00003 + i:08X}\n" for i in range(12))
+REPLIES = {
+    ("query", "-N", "-n"): "0x01C00003\n",
+    ("query", "-N", "-d"): NODES,
+    ("query", "-D", "--names"): "I\nII\nIII\nIV\nV\nVI\nVII\nVIII\nIX\nX\n",
+}
+
+def serve(server):
+    # One message per connection, like bspwm
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            msg = conn.recv(4096)
+            args = tuple(a.decode() for a in msg.split(b"\0") if a)
+            rsp = REPLIES.get(args, "")
+            conn.sendall(rsp.encode())
+
+def time_calls(label, calls, fn):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / calls * 1e6
+    print(f"{label:<38} {calls:>6} calls  {elapsed * 1000:9.1f} ms  {per_call:9.1f} us/call")
+    return per_call
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    tmp = tempfile.mkdtemp(prefix="bspwm-bench-")
+    path = os.path.join(tmp, "bspwm-socket")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(64)
+    threading.Thread(target=serve, args=(server,), daemon=True).start()
+
+    env = dict(os.environ, BSPWM_SOCKET=path)
+    client = bspwm_ipc.Client(path)
+
+    bspc = shutil.which("bspc")
+    cli = [sys.executable, os.path.join(SCRIPTS_DIR, "bspwm_ipc.py")]
+    fork_calls = max(1, calls // 10)
+    run = lambda cmd: subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, check=True)
+
+    try:
+        native = time_calls("socket: query -N -n", calls, lambda: client.send("query", "-N", "-n"))
+        forked_cli = time_calls("fork: bspwm_ipc.py query -N -n", fork_calls,
+                                lambda: run(cli + ["query", "-N", "-n"]))
+        if bspc:
+            forked_bspc = time_calls("fork: bspc query -N -n", fork_calls,
+                                     lambda: run([bspc, "query", "-N", "-n"]))
+            print(f"one-shot query, CLI vs bspc: {forked_cli / forked_bspc:.1f}x slower")
+        else:
+            print("bspc not installed: no CLI vs bspc figure")
+        print(f"in-process vs CLI: {forked_cli / native:.1f}x faster")
+
+        # Preselection cancel: one query + one command per node
+        n = len(NODES.splitlines())
+        time_calls(f"socket: --each ({n} nodes)", max(1, calls // 10),
+                   lambda: [client.send("node", item, "-p", "cancel") for item in client.lines("query", "-N", "-d")])
+        time_calls(f"fork: bspwm_ipc.py --each ({n} nodes)", max(1, calls // 100),
+                   lambda: run(cli + ["--each", "query", "-N", "-d", "--", "node", "{}", "-p", "cancel"]))
+        if bspc:
+            time_calls(f"fork: bspc | xargs bspc ({n} nodes)", max(1, calls // 100),
+                       lambda: subprocess.run(f"{bspc} query -N -d | xargs -I id -n 1 {bspc} node id -p cancel",
+                                              shell=True, env=env, stdout=subprocess.DEVNULL))
+    finally:
+        server.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+
+# Fake Environment for the Benchmarks
+# A throw-away directory with:
+# - bin/   stand-ins for bspc, pactl, nmcli, bluetoothctl, nvidia-smi, rofi,
+#          notify-send... (shell scripts with canned answers)
+# - sys/   fake sysfs (battery, AC adapter, thermal zones, hwmon chips, a
+#          zram device, optionally a DRM card)
+# - proc/  fake /proc (stat, meminfo, pressure)
+# - home/  fake $HOME whose ~/.config points at this repository
+# - a stand-in bspwm socket (report + 'wm -d' dump)
+# - a stand-in sound server (native protocol, one sink)
+# - a private session bus (dbus-daemon, if installed) with a stand-in
+#   notification server that records what it gets
+#
+# Usage:
+#   with FakeEnv() as fake:
+#       subprocess.run(cmd, env=fake.env)
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SCRIPTS_DIR = os.path.join(REPO_DIR, "config", "polybar", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import notify
+import pulse
+
+FAKE_BINS = {
+    "bspc": "exit 0",
+    "pactl": r'''
+case "$1" in
+    get-sink-mute) echo "Mute: no" ;;
+    get-sink-volume) echo "Volume: front-left: 42598 /  65% / -11.23 dB,   front-right: 42598 /  65% / -11.23 dB" ;;
+    get-default-sink) echo "alsa_output.fake.analog-stereo" ;;
+    list) echo "0	alsa_output.fake.analog-stereo	module-alsa-card.c	s16le 2ch 44100Hz	RUNNING" ;;
+    subscribe) printf "Event 'change' on sink-input #12\nEvent 'change' on sink #0\n"; exec sleep 3600 ;;
+esac
+exit 0''',
+    "nmcli": r'''
+case "$*" in
+    "radio wifi") echo "enabled" ;;
+    *"active,signal"*) echo "yes:72" ;;
+    *"active,ssid"*) echo "yes:Casa" ;;
+    *"NAME,TYPE"*) echo "Casa:802-11-wireless" ;;
+    *"dev wifi"*|*"device wifi"*) printf 'yes:Casa:72:WPA2\nno:Vecino:40:WPA2\nno:Libre:20:\n' ;;
+esac
+exit 0''',
+    "bluetoothctl": r'''
+case "$1" in
+    devices) echo "Device AA:BB:CC:DD:EE:FF Auriculares" ;;
+    info) printf 'Device %s\n\tPaired: yes\n\tTrusted: yes\n\tConnected: yes\n\tIcon: audio-headset\n' "$2" ;;
+    show) printf 'Controller 00:11:22:33:44:55\n\tPowered: yes\n' ;;
+esac
+exit 0''',
+    "nvidia-smi": r'''
+case "$*" in
+    *-lms*) while :; do echo "37, 1024, 8192, 45"; sleep 2; done ;;
+    *) echo "37, 1024, 8192, 45" ;;
+esac''',
+    "rofi": "cat >/dev/null; exit 1",
+    "yad": "exit 0",
+    "brightnessctl": 'echo "Current brightness: 96000 (50%)"',
+    "xprop": 'echo "_NET_WM_WINDOW_OPACITY(CARDINAL) = 4294967295"',
+    "playerctl": "exit 0",
+    "greenclip": 'printf "hola\\nimage/png 12345\\n"',
+    # Raw 8-bit frames (random levels) at ~30 fps into raw_target of -p <config>
+    "cava": r'''
+conf=$HOME/.config/cava/config
+[ "$1" = "-p" ] && conf=$2
+target=$(sed -n 's/^raw_target *= *//p' "$conf")
+bars=$(sed -n 's/^bars *= *//p' "$conf")
+[ -n "$target" ] || exec sleep 3600
+exec 3>"$target"
+while :; do head -c "${bars:-8}" /dev/urandom >&3 || exit 1; sleep 0.03; done''',
+}
+NOOP_BINS = ["notify-send", "dunstify", "maim", "xclip", "polybar-msg", "pkill"]
+
+SYSFS = {
+    "class/power_supply/BAT0/energy_now": "35120000",
+    "class/power_supply/BAT0/energy_full": "50240000",
+    "class/power_supply/BAT0/power_now": "8130000",
+    "class/power_supply/BAT0/capacity": "69",
+    "class/power_supply/BAT0/status": "Discharging",
+    "class/power_supply/AC0/online": "0",
+    "class/thermal/thermal_zone0/type": "x86_pkg_temp",
+    "class/thermal/thermal_zone0/temp": "54000",
+    "class/thermal/thermal_zone0/trip_point_0_type": "passive",
+    "class/thermal/thermal_zone0/trip_point_0_temp": "95000",
+    # Also an hwmon chip (acpitz): skipped by the sensor index
+    "class/thermal/thermal_zone1/type": "acpitz",
+    "class/thermal/thermal_zone1/temp": "45000",
+    "class/hwmon/hwmon0/name": "acpitz",
+    "class/hwmon/hwmon0/temp1_input": "45000",
+    "class/hwmon/hwmon0/temp1_crit": "105000",
+    "class/hwmon/hwmon1/name": "nvme",
+    "class/hwmon/hwmon1/temp1_label": "Composite",
+    "class/hwmon/hwmon1/temp1_input": "38850",
+    "class/hwmon/hwmon1/temp1_max": "81850",
+    "class/hwmon/hwmon1/temp1_crit": "84850",
+    "class/hwmon/hwmon2/name": "coretemp",
+    "class/hwmon/hwmon2/temp1_label": "Package id 0",
+    "class/hwmon/hwmon2/temp1_input": "54000",
+    "class/hwmon/hwmon2/temp1_max": "80000",
+    "class/hwmon/hwmon2/temp1_crit": "100000",
+    "class/hwmon/hwmon2/temp2_label": "Core 0",
+    "class/hwmon/hwmon2/temp2_input": "52000",
+    "class/hwmon/hwmon2/temp3_label": "Core 1",
+    "class/hwmon/hwmon2/temp3_input": "53000",
+    "class/hwmon/hwmon3/name": "thinkpad",
+    "class/hwmon/hwmon3/fan1_input": "2400",
+    # zram swap: orig_data_size compr_data_size mem_used_total ... (bytes)
+    "block/zram0/mm_stat": "1073741824 325058560 331350016 0 331350016 12 0 2048 0",
+}
+
+# Non-NVIDIA card (amdgpu-style DRM telemetry), only with FakeEnv(drm=True)
+DRM_SYSFS = {
+    "class/drm/card0/device/gpu_busy_percent": "23",
+    "class/drm/card0/device/mem_info_vram_used": "536870912",
+    "class/drm/card0/device/mem_info_vram_total": "4294967296",
+    "class/drm/card0/device/hwmon/hwmon3/temp1_input": "51000",
+}
+
+PROC = {
+    "stat": "cpu  10132153 290696 3084719 46828483 16683 0 25195 0 0 0\n"
+            "cpu0 1393280 32966 572056 13343292 6130 0 17875 0 0 0\n"
+            "cpu1 1335384 28612 525812 11133000 3718 0 3107 0 0 0\n"
+            "intr 199292 0 0\nctxt 5678\nbtime 1700000000\nprocesses 4242\n",
+    "meminfo": "MemTotal:       16303428 kB\nMemFree:         1233652 kB\n"
+               "MemAvailable:    9163292 kB\nBuffers:          412332 kB\n"
+               "Cached:          6902060 kB\nSwapTotal:       8388604 kB\n"
+               "SwapFree:        7340028 kB\nZswap:            317440 kB\n"
+               "Zswapped:         1048576 kB\n",
+    # A fake /proc can't deliver PSI triggers: the scripts read the averages
+    "pressure/memory": "some avg10=6.20 avg60=2.10 avg300=0.52 total=1234567\n"
+                       "full avg10=0.80 avg60=0.31 avg300=0.07 total=234567\n",
+    "pressure/io": "some avg10=1.00 avg60=0.50 avg300=0.10 total=345678\n"
+                   "full avg10=0.40 avg60=0.20 avg300=0.05 total=45678\n",
+}
+
+REPORT = "WMeDP-1:OI:oII:fIII:fIV:fV:fVI:fVII:fVIII:fIX:fX:LT:TT:G\n"
+
+def bspwm_dump():
+    def leaf(node_id):
+        return {"id": node_id, "sticky": False, "client": {"urgent": False, "state": "tiled"},
+                "firstChild": None, "secondChild": None}
+    names = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
+    desktops = []
+    for i, name in enumerate(names):
+        root = None
+        if i == 0:
+            root = {"id": 100, "client": None, "firstChild": leaf(101), "secondChild": leaf(102)}
+        elif i == 1:
+            root = leaf(201)
+        desktops.append({"id": i + 1, "name": name, "root": root})
+    return {"focusedMonitorId": 1,
+            "monitors": [{"id": 1, "name": "eDP-1", "focusedDesktopId": 1, "desktops": desktops}]}
+
+class FakeBspwm:
+    # One message per connection, subscriptions stay open
+    def __init__(self, path):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(32)
+        self.held = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            msg = conn.recv(4096)
+            args = [a.decode() for a in msg.split(b"\0") if a]
+            if args[:1] == ["subscribe"]:
+                conn.sendall(REPORT.encode())
+                self.held.append(conn)
+                continue
+            if args[:2] == ["wm", "-d"]:
+                rsp = json.dumps(bspwm_dump())
+            elif args[:1] == ["query"]:
+                rsp = "0x01C00003\n"
+            else:
+                rsp = ""
+            conn.sendall(rsp.encode())
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+        for conn in self.held:
+            conn.close()
+
+class FakePulse:
+    # Sound server stand-in speaking the native protocol (see pulse.py):
+    # one stereo sink, events to subscribers on every change
+    SINK_NAME = "alsa_output.fake.analog-stereo"
+
+    def __init__(self, path):
+        self.path = path
+        self.volume = [42598, 42598] # 65%
+        self.muted = False
+        self.calls = {} # command -> count
+        self.subscribers = []
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(8)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _read_exact(self, conn, n):
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise OSError("client went away")
+            data += chunk
+        return data
+
+    def _send(self, conn, command, tag, body=None):
+        with self.lock:
+            conn.sendall(pulse.packet(command, tag, body))
+
+    def _sink_info(self):
+        return (pulse.TagWriter().u32(0).string(self.SINK_NAME).string("Fake Analog Stereo")
+                .sample_spec(3, 2, 44100).channel_map([1, 2]).u32(7).cvolume(self.volume)
+                .boolean(self.muted).u32(0).string(self.SINK_NAME + ".monitor").usec(0)
+                .string("module-alsa-card.c").u32(0))
+
+    def changed(self, facility=pulse.FACILITY_SINK, index=0):
+        body = pulse.TagWriter().u32(facility | pulse.EVENT_CHANGE).u32(index)
+        for conn in list(self.subscribers):
+            try:
+                self._send(conn, pulse.SUBSCRIBE_EVENT, 0xFFFFFFFF, body)
+            except OSError:
+                self.subscribers.remove(conn)
+
+    def set_volume(self, percent, muted=None):
+        # From the test side, like another client changing the sink
+        self.volume = [percent * pulse.VOLUME_NORM // 100] * 2
+        if muted is not None:
+            self.muted = muted
+        self.changed()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                length = pulse.DESCRIPTOR.unpack(self._read_exact(conn, pulse.DESCRIPTOR.size))[0]
+                r = pulse.TagReader(self._read_exact(conn, length))
+                command, tag = r.u32(), r.u32()
+                self.calls[command] = self.calls.get(command, 0) + 1
+                body = None
+                if command == pulse.AUTH:
+                    body = pulse.TagWriter().u32(pulse.PROTOCOL_VERSION)
+                elif command == pulse.SET_CLIENT_NAME:
+                    body = pulse.TagWriter().u32(len(self.calls))
+                elif command == pulse.SUBSCRIBE:
+                    self.subscribers.append(conn)
+                elif command == pulse.GET_SERVER_INFO:
+                    body = (pulse.TagWriter().string("pulseaudio").string("16.1").string("user")
+                            .string("fake").sample_spec(3, 2, 44100).string(self.SINK_NAME)
+                            .string(self.SINK_NAME + ".monitor").u32(0))
+                elif command == pulse.GET_SINK_INFO:
+                    body = self._sink_info()
+                elif command == pulse.SET_SINK_VOLUME:
+                    r.u32()
+                    r.string()
+                    self.volume = list(r.cvolume())
+                elif command == pulse.SET_SINK_MUTE:
+                    r.u32()
+                    r.string()
+                    self.muted = r.boolean()
+                self._send(conn, pulse.REPLY, tag, body)
+                if command in (pulse.SET_SINK_VOLUME, pulse.SET_SINK_MUTE):
+                    self.changed()
+        except (OSError, pulse.PulseError):
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+
+class FakeNotifications:
+    # Private bus + org.freedesktop.Notifications stand-in (see notify.py)
+    def __init__(self):
+        self.proc = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address"],
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        self.address = self.proc.stdout.readline().strip()
+        self.received = [] # (id, app, summary, body, hints)
+        self.next_id = 1
+        self.conn = notify.Connection(self.address)
+        self.conn.call(notify.BUS_NAME, notify.BUS_PATH, notify.BUS_NAME, "RequestName", "su",
+                       (notify.NOTIFY_NAME, 4)) # DO_NOT_QUEUE
+        self.conn.sock.settimeout(None)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                msg = self.conn.read_message()
+            except OSError:
+                return
+            if msg.type != notify.METHOD_CALL:
+                continue
+            member = msg.fields.get(notify.MEMBER)
+            if member == "Notify":
+                app, replaces, _, summary, body, _, hints, _ = msg.args
+                nid = replaces or self.next_id
+                if not replaces:
+                    self.next_id += 1
+                self.received.append((nid, app, summary, body, hints))
+                self.conn.reply(msg, "u", (nid,))
+            elif member == "GetServerInformation":
+                self.conn.reply(msg, "ssss", ("fake", "polybar", "1.0", "1.2"))
+            else:
+                self.conn.reply(msg)
+
+    def close(self):
+        self.conn.close()
+        self.proc.kill()
+        self.proc.wait()
+
+def write_files(root, files):
+    for rel, content in files.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content if content.endswith("\n") else content + "\n")
+
+class FakeEnv:
+    def __init__(self, drm=False):
+        self.root = tempfile.mkdtemp(prefix="polybar-fake-")
+        self.bin = os.path.join(self.root, "bin")
+        self.sys = os.path.join(self.root, "sys")
+        self.proc = os.path.join(self.root, "proc")
+        self.home = os.path.join(self.root, "home")
+        self.runtime = os.path.join(self.root, "run")
+        self.bspwm = None
+        self.pulse = None
+        self.notifications = None
+
+        os.makedirs(self.bin)
+        os.makedirs(self.runtime, mode=0o700)
+        for name, body in FAKE_BINS.items():
+            self.add_bin(name, body)
+        for name in NOOP_BINS:
+            self.add_bin(name, "exit 0")
+
+        write_files(self.sys, SYSFS)
+        if drm:
+            write_files(self.sys, DRM_SYSFS)
+        write_files(self.proc, PROC)
+
+        config = os.path.join(self.home, ".config")
+        os.makedirs(config)
+        for name in os.listdir(os.path.join(REPO_DIR, "config")):
+            os.symlink(os.path.join(REPO_DIR, "config", name), os.path.join(config, name))
+        write_files(self.home, {".config/cava/config": "[input]\nsource = auto\n"})
+        os.makedirs(os.path.join(self.home, ".local", "bin"))
+        os.symlink(os.path.join(self.bin, "greenclip"), os.path.join(self.home, ".local", "bin", "greenclip"))
+
+        self.env = dict(os.environ)
+        self.env.update({
+            "PATH": self.bin + os.pathsep + os.environ.get("PATH", ""),
+            "HOME": self.home,
+            "XDG_RUNTIME_DIR": self.runtime,
+            "XDG_CACHE_HOME": os.path.join(self.home, ".cache"),
+            "BSPWM_SOCKET": os.path.join(self.runtime, "bspwm-socket"),
+            "PULSE_SERVER": "unix:" + os.path.join(self.runtime, "pulse", "native"),
+            "POLYBAR_SYSFS_ROOT": self.sys,
+            "POLYBAR_PROC_ROOT": self.proc,
+            "PYTHONDONTWRITEBYTECODE": "1",
+        })
+
+    def add_bin(self, name, body):
+        path = os.path.join(self.bin, name)
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n" + body.strip() + "\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def __enter__(self):
+        self.bspwm = FakeBspwm(self.env["BSPWM_SOCKET"])
+        self.pulse = FakePulse(self.env["PULSE_SERVER"][len("unix:"):])
+        if shutil.which("dbus-daemon"):
+            self.notifications = FakeNotifications()
+            self.env["DBUS_SESSION_BUS_ADDRESS"] = self.notifications.address
+        else:
+            self.env["DBUS_SESSION_BUS_ADDRESS"] = "unix:path=" + os.path.join(self.runtime, "no-bus")
+        return self
+
+    def __exit__(self, *exc):
+        if self.bspwm:
+            self.bspwm.close()
+        if self.pulse:
+            self.pulse.close()
+        if self.notifications:
+            self.notifications.close()
+        shutil.rmtree(self.root, ignore_errors=True)
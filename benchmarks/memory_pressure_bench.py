@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from fakes import PROC, SCRIPTS_DIR, SYSFS, write_files
+
+# Memory Pressure Check
+# Runs system-monitor.py's resident memory mode (watch_memory) against fake
+# meminfo, zram mm_stat and pressure files, with socket pairs standing in for
+# the PSI trigger files (out-of-band data is what POLLPRI reports), and checks
+# the printed lines:
+# - the trigger written to each pressure file
+# - swap use and zram size/ratio, zswap when there is no zram device
+# - pressure below the thresholds doesn't redraw; crossing one does, and
+#   so does falling back
+# - a trigger wakes the calm refresh at once
+#
+# Usage: ./memory_pressure_bench.py
+
+CALM = {"memory": (1.00, 0.00), "io": (0.50, 0.00)}   # (some, full) avg10
+TIMEOUT = 1 # s to wait for a line
+
+def pressure_file(some, full):
+    return (f"some avg10={some:.2f} avg60=0.00 avg300=0.00 total=0\n"
+            f"full avg10={full:.2f} avg60=0.00 avg300=0.00 total=0\n")
+
+def set_pressure(proc, memory=CALM["memory"], io=CALM["io"]):
+    write_files(proc, {"pressure/memory": pressure_file(*memory), "pressure/io": pressure_file(*io)})
+
+def load_monitor(root):
+    os.environ["POLYBAR_SYSFS_ROOT"] = os.path.join(root, "sys")
+    os.environ["POLYBAR_PROC_ROOT"] = os.path.join(root, "proc")
+    sys.path.insert(0, SCRIPTS_DIR)
+    spec = importlib.util.spec_from_file_location("system_monitor", os.path.join(SCRIPTS_DIR, "system-monitor.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class Lines:
+    # emit() stand-in
+    def __init__(self):
+        self.lines = []
+        self.cond = threading.Condition()
+
+    def __call__(self, line):
+        with self.cond:
+            self.lines.append(line)
+            self.cond.notify_all()
+
+    def wait(self, count, timeout=TIMEOUT):
+        # The newest line once there are <count> of them, None on timeout
+        with self.cond:
+            self.cond.wait_for(lambda: len(self.lines) >= count, timeout)
+            return self.lines[-1] if len(self.lines) >= count else None
+
+def main():
+    root = tempfile.mkdtemp(prefix="memory-bench-")
+    proc = os.path.join(root, "proc")
+    failures = []
+
+    def check(name, ok, detail=""):
+        print(f"{name:<34} {'ok' if ok else 'FAIL'} {detail}")
+        if not ok:
+            failures.append(name)
+
+    try:
+        write_files(os.path.join(root, "sys"), SYSFS)
+        write_files(proc, PROC)
+        set_pressure(proc)
+        monitor = load_monitor(root)
+        lines = Lines()
+        monitor.emit = lines
+        # Short timers for the rule checks, the wakeup check restores a long one
+        monitor.MEMORY_REFRESH = monitor.PRESSURE_RECHECK = 0.05
+
+        pairs = [socket.socketpair() for _ in monitor.PSI_TRIGGERS]
+        triggers = monitor.PressureTriggers([ours.fileno() for ours, _ in pairs])
+        for (resource, kind, stall_us, _, _), (_, peer) in zip(monitor.PSI_TRIGGERS, pairs):
+            peer.settimeout(TIMEOUT)
+            written = peer.recv(64)
+            check(f"trigger {resource} {kind}", written == f"{kind} {stall_us} {monitor.PSI_WINDOW_US}\0".encode(),
+                  repr(written))
+
+        threading.Thread(target=monitor.watch_memory, args=(triggers,), daemon=True).start()
+
+        calm = lines.wait(1)
+        check("calm line", calm is not None and "psi" not in calm, repr(calm))
+        # SwapTotal 8388604 kB, SwapFree 7340028 kB; mm_stat 1 GiB -> 310 MiB
+        check("swap use", calm is not None and " sw 12%" in calm)
+        check("zram size and ratio", calm is not None and " zr 310M x3.3" in calm)
+
+        set_pressure(proc, memory=(3.00, 0.00), io=(4.00, 1.00))
+        check("below thresholds: no redraw", lines.wait(2, 0.3) is None)
+
+        set_pressure(proc, memory=(6.20, 0.00))
+        warn = lines.wait(2)
+        check("memory some crossed: redraw", warn is not None and f"{monitor.COLOR_WARN}psi 6/0" in warn, repr(warn))
+
+        set_pressure(proc, memory=(6.90, 0.00))
+        check("same level and psi: no redraw", lines.wait(3, 0.3) is None)
+
+        set_pressure(proc, memory=(9.00, 2.50), io=(1.00, 5.50))
+        crit = lines.wait(3)
+        check("memory full crossed: redraw", crit is not None and f"{monitor.COLOR_CRIT}psi 9/5" in crit, repr(crit))
+
+        set_pressure(proc)
+        check("back to calm: redraw", lines.wait(4) == calm)
+
+        # Calm again: the next refresh is far away, only a trigger can wake it
+        monitor.MEMORY_REFRESH = 60
+        time.sleep(0.2)
+        set_pressure(proc, memory=(6.20, 0.00))
+        start = time.monotonic()
+        pairs[0][1].send(b"!", socket.MSG_OOB)
+        woken = lines.wait(5)
+        check("trigger wakes the refresh", woken == warn, f"{(time.monotonic() - start) * 1000:.1f} ms")
+
+        # No zram device: zswap from meminfo (Zswap 317440 kB); no swap in use
+        shutil.rmtree(os.path.join(root, "sys", "block"))
+        monitor._zram = None
+        meminfo = PROC["meminfo"].replace("SwapFree:        7340028", "SwapFree:        8388604")
+        write_files(proc, {"meminfo": meminfo})
+        line = monitor.get_memory()
+        check("zswap fallback", " zs 310M" in line and " zr" not in line, repr(line))
+        check("no swap in use", " sw" not in line)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+from fakes import FakeEnv
+
+# Notification Client Benchmark
+# Sends through notify.py to the stand-in notification server on a private
+# session bus (fakes.py, needs dbus-daemon) and reports:
+# - send() cost (it only queues) and the time until COUNT messages are
+#   delivered on the cached connection
+# - replace ids: update() on a handle, and on the handle it returned, must
+#   replace the same bubble (the id the server gave the first send), while a
+#   new send() gets a new one
+#
+# Usage: ./notify_bench.py [count]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with FakeEnv() as env:
+        if env.notifications is None:
+            print("skipped: missing dbus-daemon")
+            return 0
+        os.environ.update(env.env) # Session bus of the fake session
+        import notify
+
+        received = env.notifications.received
+        failures = []
+
+        def check(name, ok, detail=""):
+            print(f"{name:<30} {'ok' if ok else 'FAIL'} {detail}")
+            if not ok:
+                failures.append(name)
+
+        # Replace ids
+        first = notify.send("Bluetooth", "Conectando...", app="bench")
+        second = first.update("Bluetooth", "Conectado", app="bench")
+        third = second.update("Bluetooth", "Desconectado", app="bench")
+        other = notify.send("Volumen", "65%", app="bench")
+        notify.flush()
+        ids = [nid for nid, *_ in received[-4:]]
+        check("first send gets an id", first.id != 0 and ids[:1] == [first.id], f"id {first.id}")
+        check("update() reuses it", second.id == first.id and ids[1:2] == [first.id], f"id {second.id}")
+        check("update() of the update", third.id == first.id and ids[2:3] == [first.id], f"id {third.id}")
+        check("new send, new id", other.id not in (0, first.id) and ids[3:] == [other.id], f"id {other.id}")
+        check("bodies in order", [body for _, _, _, body, _ in received[-4:]] ==
+              ["Conectando...", "Conectado", "Desconectado", "65%"])
+
+        # Throughput
+        before = len(received)
+        start = time.perf_counter()
+        for i in range(count):
+            notify.send("Bench", str(i), app="bench")
+        queued = time.perf_counter()
+        notify.flush(10)
+        done = time.perf_counter()
+        delivered = len(received) - before
+        print(f"{'send() (queue only)':<30} {(queued - start) / count * 1e6:9.1f} us/message")
+        print(f"{'delivered':<30} {delivered:>9} / {count} in {(done - start) * 1000:.1f} ms")
+        if delivered != count:
+            failures.append("delivered")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Process Scanner Benchmark
+# Times system-monitor.py's top-process scanner against a synthetic /proc
+# with thousands of pids (one stat file each): the cold scan (every comm
+# decoded) and warm scans (comm cached, tick deltas only), with a share of
+# the pids replaced between scans like a busy desktop.
+#
+# Usage: ./proc_scan_bench.py [pids] [scans]
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "polybar", "scripts")
+
+COMMS = ["firefox", "Web Content", "kitty", "polybar", "cc1plus", "python3", "(sd-pam)", "kworker/0:1-events"]
+CHURN = 0.02 # share of pids that exit and are replaced between scans
+
+def stat_line(pid, comm, ticks, start):
+    # pid (comm) state ppid pgrp session tty tpgid flags minflt cminflt majflt
+    # cmajflt utime stime ... starttime vsize rss ...
+    return (f"{pid} ({comm}) S 1 {pid} {pid} 0 -1 4194304 100 0 0 0 {ticks} {ticks // 4} "
+            f"0 0 20 0 1 0 {start} 123456789 {pid % 50000} 18446744073709551615 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0\n")
+
+def write_proc(root, pids, round_no):
+    for i, pid in enumerate(pids):
+        path = os.path.join(root, str(pid))
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "stat"), "w") as f:
+            f.write(stat_line(pid, COMMS[i % len(COMMS)], 1000 + round_no * (i % 7), pid))
+
+def churn(root, pids, next_pid):
+    # Replace a share of the pids with new ones
+    for i in range(0, len(pids), int(1 / CHURN)):
+        shutil.rmtree(os.path.join(root, str(pids[i])))
+        pids[i] = next_pid
+        next_pid += 1
+    return next_pid
+
+def load_monitor(proc_root):
+    os.environ["POLYBAR_PROC_ROOT"] = proc_root
+    sys.path.insert(0, SCRIPTS_DIR)
+    spec = importlib.util.spec_from_file_location("system_monitor", os.path.join(SCRIPTS_DIR, "system-monitor.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    scans = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    root = tempfile.mkdtemp(prefix="proc-bench-")
+    try:
+        pids = list(range(1000, 1000 + count))
+        next_pid = pids[-1] + 1
+        write_proc(root, pids, 0)
+        for name in ("stat", "meminfo", "self"):
+            open(os.path.join(root, name), "w").close() # Non-pid entries are skipped
+
+        monitor = load_monitor(root)
+        scanner = monitor.ProcessScanner()
+
+        start = time.perf_counter()
+        scanner.scan()
+        cold = time.perf_counter() - start
+
+        warm = []
+        for round_no in range(1, scans + 1):
+            next_pid = churn(root, pids, next_pid)
+            write_proc(root, pids, round_no)
+            start = time.perf_counter()
+            scanner.scan()
+            warm.append(time.perf_counter() - start)
+
+        median = statistics.median(warm)
+        print(f"{'pids':<24} {count:>9}")
+        print(f"{'cold scan':<24} {cold * 1000:9.1f} ms  {cold / count * 1e6:7.2f} us/pid")
+        print(f"{'warm scan (median)':<24} {median * 1000:9.1f} ms  {median / count * 1e6:7.2f} us/pid")
+        print(f"{'top cpu':<24} {', '.join(scanner.top('cpu'))}")
+        print(f"{'top ram':<24} {', '.join(scanner.top('ram'))}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+import os
+import re
+import select
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fakes import FakeEnv, REPO_DIR
+
+# Cold-Start Benchmark for the Bar and WM Scripts
+# For every script in config/polybar/scripts and config/bspwm/scripts:
+# - startup: wall-clock time from exec to the first output line (resident
+#   modules) or to exit (one-shot scripts), median of N runs
+# - imports: time spent importing modules ('python3 -X importtime'), with
+#   the most expensive top-level imports
+# Everything runs against fake binaries, a fake sysfs/proc and a stand-in
+# bspwm socket (see fakes.py). A script over its budget fails the run, so
+# startup regressions are caught.
+#
+# Usage: ./startup_bench.py [-n RUNS] [name-filter...]
+
+POLYBAR = "config/polybar/scripts"
+BSPWM = "config/bspwm/scripts"
+
+# (script, args, mode, startup budget ms, import budget ms, requires)
+# mode: 'line' = first output line, 'exit' = process exit, 'import' = only
+# import time (resident scripts without output), 'skip' = not run (reason in args)
+SCRIPTS = [
+    (f"{POLYBAR}/system-monitor.py", ["cpu"], "exit", 150, 60, ()),
+    (f"{POLYBAR}/system-monitor.py", ["ram"], "exit", 150, 60, ()),
+    (f"{POLYBAR}/system-monitor.py", ["gpu"], "exit", 150, 60, ()),
+    (f"{POLYBAR}/system-monitor.py", ["stream", "cpu"], "line", 150, 60, ()),
+    (f"{POLYBAR}/system-monitor.py", ["memory"], "line", 150, 60, ()),
+    (f"{POLYBAR}/temperature-dynamic.py", [], "exit", 150, 60, ()),
+    (f"{POLYBAR}/bluetooth-status.py", [], "exit", 300, 150, ("dbus",)),
+    (f"{POLYBAR}/battery-dynamic.py", [], "line", 400, 250, ("dbus", "gi")),
+    (f"{POLYBAR}/volume-dynamic.py", [], "line", 200, 60, ()),
+    (f"{POLYBAR}/audio_events.py", ["sink"], "line", 200, 60, ()),
+    (f"{POLYBAR}/pulse.py", ["info"], "exit", 120, 40, ()),
+    (f"{POLYBAR}/volume_service.py", ["get"], "exit", 150, 40, ()),
+    (f"{POLYBAR}/bspwm-dynamic.py", [], "line", 200, 80, ()),
+    (f"{POLYBAR}/cava-dynamic.py", [], "import", None, 60, ()),
+    (f"{POLYBAR}/cava-bars.py", [], "line", 200, 60, ()),
+    (f"{POLYBAR}/polybar-host.py", [], "import", None, 60, ()),
+    (f"{POLYBAR}/fanout.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/polybar-relay.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/bspwm_ipc.py", ["query", "-N", "-n"], "exit", 120, 40, ()),
+    (f"{POLYBAR}/gradients.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/sysfs.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/uevent.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/sensors.py", ["read", "cpu"], "exit", 120, 40, ()),
+    (f"{POLYBAR}/battery_estimator.py", [], "import", None, 40, ()),
+    (f"{POLYBAR}/battery_history.py", ["report"], "exit", 150, 40, ()),
+    (f"{POLYBAR}/notify.py", ["Bench", "startup"], "exit", 150, 60, ()),
+    (f"{POLYBAR}/rofi-wifi.py", [], "exit", 300, 60, ()),
+    (f"{POLYBAR}/rofi-bluetooth.py", [], "exit", 400, 60, ()),
+    (f"{POLYBAR}/wifi-status.sh", [], "exit", 100, None, ()),
+    (f"{POLYBAR}/volume.sh", ["up"], "exit", 150, None, ()),
+    (f"{POLYBAR}/volume-slider.sh", [], "exit", 100, None, ()),
+    (f"{POLYBAR}/brightness.sh", ["up"], "exit", 150, None, ()),
+    (f"{POLYBAR}/browser-control.sh", [], "exit", 100, None, ()),
+    (f"{POLYBAR}/rofi-bluetooth.sh", ["hardcoded /home/sygurd path"], "skip", None, None, ()),
+    (f"{BSPWM}/bt-privacy.py", [], "import", None, 250, ("dbus", "gi")),
+    (f"{BSPWM}/greenclip_wrapper.sh", [], "exit", 150, 60, ()),
+    (f"{BSPWM}/desktop_cycle.sh", [], "exit", 150, None, ()),
+    (f"{BSPWM}/toggle_opacity.sh", [], "exit", 150, None, ()),
+    (f"{BSPWM}/screenshot_copy.sh", [], "exit", 400, None, ()),
+    (f"{BSPWM}/clipboard_fixer.sh", ["writes to the real clipboard/tmp"], "skip", None, None, ()),
+    (f"{BSPWM}/dynamic_wallpaper.sh", ["long-running wallpaper loop"], "skip", None, None, ()),
+    (f"{BSPWM}/force_time_sync.sh", ["needs network and sudo"], "skip", None, None, ()),
+    (f"{BSPWM}/lock.sh", ["locks the screen"], "skip", None, None, ()),
+]
+
+# Load a script as a module without running main() (its __name__ isn't __main__)
+LOADER = ("import importlib.util,sys; sys.path.insert(0, {dir!r}); "
+          "s = importlib.util.spec_from_file_location('bench_target', {path!r}); "
+          "s.loader.exec_module(importlib.util.module_from_spec(s))")
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+def first_line(path):
+    with open(path, "rb") as f:
+        return f.readline()
+
+def is_python(path):
+    return b"python" in first_line(path)
+
+def has_modules(names):
+    for name in names:
+        try:
+            __import__(name)
+        except ImportError:
+            return False
+    return True
+
+def command(path, args):
+    if is_python(path):
+        return [sys.executable, path] + args
+    if not first_line(path).startswith(b"#!"):
+        # No usable shebang: run it the way sh/sxhkd would (ENOEXEC -> sh)
+        return ["sh", path] + args
+    return [path] + args
+
+def time_startup(cmd, mode, env, timeout=5.0):
+    # Seconds until the first output line ('line') or exit ('exit')
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+    try:
+        if mode == "line":
+            ready, _, _ = select.select([proc.stdout], [], [], timeout)
+            if not ready:
+                return None
+            proc.stdout.readline()
+            return time.perf_counter() - start
+        proc.communicate(timeout=timeout)
+        return time.perf_counter() - start
+    except subprocess.TimeoutExpired:
+        return None
+    finally:
+        if proc.poll() is None:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+
+def import_lines(path, env):
+    code = LOADER.format(dir=os.path.dirname(path), path=path)
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         env=env, capture_output=True, text=True, timeout=30)
+    for line in out.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            yield int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+
+def import_baseline(env):
+    # Modules the interpreter and the loader import anyway (site, importlib...)
+    with tempfile.NamedTemporaryFile("w", suffix=".py") as empty:
+        return {name for _, _, _, name in import_lines(empty.name, env)}
+
+def import_profile(path, env, baseline):
+    # (total ms, [(cumulative ms, name)] of the top-level imports),
+    # not counting the interpreter/loader baseline
+    total = 0
+    top = []
+    for self_us, cumulative_us, indent, name in import_lines(path, env):
+        if name in baseline:
+            continue
+        total += self_us
+        if not indent:
+            top.append((cumulative_us / 1000.0, name))
+    top.sort(reverse=True)
+    return total / 1000.0, top[:3]
+
+def main():
+    args = sys.argv[1:]
+    runs = 5
+    if args[:1] == ["-n"]:
+        runs = int(args[1])
+        args = args[2:]
+    filters = args
+
+    failures = []
+    print(f"{'script':<42} {'startup ms':>11} {'budget':>7} {'imports ms':>11} {'budget':>7}  top imports")
+
+    with FakeEnv() as fake:
+        baseline = import_baseline(fake.env)
+        for rel, script_args, mode, budget, import_budget, requires in SCRIPTS:
+            name = rel.split("/")[-1] + ("" if mode == "skip" else "".join(" " + a for a in script_args))
+            if filters and not any(f in name for f in filters):
+                continue
+            path = os.path.join(REPO_DIR, rel)
+
+            if mode == "skip":
+                print(f"{name:<42} {'skipped: ' + script_args[0]}")
+                continue
+            if not has_modules(requires):
+                print(f"{name:<42} skipped: missing {', '.join(requires)}")
+                continue
+
+            startup_col = "-"
+            if mode in ("line", "exit"):
+                times = [time_startup(command(path, script_args), mode, fake.env) for _ in range(runs)]
+                if any(t is None for t in times):
+                    startup_col = "timeout"
+                    failures.append(f"{name}: no {'output' if mode == 'line' else 'exit'} within the timeout")
+                else:
+                    startup = statistics.median(times) * 1000
+                    startup_col = f"{startup:.1f}"
+                    if budget is not None and startup > budget:
+                        failures.append(f"{name}: startup {startup:.1f} ms > {budget} ms")
+
+            imports_col, top_col = "-", ""
+            if is_python(path):
+                imports, top = import_profile(path, fake.env, baseline)
+                imports_col = f"{imports:.1f}"
+                top_col = ", ".join(f"{n} {ms:.1f}" for ms, n in top)
+                if import_budget is not None and imports > import_budget:
+                    failures.append(f"{name}: imports {imports:.1f} ms > {import_budget} ms")
+
+            print(f"{name:<42} {startup_col:>11} {budget if budget is not None else '-':>7} "
+                  f"{imports_col:>11} {import_budget if import_budget is not None else '-':>7}  {top_col}")
+
+    if failures:
+        print("\nOver budget:")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import socket
+import sys
+
+from fakes import FakeEnv, SCRIPTS_DIR, write_files
+
+# uevent Check
+# Feeds uevent.py's Listener synthetic kernel uevents through a datagram
+# socketpair (the stand-in for the netlink socket) and checks:
+# - the subsystem filter (power_supply only / everything)
+# - the parsed fields
+# - udev re-broadcasts and malformed messages are dropped
+# - read() returns at once when nothing is pending
+# Then, if dbus and gi are installed, battery-dynamic.py's uevent path on
+# the fake sysfs: a burst of power_supply events (charger plugged in) gives
+# one sysfs reread and the charging line, an event of another subsystem
+# none.
+#
+# Usage: ./uevent_bench.py
+
+AC_DEVPATH = "/devices/LNXSYSTM:00/LNXSYBUS:00/ACPI0003:00/power_supply/AC0"
+BAT_DEVPATH = "/devices/LNXSYSTM:00/LNXSYBUS:00/PNP0C0A:00/power_supply/BAT0"
+USB_DEVPATH = "/devices/pci0000:00/0000:00:14.0/usb1/1-2"
+
+def message(action, devpath, subsystem, **fields):
+    # "ACTION@DEVPATH\0KEY=VALUE\0..." like the kernel sends it
+    pairs = {"ACTION": action, "DEVPATH": devpath, "SUBSYSTEM": subsystem, "SEQNUM": "4242", **fields}
+    return f"{action}@{devpath}\0".encode() + b"".join(f"{k}={v}\0".encode() for k, v in pairs.items())
+
+AC_PLUGGED = message("change", AC_DEVPATH, "power_supply", POWER_SUPPLY_NAME="AC0", POWER_SUPPLY_ONLINE="1")
+BAT_CHARGING = message("change", BAT_DEVPATH, "power_supply", POWER_SUPPLY_NAME="BAT0",
+                       POWER_SUPPLY_STATUS="Charging", POWER_SUPPLY_CAPACITY="70")
+USB_ADDED = message("add", USB_DEVPATH, "usb", DEVTYPE="usb_device", PRODUCT="46d/c52b/1211")
+UDEV_REBROADCAST = b"libudev\0\xfe\xed\xca\xfe" + bytes(32) + AC_PLUGGED # Binary header first
+MALFORMED = b"no header here\0SUBSYSTEM=power_supply\0"
+
+class Checks:
+    def __init__(self):
+        self.failures = []
+
+    def __call__(self, name, ok, detail=""):
+        print(f"{name:<40} {'ok' if ok else 'FAIL'} {detail}")
+        if not ok:
+            self.failures.append(name)
+
+def check_listener(check):
+    import uevent
+
+    kernel, ours = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener = uevent.Listener(["power_supply"], ours)
+    for data in (AC_PLUGGED, USB_ADDED, UDEV_REBROADCAST, MALFORMED, BAT_CHARGING):
+        kernel.send(data)
+    events = listener.read()
+    check("power_supply filter", [e.get("POWER_SUPPLY_NAME") for e in events] == ["AC0", "BAT0"],
+          f"{len(events)} events")
+    if len(events) == 2:
+        ac, bat = events
+        check("parsed AC0 fields", ac == {"ACTION": "change", "DEVPATH": AC_DEVPATH, "SUBSYSTEM": "power_supply",
+                                          "SEQNUM": "4242", "POWER_SUPPLY_NAME": "AC0",
+                                          "POWER_SUPPLY_ONLINE": "1"}, repr(ac))
+        check("parsed BAT0 fields", bat.get("POWER_SUPPLY_STATUS") == "Charging"
+              and bat.get("POWER_SUPPLY_CAPACITY") == "70" and bat.get("DEVPATH") == BAT_DEVPATH, repr(bat))
+    check("nothing pending: empty, no block", listener.read() == [])
+    listener.close()
+    kernel.close()
+
+    kernel, ours = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener = uevent.Listener((), ours)
+    for data in (AC_PLUGGED, USB_ADDED, UDEV_REBROADCAST, MALFORMED):
+        kernel.send(data)
+    events = listener.read()
+    check("no filter: every subsystem", [e.get("SUBSYSTEM") for e in events] == ["power_supply", "usb"],
+          f"{len(events)} events")
+    listener.close()
+    kernel.close()
+
+def check_battery(check, env):
+    try:
+        import dbus # noqa: F401 (battery-dynamic.py needs it)
+        from gi.repository import GLib
+    except ImportError:
+        print(f"{'battery-dynamic.py uevent path':<40} skipped: missing dbus, gi")
+        return
+    import uevent
+
+    spec = importlib.util.spec_from_file_location("battery_dynamic", os.path.join(SCRIPTS_DIR, "battery-dynamic.py"))
+    battery = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(battery)
+    lines = []
+    battery.emit = lines.append
+
+    battery.update_from_sysfs()
+    battery.update_timer()
+    battery.render()
+    reads = battery.sysfs_reads
+
+    kernel, ours = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener = uevent.Listener(["power_supply"], ours)
+    # Same watch as setup()
+    GLib.io_add_watch(listener.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, battery.uevent_handler, listener)
+    loop = GLib.MainLoop()
+
+    def run(seconds):
+        GLib.timeout_add(int(seconds * 1000), loop.quit)
+        loop.run()
+
+    kernel.send(USB_ADDED)
+    run(0.5)
+    check("other subsystem: no reread", battery.sysfs_reads == reads, f"{battery.sysfs_reads - reads} reads")
+
+    # Charger plugged in: the sysfs files change, then the kernel tells
+    write_files(env.sys, {"class/power_supply/AC0/online": "1",
+                          "class/power_supply/BAT0/status": "Charging"})
+    kernel.send(AC_PLUGGED)
+    kernel.send(BAT_CHARGING)
+    run(0.5)
+    check("power_supply burst: one reread", battery.sysfs_reads == reads + 1, f"{battery.sysfs_reads - reads} reads")
+    check("charging line", bool(lines) and lines[-1].startswith(battery.COLOR_CHARGING), repr(lines[-1:]))
+    listener.close()
+    kernel.close()
+
+def main():
+    check = Checks()
+    with FakeEnv() as env:
+        os.environ.update(env.env) # sysfs.py and the history file of the fake session
+        os.environ["XDG_STATE_HOME"] = os.path.join(env.home, ".local", "state")
+        check_listener(check)
+        check_battery(check, env)
+    return 1 if check.failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+from fakes import SCRIPTS_DIR
+
+# Bar Visualizer Benchmark
+# Feeds cava-bars.py synthetic raw 8-bit frames through a pipe, faster than
+# it draws (like a bar that can't keep up), with silent stretches in
+# between (zero frames for a moment, then nothing, like cava's sleep_timer),
+# and reports:
+# - render cost per frame (bytes -> bar text)
+# - frames written, frames drawn and frames dropped (stale, never queued)
+# - lines printed during silence (the module is cleared once, then quiet)
+# - wakeups while nothing is written (it should sleep on the pipe)
+#
+# Usage: ./visualizer_bench.py [seconds]
+
+WRITE_FPS = 240
+# (seconds, sound?) repeated until the time is up
+PATTERN = [(0.5, True), (0.5, False)]
+SLEEP_AFTER = 0.1 # s of zero frames at the start of a silence
+
+def load_visualizer():
+    spec = importlib.util.spec_from_file_location("cava_bars", os.path.join(SCRIPTS_DIR, "cava-bars.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def produce(fd, bars, duration, log):
+    # log: (time, sound?) for every frame written
+    period = 1.0 / WRITE_FPS
+    start = time.monotonic()
+    level = 0
+    while time.monotonic() - start < duration:
+        for seconds, sound in PATTERN:
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                if not sound and time.monotonic() > end - seconds + SLEEP_AFTER:
+                    time.sleep(period) # Asleep: nothing written
+                    continue
+                if sound:
+                    level = (level + 37) % 255
+                    frame = bytes((level + 29 * i) % 255 + 1 for i in range(bars))
+                else:
+                    frame = bytes(bars)
+                os.write(fd, frame)
+                log.append((time.monotonic(), sound))
+                time.sleep(period)
+    os.close(fd) # End of stream wakes the reader
+
+def silence_at(log, t):
+    # Was the last frame written before t silent?
+    sound = True
+    for written, frame_sound in log:
+        if written > t:
+            break
+        sound = frame_sound
+    return not sound
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sys.path.insert(0, SCRIPTS_DIR)
+    bars = load_visualizer()
+
+    # Render cost
+    frame = bytes(range(0, 256, 256 // bars.BARS))[:bars.BARS]
+    runs = 100000
+    start = time.perf_counter()
+    for _ in range(runs):
+        bars.render(frame)
+    render_us = (time.perf_counter() - start) / runs * 1e6
+
+    # Playback
+    rfd, wfd = os.pipe()
+    os.set_blocking(rfd, False)
+    reader = bars.FrameReader(rfd, bars.BARS)
+    reads = [] # time of every FIFO drain
+    latest = reader.latest
+    def timed_latest():
+        reads.append(time.monotonic())
+        return latest()
+    reader.latest = timed_latest
+    lines = []
+    bars.emit = lambda line: lines.append((time.monotonic(), line))
+    written = []
+    producer = threading.Thread(target=produce, args=(wfd, bars.BARS, duration, written))
+    producer.start()
+    bars.play(reader, producer.is_alive)
+    producer.join()
+    os.close(rfd)
+
+    drawn = len([line for _, line in lines if line])
+    # The clear comes within a tick of the silence: anything printed once the
+    # silence is two ticks old is noise
+    settled = 2.0 / bars.FPS
+    silent_lines = sum(1 for t, _ in lines if silence_at(written, t) and silence_at(written, t - settled))
+    clears = sum(1 for _, line in lines if not line)
+    # A drain with nothing written in the two ticks before it is a wasted wakeup
+    idle_reads = sum(1 for t in reads if not any(t - settled < w <= t for w, _ in written))
+    print(f"{'render':<26} {render_us:9.2f} us/frame")
+    print(f"{'frames written':<26} {len(written):>9} ({WRITE_FPS} fps)")
+    print(f"{'frames drawn':<26} {drawn:>9} (max {bars.FPS} fps)")
+    print(f"{'frames dropped':<26} {len(written) - drawn:>9}")
+    print(f"{'clears (silence starts)':<26} {clears:>9}")
+    print(f"{'lines during silence':<26} {silent_lines:>9}")
+    print(f"{'wakeups with no frames':<26} {idle_reads:>9}")
+    # Allowed: one late tick per silence, plus the end of the stream
+    return 0 if silent_lines == 0 and idle_reads <= clears + 1 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
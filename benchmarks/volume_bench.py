@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+import time
+
+from fakes import FakeEnv, SCRIPTS_DIR
+
+# Volume Service Benchmark
+# Drives volume_service.py against the stand-in sound server (fakes.py):
+# - a fast scroll: TICKS 'up' requests in a row, sent over the socket the
+#   way volume.sh does (one connection each, no process per tick)
+# - a slider drag: one value per ms, like yad --print-partial
+# and reports how long until the volume settles on its final value, how
+# many set-volume calls reached the server, and the service's own
+# request -> applied latency. The old volume.sh needed four pactl forks and
+# a notification per tick.
+#
+# Usage: ./volume_bench.py [ticks]
+
+SERVICE = os.path.join(SCRIPTS_DIR, "volume_service.py")
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with FakeEnv() as env:
+        os.environ.update(env.env) # fanout.runtime_dir() of the fake session
+        import fanout
+        import pulse
+        import volume_service
+
+        service = subprocess.Popen([SERVICE, "serve"], env=env.env)
+        try:
+            if not wait_for(lambda: os.path.exists(fanout.socket_path(volume_service.FANOUT_NAME))):
+                print("service didn't start")
+                return 1
+            fake = env.pulse
+            start_volume = pulse.percent(fake.volume[0])
+            expected = start_volume
+            for _ in range(ticks):
+                expected = volume_service.snap_up(expected)
+
+            # Fast scroll
+            sets_before = fake.calls.get(pulse.SET_SINK_VOLUME, 0)
+            start = time.perf_counter()
+            for _ in range(ticks):
+                volume_service.send("up")
+            sent = time.perf_counter()
+            settled = wait_for(lambda: pulse.percent(fake.volume[0]) == expected)
+            done = time.perf_counter()
+            sets = fake.calls.get(pulse.SET_SINK_VOLUME, 0) - sets_before
+            print(f"{'scroll ticks':<26} {ticks:>9}")
+            print(f"{'send (all ticks)':<26} {(sent - start) * 1000:9.2f} ms")
+            print(f"{'settled':<26} {(done - start) * 1000:9.2f} ms" if settled else
+                  f"{'settled':<26} {'never':>9} (volume {pulse.percent(fake.volume[0])}%)")
+            print(f"{'set-volume calls':<26} {sets:>9}")
+
+            # Slider drag: 0..100, one value per ms
+            sets_before = fake.calls.get(pulse.SET_SINK_VOLUME, 0)
+            start = time.perf_counter()
+            for value in range(101):
+                volume_service.send("set", str(value))
+                time.sleep(0.001)
+            settled = wait_for(lambda: pulse.percent(fake.volume[0]) == 100)
+            done = time.perf_counter()
+            sets = fake.calls.get(pulse.SET_SINK_VOLUME, 0) - sets_before
+            print(f"{'slider values':<26} {101:>9}")
+            print(f"{'settled':<26} {(done - start) * 1000:9.2f} ms" if settled else
+                  f"{'settled':<26} {'never':>9}")
+            print(f"{'set-volume calls':<26} {sets:>9}")
+            print(volume_service.send("stats"))
+        finally:
+            service.kill()
+            service.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,11 @@ from dbus.mainloop.glib import DBusGMainLoop
 from gi.repository import GLib
 import subprocess
 import os
+import sys
+
+# notify.py lives with the polybar scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "polybar", "scripts"))
+import notify
 
 # Bluetooth Privacy Guard
 # Pauses all media (using playerctl) when any Bluetooth device disconnects.
@@ -27,7 +32,7 @@ def property_changed(interface, changed, invalidated, path):
             # Ensure playerctl is installed
             try:
                 subprocess.run(["playerctl", "pause", "-a"], check=False)
-                subprocess.run(["notify-send", "Bluetooth Privacy", "Dispositivo desconectado. Audio pausado.", "-i", "audio-speakers"], check=False)
+                notify.send("Bluetooth Privacy", "Dispositivo desconectado. Audio pausado.", icon="audio-speakers")
             except FileNotFoundError:
                 print("Error: playerctl not found. Please install it.")
 
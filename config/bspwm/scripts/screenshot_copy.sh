@@ -1,7 +1,7 @@
 3#!/bin/bash
 
 # Notify start (optional debug)
-# notify-send "Screenshot" "Select area..."
+# ~/.config/polybar/scripts/notify.py -T screenshot "Screenshot" "Select area..."
 
 # Wait to ensure key release doesn't interfere
 sleep 0.2
@@ -9,7 +9,8 @@ sleep 0.2
 # Run maim to select (-s) and hide cursor (-u)
 # Pipe to xclip to store in clipboard as PNG
 if maim -s -u | xclip -selection clipboard -t image/png; then
-    notify-send "Screenshot" "Copied to clipboard!" -t 2000
+    # Misma burbuja para capturas seguidas (-T)
+    ~/.config/polybar/scripts/notify.py -T screenshot -t 2000 "Screenshot" "Copied to clipboard!"
 else
-    notify-send "Screenshot" "Cancelled or Failed" -u critical
+    ~/.config/polybar/scripts/notify.py -T screenshot -u critical "Screenshot" "Cancelled or Failed"
 fi
@@ -6,14 +6,23 @@ killall -q polybar
 # Esperar a que los procesos se hayan cerrado
 while pgrep -u $UID -x polybar >/dev/null; do sleep 1; done
 
-# Lanzar la barra llamada "example" (definida en el config.ini)
-polybar example &
+# Proceso residente con todos los módulos (cpu, memoria, gpu, temperatura, bluetooth,
+# batería, volumen y el productor de bspwm). Las barras solo leen su salida.
+~/.config/polybar/scripts/polybar-host.py &
 
+# Lanzar la barra llamada "example" (definida en el config.ini), una por monitor
+# Cada barra tiene un único lector (polybar-relay.py) que pasa a sus módulos
+# custom/ipc las líneas del host y de bspwm; termina junto con su barra.
+RELAY=~/.config/polybar/scripts/polybar-relay.py
+if [ "$(polybar --list-monitors | wc -l)" -gt 1 ]; then
+    for m in $(polybar --list-monitors | cut -d: -f1); do
+        MONITOR=$m polybar example &
+        "$RELAY" $! "$m" &
+    done
+else
+    polybar example &
+    "$RELAY" $! &
+fi
 
-# Kill existing temperature daemon if running
-pkill -f temperature-daemon.sh
-
-# Start temperature daemon
-~/.config/polybar/scripts/temperature-daemon.sh &
 
 echo "Polybar lanzada..."
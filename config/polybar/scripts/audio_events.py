@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+import os
+import re
+import select
+import subprocess
+import sys
+import time
+
+import fanout
+import pulse
+
+# Sound Server Event Router
+# One subscription to the sound server for every audio script. Events are
+# parsed (type, facility, index) and only the relevant ones trigger a
+# refresh: a change on the default sink (volume, mute) or a change of the
+# default sink itself (server event, sink added/removed). sink-input events
+# from the playing streams are dropped. A burst of events (slider drag,
+# fast scrolling) within WINDOW is merged into one refresh.
+#
+# Results go out on the 'audio' fan-out socket (identical lines aren't
+# re-sent, so a sink event that didn't touch volume or mute reaches nobody):
+#   sink           "<volume %> <yes|no muted>", e.g. "65 no"
+#   default-sink   default sink name
+#   monitor        its monitor source (what cava should listen to)
+#
+# Event source: a native connection (pulse.py), else 'pactl subscribe'.
+# Consumers use subscribe(key), which starts the router if it isn't running.
+#
+# Usage:
+#   ./audio_events.py [-w MS] [--pactl]    Run the router (WINDOW in ms)
+#   ./audio_events.py KEY                  Print the lines for KEY
+#   ./audio_events.py stats                Event counters of the running router
+
+FANOUT_NAME = "audio"
+WINDOW = 0.05 # s
+IDLE_CHECK = 60 # s without events between checks that the session is still there
+
+# What an event asks for
+REFRESH_SINK, REFRESH_DEFAULT = 1, 2
+
+PACTL_EVENT_RE = re.compile(r"Event '(\w+)' on ([\w-]+) #(\d+)")
+PACTL_FACILITIES = {"sink": pulse.FACILITY_SINK, "source": pulse.FACILITY_SOURCE,
+                    "sink-input": pulse.FACILITY_SINK_INPUT, "server": pulse.FACILITY_SERVER}
+PACTL_TYPES = {"new": pulse.EVENT_NEW, "change": pulse.EVENT_CHANGE, "remove": pulse.EVENT_REMOVE}
+
+def classify(facility, type, index, default_index):
+    if facility == pulse.FACILITY_SERVER:
+        return REFRESH_DEFAULT | REFRESH_SINK
+    if facility == pulse.FACILITY_SINK:
+        if type != pulse.EVENT_CHANGE:
+            return REFRESH_DEFAULT | REFRESH_SINK # Sink plugged/unplugged
+        if index == default_index:
+            return REFRESH_SINK
+    return 0
+
+class NativeSource:
+    def __init__(self):
+        self.conn = pulse.Connection(name="polybar-audio-events")
+        self.conn.subscribe(pulse.MASK_SINK | pulse.MASK_SERVER)
+
+    def next_event(self, timeout=None):
+        return self.conn.next_event(timeout)
+
+    def query_default(self):
+        sink = self.conn.sink()
+        return sink.name, sink.index, sink.monitor
+
+    def query_sink(self):
+        sink = self.conn.sink()
+        return sink.volume, sink.muted
+
+    def close(self):
+        self.conn.close()
+
+class PactlSource:
+    def __init__(self):
+        self.proc = subprocess.Popen(["pactl", "subscribe"], stdout=subprocess.PIPE)
+        self.fd = self.proc.stdout.fileno()
+        self.buf = b""
+
+    def next_event(self, timeout=None):
+        while True:
+            while b"\n" in self.buf:
+                line, _, self.buf = self.buf.partition(b"\n")
+                match = PACTL_EVENT_RE.search(line.decode(errors="replace"))
+                if match:
+                    type, facility, index = match.groups()
+                    return (PACTL_FACILITIES.get(facility, -1), PACTL_TYPES.get(type, -1), int(index))
+            if not select.select([self.fd], [], [], timeout)[0]:
+                return None
+            data = os.read(self.fd, 4096)
+            if not data:
+                raise OSError("pactl subscribe exited")
+            self.buf += data
+
+    def _pactl(self, *args):
+        return subprocess.check_output(["pactl", *args], text=True).strip()
+
+    def query_default(self):
+        name = self._pactl("get-default-sink")
+        index = None
+        for line in self._pactl("list", "sinks", "short").splitlines():
+            fields = line.split("\t")
+            if len(fields) > 1 and fields[1] == name:
+                index = int(fields[0])
+        return name, index, f"{name}.monitor"
+
+    def query_sink(self):
+        muted = "yes" in self._pactl("get-sink-mute", pulse.DEFAULT_SINK)
+        match = re.search(r"(\d+)%", self._pactl("get-sink-volume", pulse.DEFAULT_SINK))
+        return (int(match.group(1)) if match else 0), muted
+
+    def close(self):
+        self.proc.kill()
+        self.proc.wait()
+
+class Router:
+    def __init__(self, publish, window=WINDOW):
+        self.publish = publish
+        self.window = window
+        self.default_index = None
+        self.events = 0    # Received
+        self.relevant = 0  # That asked for a refresh
+        self.refreshes = 0 # Bursts, one refresh each
+
+    def refresh(self, source, flags):
+        self.refreshes += 1
+        if flags & REFRESH_DEFAULT:
+            name, self.default_index, monitor = source.query_default()
+            self.publish("default-sink", name)
+            self.publish("monitor", monitor)
+        if flags & REFRESH_SINK:
+            volume, muted = source.query_sink()
+            self.publish("sink", f"{volume} {'yes' if muted else 'no'}")
+
+    def _flags(self, event):
+        self.events += 1
+        flags = classify(*event, self.default_index)
+        if flags:
+            self.relevant += 1
+        return flags
+
+    def run(self, source, alive):
+        # Returns when alive() turns false
+        self.refresh(source, REFRESH_DEFAULT | REFRESH_SINK)
+        while True:
+            event = source.next_event(IDLE_CHECK)
+            if event is None:
+                if not alive():
+                    return
+                continue
+            flags = self._flags(event)
+            if not flags:
+                continue
+            # Merge whatever else comes within the window
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                event = source.next_event(max(remaining, 0))
+                if event is None:
+                    break
+                flags |= self._flags(event)
+            self.refresh(source, flags)
+
+    def stats(self):
+        return f"events {self.events} relevant {self.relevant} refreshes {self.refreshes}"
+
+def open_source(use_pactl=False):
+    if not use_pactl:
+        try:
+            return NativeSource()
+        except (OSError, pulse.PulseError):
+            pass
+    return PactlSource()
+
+def serve(window=WINDOW, use_pactl=False):
+    router = None
+    server = fanout.Server(FANOUT_NAME, on_action=lambda key, args: router.stats() if key == "stats" else "unknown")
+    if not server.start():
+        return 1 # Already running
+    router = Router(server.publish, window)
+    # The runtime dir (and the socket in it) goes away at logout
+    alive = lambda: os.path.exists(server.path)
+    while True:
+        try:
+            source = open_source(use_pactl)
+        except OSError:
+            source = None # No pactl either
+        if source is not None:
+            try:
+                router.run(source, alive)
+            except (OSError, ValueError, pulse.PulseError, subprocess.CalledProcessError):
+                pass # Sound server restarted: reconnect
+            finally:
+                source.close()
+        if not alive():
+            return 0
+        time.sleep(2)
+
+# --- Consumers ---
+
+def start_router():
+    # Detached: outlives the consumer that started it. A second router exits
+    # at once (fan-out lock).
+    subprocess.Popen([sys.executable, os.path.abspath(__file__)], start_new_session=True,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def subscribe(key):
+    # Lines for <key>, starting the router if needed; reconnects if it restarts
+    started = False
+    while True:
+        try:
+            sock = fanout.connect(FANOUT_NAME, f"sub {key}")
+        except OSError:
+            if not started:
+                start_router()
+                started = True
+            time.sleep(0.05)
+            continue
+        with sock:
+            for line in sock.makefile("r", encoding="utf-8"):
+                yield line.rstrip("\n")
+        started = False
+        time.sleep(1)
+
+def main():
+    args = sys.argv[1:]
+    window = WINDOW
+    use_pactl = False
+    try:
+        while args and args[0].startswith("-"):
+            arg = args.pop(0)
+            if arg == "-w":
+                window = int(args.pop(0)) / 1000
+            elif arg == "--pactl":
+                use_pactl = True
+            else:
+                raise ValueError(arg)
+    except (IndexError, ValueError):
+        print("usage: audio_events.py [-w MS] [--pactl] | KEY | stats", file=sys.stderr)
+        return 1
+
+    try:
+        if not args:
+            return serve(window, use_pactl)
+        if args == ["stats"]:
+            print(fanout.action(FANOUT_NAME, "stats"))
+            return 0
+        for line in subscribe(args[0]):
+            print(line, flush=True)
+    except OSError as e:
+        print(f"audio_events: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,14 +2,39 @@
 import dbus
 from dbus.mainloop.glib import DBusGMainLoop
 from gi.repository import GLib
+import atexit
+import os
 import sys
-import subprocess
 import time
 
+import battery_estimator
+import battery_history
+import gradients
+import notify
+import sysfs
+import uevent
+
 # Instant Battery for Polybar (Fixed Gradient & Optimized)
-# - No threads: Using GLib.timeout_add for animations.
+# - No threads: one GLib tick scheduler for animations, blink and polling.
 # - Direct Monitoring: Targeted at battery_BAT0 for lower latency.
 # - Charging Gradient: White -> Green (Smooth interpolation).
+# - Time to empty / to full from a smoothed drain rate (battery_estimator.py),
+#   shown after the percentage; click for the details.
+# - Charge history in a small ring file: battery_history.py (right click).
+# - D-Bus: only UPower's battery/line-power objects are subscribed to.
+# - Kernel power_supply uevents (uevent.py) wake it on plug/unplug and
+#   capacity changes; the sysfs poll is only a slow safety net.
+
+# /sys can be redirected to a fake tree (benchmarks), see sysfs.py
+POWER_SUPPLY = f"{sysfs.SYSFS_ROOT}/class/power_supply"
+
+# Kept-open attributes, re-read in one batch (see sysfs.py)
+BATTERY = sysfs.Group(f"{POWER_SUPPLY}/BAT0", "energy_now", "energy_full", "power_now", "status")
+AC_ONLINE = sysfs.attribute(f"{POWER_SUPPLY}/AC0/online")
+
+# Safety-net sysfs poll (seconds): short only if uevents aren't available
+POLL_WITH_UEVENTS = 30
+POLL_FALLBACK = 2
 
 # Colors
 COLOR_CHARGING = "%{F#00FF00}" # Green
@@ -21,83 +46,65 @@ COLOR_END = "%{F-}"
 ICONS_RAMP = ["", "", "", "", ""]
 ICON_FULL = ""
 
-# Gradient Colors (Turquoise -> Orange -> Red)
-# High: Turquoise
-COLOR_HIGH_RGB = (0, 188, 212)   # #00BCD4
-# Mid: Orange (Warning)
-COLOR_MID_RGB = (255, 165, 0)    # #FFA500
-# Low: Red (Critical)
-COLOR_LOW_RGB = (255, 0, 0)      # #FF0000
-
-# Charging Gradient (White -> Green)
-# Starting slightly off-white to make the green transition more obvious
-CHARGING_START_RGB = (255, 255, 255) # White
-CHARGING_END_RGB = (0, 255, 0)       # Green
+# Gradients (Discharging: Turquoise -> Orange -> Red, Charging text: White -> Green)
+# are precomputed lookup tables in gradients.py
 
 # Global State
 current_state = 0 # 1=Charging, 2=Discharging, etc.
 current_percentage = 0.0
 anim_frame = 0
-anim_timer_id = 0
+
+# Time Remaining (see battery_estimator.py)
+estimator = battery_estimator.Estimator()
+time_left = "" # e.g. "3:12", empty while unknown
+
+# Charge history, msync'ed in batches (see battery_history.py)
+history = battery_history.Recorder()
+atexit.register(history.flush)
 
 # Critical Blink State
 critical_blink_state = True # True=Color, False=Empty/Dim
-critical_timer_id = 0
 critical_notified = False
 
-def rgb_to_hex(rgb):
-    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+# Precomputed colour codes (see gradients.py)
+COLOR_CRITICAL = gradients.fg(gradients.RED)
+COLOR_BLINK_OFF = "%{F#333333}" # Dark Gray for 'off' state of blink
 
 def get_discharging_color(pct):
-    if pct > 75:
-        return COLOR_DISCHARGING
-    
     # Gradient Logic:
+    # > 75%      : High (Turquoise)
     # 75% -> 30% : High (Turquoise) -> Mid (Orange)
     # 30% -> 0%  : Mid (Orange) -> Low (Red)
-    
-    mid_point = 30.0
-    high_point = 75.0
-    
-    if pct > mid_point:
-        # Interpolate High -> Mid
-        # pct: 75 -> 30
-        # t:   0  -> 1
-        t = (high_point - pct) / (high_point - mid_point)
-        start_c = COLOR_HIGH_RGB
-        end_c = COLOR_MID_RGB
-    else:
-        # Interpolate Mid -> Low
-        # pct: 30 -> 0
-        # t:   0  -> 1
-        t = (mid_point - pct) / mid_point
-        start_c = COLOR_MID_RGB
-        end_c = COLOR_LOW_RGB
-
-    r = start_c[0] + (end_c[0] - start_c[0]) * t
-    g = start_c[1] + (end_c[1] - start_c[1]) * t
-    b = start_c[2] + (end_c[2] - start_c[2]) * t
-    
-    return f"%{{F{rgb_to_hex((r,g,b))}}}"
+    return gradients.BATTERY_DISCHARGE(pct)
 
 def get_charging_text_color(pct):
     # Precise Gradient:
     # Uses the fractional part of the percentage for the color transition.
     # 45.0% -> White
     # 45.9% -> Green
-    decimal_part = pct - int(pct)
-    t = decimal_part 
-    
-    r = CHARGING_START_RGB[0] + (CHARGING_END_RGB[0] - CHARGING_START_RGB[0]) * t
-    g = CHARGING_START_RGB[1] + (CHARGING_END_RGB[1] - CHARGING_START_RGB[1]) * t
-    b = CHARGING_START_RGB[2] + (CHARGING_END_RGB[2] - CHARGING_START_RGB[2]) * t
-    return f"%{{F{rgb_to_hex((r,g,b))}}}"
+    return gradients.BATTERY_CHARGE_FRACTION(pct - int(pct))
 
 def get_icon_for_percentage(pct):
     idx = int(pct / 20)
     if idx >= 5: idx = 4
     return ICONS_RAMP[idx]
 
+def emit(line):
+    # Output hook (polybar-host.py replaces it to publish the line)
+    print(line, flush=True)
+
+last_line = None
+
+def output(line):
+    # Only lines that differ from the previous one are emitted
+    global last_line
+    if line != last_line:
+        last_line = line
+        emit(line)
+
+def time_suffix():
+    return f" {time_left}" if time_left else ""
+
 def render():
     global current_state, current_percentage, anim_frame
     
@@ -114,12 +121,12 @@ def render():
         icon = ICONS_RAMP[0] # Empty battery
         if critical_blink_state:
             # Critical Red
-            color_code = f"%{{F{rgb_to_hex(COLOR_LOW_RGB)}}}"
+            color_code = COLOR_CRITICAL
         else:
             # Dimmed / White for blink effect
-            color_code = "%{F#333333}" # Dark Gray for 'off' state of blink
+            color_code = COLOR_BLINK_OFF
         
-        print(f"{color_code}{icon} {pct_int}%{COLOR_END}", flush=True)
+        output(f"{color_code}{icon} {pct_int}%{COLOR_END}")
         return
     
     if current_state == 1 and pct_int < 99: # Charging
@@ -127,74 +134,156 @@ def render():
         # Icon -> Green
         # Text -> Precise Fractional Gradient (White -> Green)
         text_color = get_charging_text_color(current_percentage)
-        print(f"{COLOR_CHARGING}{icon} {text_color}{pct_int}%{COLOR_END}", flush=True)
+        output(f"{COLOR_CHARGING}{icon} {text_color}{pct_int}%{time_suffix()}{COLOR_END}")
     elif current_state == 4 or (current_state == 1 and pct_int >= 99): # Full
-        print(f"{COLOR_FULL}{ICON_FULL} {pct_int}%{COLOR_END}", flush=True)
+        output(f"{COLOR_FULL}{ICON_FULL} {pct_int}%{COLOR_END}")
     else: # Discharging / Others
         icon = get_icon_for_percentage(current_percentage)
         color_code = get_discharging_color(current_percentage)
-        print(f"{color_code}{icon} {pct_int}%{COLOR_END}", flush=True)
+        output(f"{color_code}{icon} {pct_int}%{time_suffix()}{COLOR_END}")
+
+# --- Tick Scheduler ---
+# One GLib timeout drives everything: the charging animation, the critical
+# blink, the safety-net poll and the reread requested by D-Bus signals and
+# uevents. Deadlines are counted in ticks of TICK_MS on the monotonic clock,
+# so jobs that fall due together (animation every 3 ticks, blink every 2)
+# share one wake-up. A wake-up does at most one sysfs read and one render,
+# whatever woke it, and render() drops lines identical to the last one.
+# The timeout is only armed for the next deadline, so an idle discharging
+# laptop wakes for the poll and for events only.
+
+TICK_MS = 250
+ANIM_TICKS = 3  # 750 ms
+BLINK_TICKS = 2 # 500 ms
+
+def current_tick():
+    # +1 ms: a timeout firing right at the boundary belongs to that tick
+    return (int(time.monotonic() * 1000) + 1) // TICK_MS
+
+class TickScheduler:
+    def __init__(self):
+        self.jobs = {}   # name -> [next tick, period in ticks, callback]
+        self.timer_id = 0
+        self.armed_tick = None
+        self.pending_read = False
+        self.pending_render = False
+
+    def every(self, name, period, callback):
+        # Periodic job, keeps its phase if already scheduled
+        if name not in self.jobs:
+            self.jobs[name] = [current_tick() + period, period, callback]
+            self.arm()
+
+    def cancel(self, name):
+        # The armed timeout, if any, just finds nothing due
+        self.jobs.pop(name, None)
+
+    def request(self, read=False, render=True):
+        # Merge an update into the next tick
+        self.pending_read = self.pending_read or read
+        self.pending_render = self.pending_render or render
+        self.arm()
+
+    def arm(self):
+        due = [job[0] for job in self.jobs.values()]
+        if self.pending_read or self.pending_render:
+            due.append(current_tick() + 1)
+        if not due:
+            return
+        tick = min(due)
+        if self.timer_id and self.armed_tick <= tick:
+            return # Already waking up early enough
+        if self.timer_id:
+            GLib.source_remove(self.timer_id)
+        delay = max(tick * TICK_MS - int(time.monotonic() * 1000), 0)
+        self.timer_id = GLib.timeout_add(delay, self._fire)
+        self.armed_tick = tick
+
+    def _fire(self):
+        self.timer_id = 0
+        tick = current_tick()
+        for name, job in list(self.jobs.items()):
+            if job[0] <= tick:
+                # Skip the ticks missed while suspended instead of catching up
+                job[0] += job[1] * max(1, (tick - job[0]) // job[1] + 1)
+                job[2]()
+
+        if self.pending_read:
+            update_from_sysfs()
+            update_timer()
+            self.pending_render = True
+        if self.pending_render:
+            render()
+        self.pending_read = self.pending_render = False
+        self.arm()
+        return False # One-shot, re-armed for the next deadline
+
+scheduler = TickScheduler()
 
 def animation_callback():
-    global anim_frame, current_state
-    if current_state == 1:
-        anim_frame = (anim_frame + 1) % 5
-        render()
-        return True # Keep timer running
-    return False # Stop timer
+    global anim_frame
+    anim_frame = (anim_frame + 1) % 5
+    scheduler.pending_render = True
 
 def critical_anim_callback():
-    global critical_blink_state, current_percentage, current_state
-    
-    # Verify we are still in critical state
-    # Ensure consistency with start condition
-    if int(current_percentage) > 5 or current_state == 1 or current_state == 4:
-        return False
-        
+    global critical_blink_state
     critical_blink_state = not critical_blink_state
-    render()
-    return True
+    scheduler.pending_render = True
+
+def poll_callback():
+    # Safety net in case signals are missed or micro-charging happens silently
+    scheduler.pending_read = True
 
 def update_timer():
-    global anim_timer_id, current_state, critical_timer_id, current_percentage
+    global critical_blink_state
     
     # Charging Animation
     if current_state == 1:
-        if anim_timer_id == 0:
-            anim_timer_id = GLib.timeout_add(750, animation_callback)
+        scheduler.every("anim", ANIM_TICKS, animation_callback)
     else:
-        if anim_timer_id != 0:
-            GLib.source_remove(anim_timer_id)
-            anim_timer_id = 0
+        scheduler.cancel("anim")
 
     # Critical Battery Blink (<= 5% and Discharging)
     if int(current_percentage) <= 5 and current_state != 1 and current_state != 4:
-        if critical_timer_id == 0:
-            critical_timer_id = GLib.timeout_add(500, critical_anim_callback)
+        scheduler.every("blink", BLINK_TICKS, critical_anim_callback)
     else:
-        if critical_timer_id != 0:
-            GLib.source_remove(critical_timer_id)
-            critical_timer_id = 0
-            critical_blink_state = True # Reset to visible
+        scheduler.cancel("blink")
+        critical_blink_state = True # Reset to visible
+
+def update_estimate(now, full, power):
+    global time_left
+    charging = {1: True, 2: False}.get(current_state)
+    estimator.update(time.monotonic(), charging, now, full, power)
+    remaining = estimator.remaining()
+    time_left = battery_estimator.format_duration(remaining) if remaining is not None else ""
 
+def show_details():
+    # Click: notification with the estimate
+    remaining = estimator.remaining()
+    watts = estimator.watts()
+    lines = [f"{current_percentage:.1f}%"]
+    if remaining is not None:
+        minutes = int(remaining // 60)
+        what = "hasta carga completa" if current_state == 1 else "restante"
+        lines.append(f"{minutes // 60} h {minutes % 60:02d} min {what}")
+    if watts is not None:
+        lines.append(f"{watts:.1f} W")
+    notify.send('Batería', "\n".join(lines), app='battery')
 
 def update_from_sysfs():
-    global current_state, current_percentage, critical_notified
+    global current_state, current_percentage, critical_notified, sysfs_reads
+    sysfs_reads += 1
     try:
         # Read raw energy values for precision
-        with open("/sys/class/power_supply/BAT0/energy_now", "r") as f:
-            now = int(f.read().strip())
-        with open("/sys/class/power_supply/BAT0/energy_full", "r") as f:
-            full = int(f.read().strip())
+        bat = BATTERY.read()
+        now = int(bat["energy_now"])
+        full = int(bat["energy_full"])
         
         # Calculate precise float percentage
         current_percentage = (now / full) * 100.0
         
-        with open("/sys/class/power_supply/BAT0/status", "r") as f:
-            status = f.read().strip()
-            
-        with open("/sys/class/power_supply/AC0/online", "r") as f:
-            ac_online = int(f.read().strip())
+        status = bat["status"]
+        ac_online = AC_ONLINE.read_int()
 
         if status == "Charging":
             current_state = 1
@@ -203,11 +292,9 @@ def update_from_sysfs():
         elif status == "Discharging":
             current_state = 2
             if int(current_percentage) <= 5 and not critical_notified:
-                 try:
-                     subprocess.run(['notify-send', '-u', 'critical', 'Batería Baja', '5% restante'])
-                     critical_notified = True
-                 except:
-                     pass
+                 # Queued: never blocks the main loop
+                 notify.send('Batería Baja', '5% restante', urgency='critical')
+                 critical_notified = True
         elif status == "Full":
             current_state = 4
             critical_notified = False
@@ -217,62 +304,126 @@ def update_from_sysfs():
             critical_notified = False
         else:
             current_state = 0
+        
+        power = int(bat["power_now"]) if bat["power_now"] else None
+        update_estimate(now, full, power)
+        history.add(time.time(), now, power, current_state, full)
             
     except Exception as e:
         # Fallback to DBus if sysfs fails
         pass
 
 def handle_properties(changed):
-    global current_state, current_percentage
-    dirty = False
-    
     # Prioritize SYSFS reading whenever a DBus signal comes in
     # DBus signals tell us *when* to update, but SYSFS tells us *what* the precise value is.
-    update_from_sysfs()
-    
-    # Update timer state based on new current_state
-    update_timer()
-    
-    dirty = True
-            
-    if dirty:
-        render()
+    # Bursts of signals are merged into one read on the next tick.
+    scheduler.request(read=True)
 
-def signal_handler(*args, **kwargs):
-    # Robust handler to prevent "missing positional argument" errors
-    # PropertiesChanged usually sends: (interface, changed, invalidated)
-    # path_keyword adds 'path' to kwargs.
-    
-    path = kwargs.get('path')
-    if not path:
-        return
+def uevent_handler(fd, condition, listener):
+    # Several events can arrive together (AC + BAT0): one reread for all
+    if listener.read():
+        handle_properties({})
+    return True # Keep watching
+
+# --- UPower Subscription ---
+# Match rules scoped to UPower's battery and line-power objects (found with
+# EnumerateDevices, re-done on DeviceAdded/DeviceRemoved), so property
+# changes of other services (BlueZ RSSI, NetworkManager signal strength,
+# logind...) never reach this process. 'received' counts the signals that
+# arrive, 'acted' the ones that requested a reread, 'reads' the sysfs reads
+# they turned into after merging (action 'stats' shows them).
+
+UPOWER = "org.freedesktop.UPower"
+UPOWER_PATH = "/org/freedesktop/UPower"
+UPOWER_DEVICE = "org.freedesktop.UPower.Device"
+DBUS_PROPERTIES = "org.freedesktop.DBus.Properties"
+DEVICE_LINE_POWER, DEVICE_BATTERY = 1, 2
+
+class UPowerSubscription:
+    def __init__(self, bus):
+        self.bus = bus
+        self.matches = {}       # object path -> signal match
+        self.battery_path = None
+        self.received = 0
+        self.acted = 0
+
+    def start(self):
+        for signal in ("DeviceAdded", "DeviceRemoved"):
+            self.bus.add_signal_receiver(self._devices_changed, signal_name=signal, dbus_interface=UPOWER,
+                                         bus_name=UPOWER, path=UPOWER_PATH)
+        self.enumerate()
+
+    def enumerate(self):
+        upower = dbus.Interface(self.bus.get_object(UPOWER, UPOWER_PATH), UPOWER)
+        wanted = set()
+        self.battery_path = None
+        for path in upower.EnumerateDevices():
+            props = dbus.Interface(self.bus.get_object(UPOWER, path), DBUS_PROPERTIES)
+            kind = int(props.Get(UPOWER_DEVICE, "Type"))
+            if kind == DEVICE_BATTERY and bool(props.Get(UPOWER_DEVICE, "PowerSupply")):
+                self.battery_path = self.battery_path or str(path)
+                wanted.add(str(path))
+            elif kind == DEVICE_LINE_POWER:
+                wanted.add(str(path))
+
+        for path in set(self.matches) - wanted:
+            self.matches.pop(path).remove()
+        for path in wanted - set(self.matches):
+            self.matches[path] = self.bus.add_signal_receiver(
+                self._properties_changed, signal_name="PropertiesChanged",
+                dbus_interface=DBUS_PROPERTIES, bus_name=UPOWER, path=path)
 
-    # Try to find the 'changed' dict among args
-    # usually it's the second argument (index 1)
-    if len(args) > 1 and isinstance(args[1], dict):
-        changed = args[1]
+    def _devices_changed(self, *args):
+        self.received += 1
+        try:
+            self.enumerate()
+        except dbus.DBusException:
+            pass
+        handle_properties({})
+
+    def _properties_changed(self, interface, changed, invalidated):
+        self.received += 1
+        if interface != UPOWER_DEVICE:
+            return
+        self.acted += 1
         handle_properties(changed)
-    elif len(args) > 0 and isinstance(args[0], dict):
-        # Fallback if interface arg is skipped for some reason
-        handle_properties(args[0])
 
-def main():
+subscription = None
+sysfs_reads = 0
+
+def show_stats():
+    # Click/debug: how much the scoped subscription lets through
+    if subscription is None:
+        notify.send('Batería', 'Sin suscripción a UPower', app='battery')
+        return
+    notify.send('Batería', f"D-Bus: {subscription.received} señales, {subscription.acted} útiles\n"
+                           f"Lecturas de sysfs: {sysfs_reads}\n"
+                           f"Objetos: {', '.join(p.rsplit('/', 1)[-1] for p in subscription.matches)}",
+                app='battery')
+
+def setup(bus):
+    # Initial read, timers and the D-Bus trigger. Needs a running GLib loop.
     global current_state, current_percentage
     
-    DBusGMainLoop(set_as_default=True)
-    bus = dbus.SystemBus()
+    global subscription
     
     # Initial Read
     update_from_sysfs()
     
-    if current_percentage == 0.0:
+    # Listen to UPower just for the trigger, scoped to the power devices
+    try:
+        subscription = UPowerSubscription(bus)
+        subscription.start()
+    except dbus.DBusException:
+        subscription = None # No UPower: uevents and the poll still work
+    
+    if current_percentage == 0.0 and subscription and subscription.battery_path:
         # Emergency DBus Fallback if SysFS didn't work initially
         try:
-             obj_path = "/org/freedesktop/UPower/devices/battery_BAT0"
-             up_obj = bus.get_object("org.freedesktop.UPower", obj_path)
-             iface = dbus.Interface(up_obj, "org.freedesktop.DBus.Properties")
-             current_percentage = float(iface.Get("org.freedesktop.UPower.Device", "Percentage"))
-             state_int = int(iface.Get("org.freedesktop.UPower.Device", "State"))
+             up_obj = bus.get_object(UPOWER, subscription.battery_path)
+             iface = dbus.Interface(up_obj, DBUS_PROPERTIES)
+             current_percentage = float(iface.Get(UPOWER_DEVICE, "Percentage"))
+             state_int = int(iface.Get(UPOWER_DEVICE, "State"))
              current_state = state_int
         except:
              pass
@@ -280,17 +431,27 @@ def main():
     update_timer()
     render()
     
-    # Listen to UPower just for the trigger
-    bus.add_signal_receiver(
-        signal_handler,
-        dbus_interface="org.freedesktop.DBus.Properties",
-        signal_name="PropertiesChanged",
-        path_keyword="path"
-    )
+    # Kernel uevents for power_supply devices (AC plugged, capacity steps)
+    poll_interval = POLL_FALLBACK
+    try:
+        listener = uevent.Listener(["power_supply"])
+        GLib.io_add_watch(listener.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, uevent_handler, listener)
+        poll_interval = POLL_WITH_UEVENTS
+    except OSError:
+        pass
+    
+    # Also force an update from sysfs occasionally (see poll_callback)
+    scheduler.every("poll", poll_interval * 1000 // TICK_MS, poll_callback)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "details":
+        # One-shot: instantaneous power_now only
+        update_from_sysfs()
+        show_details()
+        return
     
-    # Also add a slow timer to force update from sysfs occasionally
-    # incase signals are missed or micro-charging happens silently
-    GLib.timeout_add_seconds(2, lambda: (update_from_sysfs() or True) and (render() or True))
+    DBusGMainLoop(set_as_default=True)
+    setup(dbus.SystemBus())
     
     loop = GLib.MainLoop()
     try:
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+from array import array
+
+# Battery Time-to-Empty / Time-to-Full Estimator
+# Fed with every battery read. The drain (or charge) rate comes from
+# power_now, or from energy_now deltas when the battery doesn't report
+# power. Samples go into a small ring buffer; one far from the window median
+# (a USB device spinning up, a single bogus reading) is rejected, unless it
+# keeps happening, in which case the load really changed and the window
+# restarts from there. Accepted samples update an exponentially weighted
+# rate. Everything is O(WINDOW) per update, no allocation besides a sort of
+# WINDOW floats.
+#
+# Units are the sysfs ones: energy in µWh, power in µW.
+#
+# Usage:
+#   est = Estimator()
+#   est.update(time.monotonic(), charging, energy_now, energy_full, power_now)
+#   est.remaining()  -> seconds, or None while there's no estimate
+
+EWMA_ALPHA = 0.2         # Weight of a new sample
+WINDOW = 16              # Samples kept for outlier rejection
+OUTLIER_FACTOR = 2.5     # Rejected if above median*F or below median/F
+MAX_REJECTED = 3         # More rejections in a row than this: new regime
+MIN_ENERGY_INTERVAL = 20 # s between energy samples (energy_now is coarse)
+
+class Estimator:
+    def __init__(self):
+        self.rates = array('d', bytes(8 * WINDOW))
+        self.reset(None)
+
+    def reset(self, charging):
+        self.charging = charging
+        self.count = 0
+        self.pos = 0
+        self.rate = None       # Smoothed rate (µW)
+        self.rejected = 0
+        self.last_energy = None
+        self.energy_now = 0
+        self.energy_full = 0
+
+    def _push(self, sample):
+        self.rates[self.pos] = sample
+        self.pos = (self.pos + 1) % WINDOW
+        if self.count < WINDOW:
+            self.count += 1
+
+    def _median(self):
+        values = sorted(self.rates[:self.count])
+        return values[self.count // 2]
+
+    def _sample(self, t, energy_now, power_now):
+        if power_now:
+            return abs(power_now)
+        if self.last_energy is None:
+            self.last_energy = (t, energy_now)
+            return None
+        t0, e0 = self.last_energy
+        if t - t0 < MIN_ENERGY_INTERVAL:
+            return None
+        self.last_energy = (t, energy_now)
+        return abs(energy_now - e0) * 3600.0 / (t - t0)
+
+    def update(self, t, charging, energy_now, energy_full, power_now=None):
+        # charging: True / False, None when neither (full, not charging...)
+        if charging != self.charging:
+            self.reset(charging)
+        self.energy_now = energy_now
+        self.energy_full = energy_full
+        if charging is None:
+            return
+
+        sample = self._sample(t, energy_now, power_now)
+        if not sample:
+            return
+
+        if self.count >= 3:
+            median = self._median()
+            if sample > median * OUTLIER_FACTOR or sample < median / OUTLIER_FACTOR:
+                self.rejected += 1
+                if self.rejected <= MAX_REJECTED:
+                    return
+                # It persists: the load changed, start over from this sample
+                self.count = 0
+                self.pos = 0
+                self.rate = None
+        self.rejected = 0
+
+        self._push(sample)
+        if self.rate is None:
+            self.rate = sample
+        else:
+            self.rate += EWMA_ALPHA * (sample - self.rate)
+
+    def remaining(self):
+        # Seconds to empty (discharging) or to full (charging)
+        if not self.rate or self.charging is None:
+            return None
+        energy = self.energy_full - self.energy_now if self.charging else self.energy_now
+        return max(energy, 0) * 3600.0 / self.rate
+
+    def watts(self):
+        return self.rate / 1e6 if self.rate else None
+
+def format_duration(seconds):
+    # 11520 -> "3:12"
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}:{minutes % 60:02d}"
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import struct
+import sys
+import time
+
+# Battery History Store
+# battery-dynamic.py records (timestamp, energy, power, state) once per
+# RECORD_INTERVAL into a fixed-size ring file, so it never grows: 7 days at
+# one record a minute is ~160 KB. Each record is stored straight into the
+# memory-mapped file: no syscall, the kernel writes the page back on its own
+# and it's kept even if the process is killed (SIGTERM from polybar). The
+# mapping is only msync'ed every FLUSH_INTERVAL, and right away when the
+# state changes, so there's no disk write per tick.
+#
+# Layout (little endian):
+#   header  magic "BATH", version u16, record size u16, capacity u32,
+#           next slot u32, count u32, energy_full u32 (µWh), 12 bytes free
+#   record  timestamp u32, energy_now u32 (µWh), power_now i32 (µW),
+#           state u8 (battery-dynamic.py codes), 3 bytes padding
+# Queries scan typed memoryviews over the mapping (no record objects).
+#
+# Usage: ./battery_history.py [report|curve [HOURS]|drain [HOURS]|sessions [N]|export]
+#   report     curve + drain + sessions (default, e.g. a terminal on click)
+#   curve      charge level per hour over the last HOURS (24)
+#   drain      average drain per hour while discharging over the last HOURS (24)
+#   sessions   last N charge sessions (10)
+#   export     all records as CSV (t,energy_now,power_now,status), e.g. for
+#              benchmarks/battery_estimator_bench.py
+
+MAGIC = b"BATH"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIII12x")
+RECORD = struct.Struct("<IIiB3x")
+WORDS = RECORD.size // 4 # u32 words per record
+
+CAPACITY = 7 * 24 * 60 # records
+RECORD_INTERVAL = 60   # s between records (state changes are always recorded)
+FLUSH_INTERVAL = 900   # s between msyncs
+
+# States (same codes as battery-dynamic.py)
+CHARGING, DISCHARGING, FULL = 1, 2, 4
+STATUS_NAMES = {CHARGING: "Charging", DISCHARGING: "Discharging", FULL: "Full"}
+
+BAR_WIDTH = 40
+
+def default_path():
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "polybar", "battery-history.bin")
+
+class Store:
+    def __init__(self, path=None, capacity=CAPACITY, writable=False):
+        self.path = path or default_path()
+        size = HEADER.size + capacity * RECORD.size
+        if writable:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size != size:
+                    # New file, or a different capacity: start over
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0, 0, 0), 0)
+                self.map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+        else:
+            with open(self.path, "rb") as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, self.capacity, self.next, self.count, self.energy_full = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path}: not a battery history file")
+
+        # Typed views over the records: word 4*i is the timestamp of record i...
+        body = memoryview(self.map)[HEADER.size:HEADER.size + self.capacity * RECORD.size]
+        self.words = body.cast("I")
+        self.signed = body.cast("i")
+        self.bytes = body
+
+    def _write_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, self.capacity,
+                         self.next, self.count, self.energy_full)
+
+    def append(self, records, energy_full=None):
+        # records: [(timestamp, energy_now, power_now, state)]
+        for record in records:
+            RECORD.pack_into(self.map, HEADER.size + self.next * RECORD.size, *record)
+            self.next = (self.next + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        if energy_full:
+            self.energy_full = energy_full
+        self._write_header()
+
+    def slots(self, since=0):
+        # Record indexes, oldest first, with timestamp >= since
+        start = (self.next - self.count) % self.capacity
+        words = self.words
+        for k in range(self.count):
+            i = (start + k) % self.capacity
+            if words[i * WORDS] >= since:
+                yield i
+
+    def timestamp(self, i):
+        return self.words[i * WORDS]
+
+    def energy(self, i):
+        return self.words[i * WORDS + 1]
+
+    def power(self, i):
+        return self.signed[i * WORDS + 2]
+
+    def state(self, i):
+        return self.bytes[i * RECORD.size + 12]
+
+    def percent(self, i):
+        return 100.0 * self.energy(i) / self.energy_full if self.energy_full else 0.0
+
+class Recorder:
+    # Records into a Store (opened on the first record), msyncs in batches
+    def __init__(self, path=None):
+        self.path = path
+        self.store = None
+        self.last_record = 0
+        self.last_flush = time.monotonic()
+        self.last_state = None
+
+    def add(self, timestamp, energy_now, power_now, state, energy_full):
+        state_changed = state != self.last_state
+        if not state_changed and timestamp - self.last_record < RECORD_INTERVAL:
+            return
+        self.last_record = timestamp
+        try:
+            if self.store is None:
+                self.store = Store(self.path, writable=True)
+            self.store.append([(int(timestamp), int(energy_now), int(power_now or 0), state)], energy_full)
+        except (OSError, ValueError):
+            pass # No history rather than no battery module
+        if (state_changed and self.last_state is not None) or \
+                time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+        self.last_state = state
+
+    def flush(self):
+        # The records are already in the mapping, this only makes them durable
+        self.last_flush = time.monotonic()
+        if self.store is None:
+            return
+        try:
+            self.store.map.flush()
+        except OSError:
+            pass
+
+# --- Queries ---
+
+def format_time(ts):
+    return time.strftime("%d/%m %H:%M", time.localtime(ts))
+
+def curve(store, hours=24):
+    # Level at the end of each hour, as a horizontal bar
+    now = int(time.time())
+    since = now - hours * 3600
+    buckets = [None] * hours
+    states = [0] * hours
+    for i in store.slots(since):
+        b = min((store.timestamp(i) - since) // 3600, hours - 1)
+        buckets[b] = store.percent(i)
+        states[b] = store.state(i)
+    lines = []
+    for b, pct in enumerate(buckets):
+        label = time.strftime("%H:%M", time.localtime(since + b * 3600))
+        if pct is None:
+            lines.append(f"{label}     -")
+            continue
+        bar = "█" * int(pct * BAR_WIDTH / 100)
+        mark = " ⚡" if states[b] == CHARGING else ""
+        lines.append(f"{label} {pct:4.0f}% {bar}{mark}")
+    return lines
+
+def drain(store, hours=24):
+    # Energy lost between consecutive discharging records / time spent
+    since = int(time.time()) - hours * 3600
+    lost = 0
+    seconds = 0
+    prev = None
+    for i in store.slots(since):
+        if prev is not None and store.state(prev) == DISCHARGING and store.state(i) == DISCHARGING:
+            dt = store.timestamp(i) - store.timestamp(prev)
+            if 0 < dt <= 4 * RECORD_INTERVAL: # Skip suspend gaps
+                lost += store.energy(prev) - store.energy(i)
+                seconds += dt
+        prev = i
+    if not seconds:
+        return None
+    watts = lost / 1e6 * 3600 / seconds
+    pct_per_hour = 100.0 * lost / store.energy_full * 3600 / seconds if store.energy_full else 0.0
+    return watts, pct_per_hour, seconds
+
+def sessions(store, limit=10):
+    # [(start, end, from %, to %)] of the charging runs, most recent last
+    found = []
+    start = prev = None
+    for i in store.slots():
+        charging = store.state(i) == CHARGING
+        if charging and start is None:
+            start = i
+        elif not charging and start is not None:
+            found.append((store.timestamp(start), store.timestamp(i), store.percent(start), store.percent(i)))
+            start = None
+        prev = i
+    if start is not None:
+        found.append((store.timestamp(start), store.timestamp(prev), store.percent(start), store.percent(prev)))
+    return found[-limit:]
+
+def print_drain(store, hours):
+    result = drain(store, hours)
+    if result is None:
+        print(f"Drain (last {hours} h): no discharge recorded")
+        return
+    watts, pct_per_hour, seconds = result
+    print(f"Drain (last {hours} h, {seconds / 3600:.1f} h on battery): {watts:.1f} W, {pct_per_hour:.1f}%/h")
+
+def print_sessions(store, limit):
+    print("Charge sessions:")
+    for start, end, pct_from, pct_to in sessions(store, limit):
+        minutes = (end - start) // 60
+        print(f"  {format_time(start)}  {minutes // 60}:{minutes % 60:02d}  {pct_from:.0f}% -> {pct_to:.0f}%")
+
+def main():
+    args = sys.argv[1:]
+    cmd = args[0] if args else "report"
+    try:
+        store = Store()
+    except (OSError, ValueError) as e:
+        print(f"battery_history: {e}", file=sys.stderr)
+        return 1
+
+    if cmd == "curve":
+        print("\n".join(curve(store, int(args[1]) if len(args) > 1 else 24)))
+    elif cmd == "drain":
+        print_drain(store, int(args[1]) if len(args) > 1 else 24)
+    elif cmd == "sessions":
+        print_sessions(store, int(args[1]) if len(args) > 1 else 10)
+    elif cmd == "export":
+        print("t,energy_now,power_now,status")
+        for i in store.slots():
+            status = STATUS_NAMES.get(store.state(i), "Unknown")
+            print(f"{store.timestamp(i)},{store.energy(i)},{store.power(i)},{status}")
+    elif cmd == "report":
+        print("\n".join(curve(store, 24)))
+        print()
+        print_drain(store, 24)
+        print()
+        print_sessions(store, 10)
+    else:
+        print("usage: battery_history.py [report|curve [HOURS]|drain [HOURS]|sessions [N]|export]", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,8 +18,7 @@ def get_bluetooth_status():
         objects = manager.GetManagedObjects()
     except dbus.exceptions.DBusException:
         # Bluez not running usually means powered off or no service
-        print("%{F#707880}%{F-}")
-        return
+        return "%{F#707880}%{F-}"
 
     # Check Power State (Adapter)
     powered = False
@@ -38,17 +37,17 @@ def get_bluetooth_status():
 
     if not powered:
         # Gray
-        print("%{F#707880}%{F-}")
+        return "%{F#707880}%{F-}"
     elif any_connected:
         # Bright Cyan-Green (More distinct from standard #00BCD4)
-        print("%{F#00FFB3}%{F-}")
+        return "%{F#00FFB3}%{F-}"
     else:
         # Default
-        print("")
+        return ""
 
 if __name__ == "__main__":
     try:
-        get_bluetooth_status()
+        print(get_bluetooth_status())
     except Exception:
         # Fallback to default if DBus fails completely
         print("")
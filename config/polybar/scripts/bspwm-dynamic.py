@@ -5,18 +5,34 @@ import socket
 import os
 import sys
 import math
+import time
+
+import bspwm_ipc
+import fanout
+import gradients
+
+# Fan-out socket name and the key for the all-monitors rendering
+FANOUT_NAME = "bspwm"
+ALL_MONITORS = "*"
 
 # Dynamic BSPWM for Polybar
 # Features:
 # - Heatmap color for occupied workspaces (White -> Red) based on window count.
 # - Consistent icons with existing config (Filled circle, Open circle, etc.)
+#
+# Usage:
+#   bspwm-dynamic.py                  All desktops of all monitors (single bar)
+#   bspwm-dynamic.py --producer       Keep the state once, publish one line per monitor
+#   bspwm-dynamic.py --monitor NAME   Thin reader for the bar on monitor NAME
+#                                     (starts the producer if it isn't running)
 
 # Colors
 COLOR_FOCUSED = "#00BCD4" # Primary
 COLOR_URGENT = "#cb0e0eff" # Alert
 COLOR_EMPTY = "#333333" # Disbaled
-COLOR_WHITE = (255, 255, 255)
-COLOR_RED = (255, 0, 0)
+FG_FOCUSED = f"%{{F{COLOR_FOCUSED}}}"
+FG_URGENT = f"%{{F{COLOR_URGENT}}}"
+FG_EMPTY = f"%{{F{COLOR_EMPTY}}}"
 
 # Icons
 ICON_FOCUSED = ""
@@ -24,129 +40,262 @@ ICON_OCCUPIED = ""
 ICON_EMPTY = ""
 ICON_URGENT = ""
 
-def hex_to_rgb(hex_col):
-    h = hex_col.lstrip('#')
-    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+# Heatmap: precomputed '%{F#rrggbb}' codes, window count 1 (White) .. 5+ (Red)
+HEAT_COLORS = gradients.WINDOW_HEAT.codes
 
-def rgb_to_hex(rgb):
-    return "#%02x%02x%02x" % rgb
-
-def interpolate_color(count):
-    # Map count 1..5 to White..Red
-    # 1 -> 0% Red
-    # 5 -> 100% Red
-    
-    if count <= 1:
-        return rgb_to_hex(COLOR_WHITE)
-    if count >= 5:
-        return rgb_to_hex(COLOR_RED)
-        
-    # Steps: 2, 3, 4
-    # Progress:
-    # 1 -> 0.0
-    # 2 -> 0.25
-    # 3 -> 0.5
-    # 4 -> 0.75
-    # 5 -> 1.0
-    
-    t = (count - 1) / 4.0
-    
-    r = int(COLOR_WHITE[0] + (COLOR_RED[0] - COLOR_WHITE[0]) * t)
-    g = int(COLOR_WHITE[1] + (COLOR_RED[1] - COLOR_WHITE[1]) * t)
-    b = int(COLOR_WHITE[2] + (COLOR_RED[2] - COLOR_WHITE[2]) * t)
-    
-    return rgb_to_hex((r, g, b))
+def heat_color(count):
+    return HEAT_COLORS[count if count < len(HEAT_COLORS) else -1]
 
 def get_state():
     try:
         # Check if bspwm socket exists
-        # We use 'bspc wm -d' to get full JSON dump
-        output = subprocess.check_output(["bspc", "wm", "-d"], text=True)
+        # We use 'wm -d' to get full JSON dump (straight from the socket, no bspc fork)
+        output = bspwm_ipc.client().send("wm", "-d")
         dump = json.loads(output)
         return dump
     except Exception as e:
         return None
 
-def generate_polybar_string(dump):
-    if not dump: return ""
-    
-    monitors = dump.get("monitors", [])
-    
-    # Sort desktops? Usually they are ordered.
-    # We want to iterate desktops in global order or per monitor?
-    # Polybar internal/bspwm usually shows all or per monitor.
-    # We will show ALL for simplicity, or filter if requested.
+def count_windows(node):
+    c = 0
+    if not node: return 0
+    if node.get('client'): c += 1
+    c += count_windows(node.get('firstChild'))
+    c += count_windows(node.get('secondChild'))
+    return c
+
+# --- Report Model ---
+# 'bspc subscribe report' prints one line per state change, e.g.:
+#   WMeDP-1:OI:oII:fIII:LT:TT:G:mHDMI-1:FIV:uV:LM:TF:G
+# Fields are separated by ':' (the first one carries the 'W' prefix):
+# - M/m: focused/unfocused monitor
+# - O/o: occupied desktop (focused/unfocused on its monitor)
+# - F/f: free desktop (focused/unfocused on its monitor)
+# - U/u: urgent desktop (focused/unfocused on its monitor)
+# - L/T/G: layout, state and flags of the monitor's focused desktop (ignored)
+# The line tells us focus, occupancy and urgency of every desktop; window
+# counts for the heatmap come from the WindowIndex below.
+
+def parse_report(line):
+    line = line.strip()
+    if not line.startswith('W'):
+        return None
+
+    monitors = []
+    mon = None
+
+    for field in line[1:].split(':'):
+        if not field:
+            continue
+        kind = field[0]
+        name = field[1:]
+
+        if kind in 'Mm':
+            mon = {"name": name, "focused": kind == 'M', "desktops": []}
+            monitors.append(mon)
+        elif kind in 'OoFfUu' and mon is not None:
+            mon["desktops"].append({
+                "name": name,
+                "focused": kind in 'OFU',
+                "occupied": kind in 'OoUu',
+                "urgent": kind in 'Uu',
+            })
+        # L, T, G: not used for rendering
+
+    return monitors
+
+def report_layout(monitors):
+    # Monitor and desktop names only. If this changes, a desktop was
+    # added, removed or renamed and the window index must be rebuilt.
+    return tuple((mon["name"], tuple(d["name"] for d in mon["desktops"])) for mon in monitors)
+
+# --- Window Index ---
+# Per-desktop window count, urgent, fullscreen and sticky totals, kept
+# current from node events so the heatmap never walks the tree:
+#   node_add <monitor_id> <desktop_id> <ip_id> <node_id>
+#   node_remove <monitor_id> <desktop_id> <node_id>
+#   node_transfer <src_mon> <src_desk> <src_node> <dst_mon> <dst_desk> <dst_node>
+#   node_swap <src_mon> <src_desk> <src_node> <dst_mon> <dst_desk> <dst_node>
+#   node_flag <monitor_id> <desktop_id> <node_id> <flag> on|off
+#   node_state <monitor_id> <desktop_id> <node_id> <state> on|off
+# Ids are printed as hex (0x01C00003), the JSON dump uses integers.
+
+NODE_EVENTS = ["node_add", "node_remove", "node_transfer", "node_swap", "node_flag", "node_state"]
+
+# Columns of the per-window and per-desktop entries
+COUNT, URGENT, FULLSCREEN, STICKY = 0, 1, 2, 3
+
+def is_window(node_id):
+    # True for a leaf window, False for a receptacle, None if bspwm can't tell
+    try:
+        return bool(bspwm_ipc.client().send("query", "-N", "-n", f"0x{node_id:08X}.window").strip())
+    except bspwm_ipc.BspwmError:
+        return False
+    except OSError:
+        return None
+
+class WindowIndex:
+    def __init__(self):
+        self.windows = {}  # node id -> [desktop id, urgent, fullscreen, sticky]
+        self.desktops = {} # desktop id -> [count, urgent, fullscreen, sticky]
+        self.keys = {}     # (monitor name, desktop name) -> desktop id
+        self.valid = False
+
+    def rebuild(self, dump):
+        # Full tree walk. Only at startup, on desktop add/rename and when
+        # the event stream was interrupted or an event can't be applied.
+        self.windows = {}
+        self.desktops = {}
+        self.keys = {}
+        self.valid = dump is not None
+        if not dump: return
+
+        for mon in dump.get("monitors", []):
+            for desk in mon['desktops']:
+                self.keys[(mon['name'], desk['name'])] = desk['id']
+                self.desktops[desk['id']] = [0, 0, 0, 0]
+                self._walk(desk.get('root'), desk['id'])
+
+    def _walk(self, node, desk_id):
+        if not node: return
+        client = node.get('client')
+        if client:
+            self._insert(node['id'], desk_id,
+                         bool(client.get('urgent')),
+                         client.get('state') == 'fullscreen',
+                         bool(node.get('sticky')))
+        self._walk(node.get('firstChild'), desk_id)
+        self._walk(node.get('secondChild'), desk_id)
+
+    def _insert(self, node_id, desk_id, urgent=False, fullscreen=False, sticky=False):
+        entry = [desk_id, int(urgent), int(fullscreen), int(sticky)]
+        self.windows[node_id] = entry
+        totals = self.desktops.setdefault(desk_id, [0, 0, 0, 0])
+        totals[COUNT] += 1
+        for col in (URGENT, FULLSCREEN, STICKY):
+            totals[col] += entry[col]
+
+    def _drop(self, node_id):
+        entry = self.windows.pop(node_id, None)
+        if entry is None: return None
+        totals = self.desktops.get(entry[0])
+        if totals:
+            totals[COUNT] -= 1
+            for col in (URGENT, FULLSCREEN, STICKY):
+                totals[col] -= entry[col]
+        return entry
+
+    def _move(self, node_id, desk_id):
+        entry = self._drop(node_id)
+        self._insert(node_id, desk_id, entry[URGENT], entry[FULLSCREEN], entry[STICKY])
+
+    def _set(self, node_id, col, on):
+        entry = self.windows.get(node_id)
+        if entry is None: return
+        value = int(on)
+        totals = self.desktops.setdefault(entry[0], [0, 0, 0, 0])
+        totals[col] += value - entry[col]
+        entry[col] = value
+
+    def apply(self, fields):
+        # Returns True if the event may change the rendering
+        event = fields[0]
+        try:
+            ids = [int(f, 16) for f in fields[1:] if f.startswith('0x')]
+
+            if event == "node_add":
+                # A receptacle is added the same way: only count leaf windows
+                window = is_window(ids[3])
+                if window is None:
+                    self.valid = False
+                elif not window:
+                    return False
+                else:
+                    self._insert(ids[3], ids[1])
+            elif event == "node_remove":
+                # Not a window we know: an internal node (whole subtree gone)
+                if self._drop(ids[2]) is None:
+                    self.valid = False
+            elif event in ("node_transfer", "node_swap"):
+                src_node, dst_desk, dst_node = ids[2], ids[4], ids[5]
+                if ids[1] == dst_desk:
+                    return False
+                # A receptacle or an internal node (whole subtree): we don't
+                # know which windows are below it, walk the tree again.
+                if src_node not in self.windows or (event == "node_swap" and dst_node not in self.windows):
+                    self.valid = False
+                    return True
+                self._move(src_node, dst_desk)
+                if event == "node_swap":
+                    self._move(dst_node, ids[1])
+            elif event == "node_flag":
+                flag, on = fields[4], fields[5] == "on"
+                if flag == "urgent":
+                    self._set(ids[2], URGENT, on)
+                elif flag == "sticky":
+                    self._set(ids[2], STICKY, on)
+                else:
+                    return False
+            elif event == "node_state":
+                state, on = fields[4], fields[5] == "on"
+                if state != "fullscreen":
+                    return False
+                self._set(ids[2], FULLSCREEN, on)
+            else:
+                return False
+        except (IndexError, ValueError, TypeError):
+            self.valid = False
+        return True
+
+    def totals(self, mon_name, desk_name):
+        desk_id = self.keys.get((mon_name, desk_name))
+        return self.desktops.get(desk_id, (0, 0, 0, 0))
+
+def generate_polybar_string(monitors, index, per_monitor=False):
+    if not monitors: return ""
     
     output = []
     
-    # We need to know which desktop is focused globally or per monitor
-    # dump['focusedMonitorId']
-    
     for mon in monitors:
-        focused_desktop_id = mon['focusedDesktopId']
-        
-        for desk in mon['desktops']:
-            name = desk['name']
+        for desk in mon["desktops"]:
+            name = desk["name"]
             
             # State detection
-            is_focused = (desk['id'] == focused_desktop_id) and (mon['id'] == dump['focusedMonitorId'])
-            # Actually focusedDesktopId is per monitor. 
-            # If (monitor is focused) AND (desktop is focused), then Global Focus.
-            # But usually we highlight the focused desktop on EACH monitor?
-            # Polybar 'internal/bspwm' highlights focused desktop of the monitor the bar is on.
-            # Since this is a custom script running ONCE, it displays globally?
-            # Polybar custom script module has no knowledge of which monitor it is on easily.
-            # We will render ALL desktops.
-            
-            # Check occupied
-            root = desk.get('root')
-            window_count = 0
-            
-            if root:
-                # Count leaves (windows) recursively?
-                # Faster: bspc query -N -n .window -d NAME | wc -l
-                # But calling bspc for each desktop is slow.
-                # Let's verify if 'root' implies occupied. Yes.
-                # To get count, we need to traverse JSON or use bspc.
-                # Traversing JSON is instant.
-                
-                def count_windows(node):
-                    c = 0
-                    if not node: return 0
-                    if node.get('client'): c += 1
-                    c += count_windows(node.get('firstChild'))
-                    c += count_windows(node.get('secondChild'))
-                    return c
-                
-                window_count = count_windows(root)
-            
-            is_occupied = (window_count > 0)
-            is_urgent = False # Need to check separate urgency flags? 'client.urgent'
-            # Urgency in JSON matches 'urgent' property in client?
-            # We skip detailed urgency check for speed unless requested.
+            # Report flags are per monitor. If (monitor is focused) AND
+            # (desktop is focused), then Global Focus.
+            # A per-monitor bar highlights the focused desktop of its own
+            # monitor, like polybar's 'internal/bspwm'.
+            is_focused = desk["focused"] and (per_monitor or mon["focused"])
+            totals = index.totals(mon["name"], name)
+            is_urgent = desk["urgent"] or totals[URGENT] > 0
+            window_count = totals[COUNT]
+            is_occupied = desk["occupied"] or window_count > 0
             
             # Icon & Color
             icon = ICON_EMPTY
-            color = COLOR_EMPTY
+            color = FG_EMPTY
             padding = 1
             
             # Priority: Focused > Urgent > Occupied > Empty
             if is_focused:
                 icon = ICON_FOCUSED
-                color = COLOR_FOCUSED
+                color = FG_FOCUSED
+            elif is_urgent:
+                icon = ICON_URGENT
+                color = FG_URGENT
             elif is_occupied:
                 icon = ICON_OCCUPIED
                 # Heatmap Logic
-                color = interpolate_color(window_count)
+                color = heat_color(window_count)
             else:
                 icon = ICON_EMPTY
-                color = COLOR_EMPTY # Gray ring
+                color = FG_EMPTY # Gray ring
             
             # Format
             # Click action: focus desktop
             # %{A1:bspc desktop -f NAME:} ... %{A}
             
-            item = f"%{{A1:bspc desktop -f {name}:}}%{{F{color}}}{icon}%{{F-}}%{{A}}"
+            item = f"%{{A1:bspc desktop -f {name}:}}{color}{icon}%{{F-}}%{{A}}"
             
             # Add padding
             item = f" {item} "
@@ -155,23 +304,112 @@ def generate_polybar_string(dump):
             
     return "".join(output)
 
-def main():
+def run(emit):
     # Listen to events
-    # We can perform a loop with 'bspc subscribe report' which is efficient
+    # 'subscribe report' is efficient: every line already carries the
+    # whole desktop state, so we parse it instead of dumping the tree.
+    # Node events on the same subscription keep the window index current.
+    # Both go through one persistent connection to the bspwm socket.
+    # emit(monitors, index) is called whenever the state may have changed.
     
-    process = subprocess.Popen(
-        ["bspc", "subscribe", "report"],
-        stdout=subprocess.PIPE,
-        text=True
-    )
+    index = WindowIndex()
+    monitors = None
+    layout = None
+    last_line = None
     
-    # Initial print
-    print(generate_polybar_string(get_state()), flush=True)
+    while True:
+        try:
+            for line in bspwm_ipc.client().subscribe("report", *NODE_EVENTS):
+                if line.startswith('W'):
+                    # 'report' covers focus change, window open/close/move
+                    # bspwm repeats identical reports (e.g. a window opened on the
+                    # focused desktop), nothing to do for those.
+                    if line == last_line:
+                        continue
+                    last_line = line
+                    
+                    new_monitors = parse_report(line)
+                    if not new_monitors:
+                        continue
+                    monitors = new_monitors
+                    
+                    # Full dump only at startup or when a desktop was added/renamed
+                    new_layout = report_layout(monitors)
+                    if new_layout != layout:
+                        index.valid = False
+                        layout = new_layout
+                else:
+                    fields = line.split()
+                    if not fields or not index.apply(fields):
+                        continue
+                
+                if monitors is None:
+                    continue
+                
+                if not index.valid:
+                    index.rebuild(get_state())
+                
+                emit(monitors, index)
+        except (OSError, bspwm_ipc.BspwmError):
+            pass
+        
+        # Event stream interrupted (bspwm restarted?): anything may have
+        # changed meanwhile, walk the whole tree once we're back.
+        index.valid = False
+        last_line = None
+        time.sleep(1)
+
+def publish_monitors(publish):
+    # Producer: one rendering per monitor plus the all-monitors one.
+    # publish(key, line) skips unchanged lines.
+    def emit(monitors, index):
+        publish(ALL_MONITORS, generate_polybar_string(monitors, index))
+        for mon in monitors:
+            publish(mon["name"], generate_polybar_string([mon], index, per_monitor=True))
+    return emit
+
+def start_producer():
+    # Detached, so it outlives the bar that started it
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--producer"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+def run_reader(monitor):
+    key = monitor or ALL_MONITORS
+    while True:
+        try:
+            fanout.attach(FANOUT_NAME, key)
+        except OSError:
+            # No producer yet (or it just died): start one. If several bars
+            # race here, the producer lock keeps a single instance.
+            start_producer()
+        time.sleep(0.5)
+
+def main():
+    args = sys.argv[1:]
     
-    for line in process.stdout:
-        # On any report event, re-generate string
-        # 'report' covers focus change, window open/close/move
-        print(generate_polybar_string(get_state()), flush=True)
+    if args[:1] == ["--producer"]:
+        server = fanout.Server(FANOUT_NAME)
+        if not server.start():
+            return # Already running
+        run(publish_monitors(server.publish))
+    elif args[:1] == ["--monitor"]:
+        run_reader(args[1] if len(args) > 1 else "")
+    else:
+        last_output = None
+        
+        def emit(monitors, index):
+            nonlocal last_output
+            output = generate_polybar_string(monitors, index)
+            if output != last_output:
+                print(output, flush=True)
+                last_output = output
+        
+        run(emit)
 
 if __name__ == "__main__":
     main()
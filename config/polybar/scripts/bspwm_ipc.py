@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import os
+import socket
+import sys
+
+# Native BSPWM Socket Client
+# Talks to the bspwm socket directly instead of forking 'bspc' per call.
+# - Queries: bspwm answers one message per connection and closes it, so the
+#   resolved socket address is kept and each call is a connect + send + recv
+#   (no fork, no exec).
+# - Subscriptions: one persistent connection, lines are yielded as they come.
+#
+# Usage (CLI, same arguments as bspc):
+#   bspwm_ipc.py desktop -f last
+#   bspwm_ipc.py desktop -f next.occupied.local --or desktop -f next.occupied
+#   bspwm_ipc.py --each query -N -d -- node {} -p cancel
+
+FAILURE_MESSAGE = "\x07"
+BUFSIZE = 65536
+
+class BspwmError(Exception):
+    pass
+
+def socket_path():
+    # Same rules as bspc: $BSPWM_SOCKET, else derived from $DISPLAY
+    path = os.environ.get("BSPWM_SOCKET")
+    if path:
+        return path
+
+    display = os.environ.get("DISPLAY", ":0")
+    host, _, rest = display.rpartition(":")
+    dn, _, sn = rest.partition(".")
+    try:
+        dn = int(dn or 0)
+        sn = int(sn or 0)
+    except ValueError:
+        dn, sn = 0, 0
+    return f"/tmp/bspwm{host}_{dn}_{sn}-socket"
+
+def encode(args):
+    # Every argument is NUL terminated
+    return b"".join(str(a).encode() + b"\0" for a in args)
+
+class Client:
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def send(self, *args):
+        # Run one command, return its output (raises BspwmError on failure)
+        sock = self._connect()
+        try:
+            sock.sendall(encode(args))
+            chunks = []
+            while True:
+                data = sock.recv(BUFSIZE)
+                if not data:
+                    break
+                chunks.append(data)
+        finally:
+            sock.close()
+
+        rsp = b"".join(chunks).decode(errors="replace")
+        if rsp.startswith(FAILURE_MESSAGE):
+            raise BspwmError(rsp[1:].strip())
+        return rsp
+
+    def lines(self, *args):
+        return self.send(*args).splitlines()
+
+    def subscribe(self, *events):
+        # Generator over event lines (persistent connection).
+        # Ends when bspwm closes the socket.
+        sock = self._connect()
+        try:
+            sock.sendall(encode(("subscribe",) + events))
+            stream = sock.makefile("r", encoding="utf-8", errors="replace")
+            for line in stream:
+                if line.startswith(FAILURE_MESSAGE):
+                    raise BspwmError(line[1:].strip())
+                yield line
+        finally:
+            sock.close()
+
+# Shared default client
+_client = None
+
+def client():
+    global _client
+    if _client is None:
+        _client = Client()
+    return _client
+
+def split_alternatives(argv):
+    groups = [[]]
+    for arg in argv:
+        if arg == "--or":
+            groups.append([])
+        else:
+            groups[-1].append(arg)
+    return [g for g in groups if g]
+
+def run_each(c, argv):
+    # --each QUERY... -- COMMAND... ({} is replaced by every line of QUERY)
+    if "--" not in argv:
+        print("bspwm_ipc: --each needs '--' before the command", file=sys.stderr)
+        return 1
+    sep = argv.index("--")
+    query, template = argv[:sep], argv[sep + 1:]
+
+    try:
+        items = c.lines(*query)
+    except BspwmError:
+        return 1 # Nothing matched: quiet, like 'bspc query'
+    status = 0
+    for item in items:
+        try:
+            sys.stdout.write(c.send(*[a.replace("{}", item) for a in template]))
+        except BspwmError as e:
+            print(e, file=sys.stderr)
+            status = 1
+    return status
+
+def main(argv):
+    if not argv:
+        print("usage: bspwm_ipc.py ARGS... [--or ARGS...] | --each QUERY... -- COMMAND...", file=sys.stderr)
+        return 1
+
+    c = client()
+    try:
+        if argv[0] == "--each":
+            return run_each(c, argv[1:])
+
+        if argv[0] == "subscribe":
+            for line in c.subscribe(*argv[1:]):
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            return 0
+
+        # Alternatives: run the next one only if the previous failed
+        # (same as 'bspc A || bspc B' with a single process)
+        error = None
+        for args in split_alternatives(argv):
+            try:
+                sys.stdout.write(c.send(*args))
+                return 0
+            except BspwmError as e:
+                error = e
+        print(error, file=sys.stderr)
+        return 1
+    except (BrokenPipeError, KeyboardInterrupt):
+        return 0
+    except BspwmError as e:
+        print(e, file=sys.stderr) # e.g. subscribe to an unknown event
+        return 1
+    except OSError as e:
+        print(f"bspwm_ipc: {c.path}: {e.strerror}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
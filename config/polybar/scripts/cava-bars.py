@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import atexit
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import audio_events
+import fanout
+
+# In-Bar Audio Visualizer for Polybar
+# Runs cava with raw 8-bit output (one byte per bar, see cava.conf) into a
+# FIFO and draws the bars with block characters at FPS. Every tick drains
+# the FIFO into a reused buffer and keeps only the newest complete frame, so
+# when the bar falls behind the stale frames are dropped, not queued. A
+# frame is turned into text with two translate() calls (byte -> level ->
+# glyph), no Python loop over the bars. During silence the module is
+# cleared once; cava then stops writing (sleep_timer) and the script sleeps
+# on the FIFO until there's sound again.
+# cava is restarted on the monitor of the new default sink when it changes
+# (audio_events.py), like cava-dynamic.py does for the cava window.
+# One process (FIFO, cava) per bar, not a polybar-host.py slot: a bar that
+# can't keep up only holds back its own copy.
+#
+# Usage (polybar, tail = true): ./cava-bars.py
+
+# Configuration
+BARS = 8
+FPS = 30
+GLYPHS = "▁▂▃▄▅▆▇█"
+COLOR = "%{F#00BCD4}" # Turquoise, like the volume icon
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cava.conf")
+MAX_FRAMES_PER_READ = 64
+
+# 0..255 -> "0".."7" -> glyph
+LEVELS = bytes(ord("0") + v * len(GLYPHS) // 256 for v in range(256))
+GLYPH_TABLE = str.maketrans({str(i): glyph for i, glyph in enumerate(GLYPHS)})
+
+class FrameReader:
+    # Newest complete frame of a raw 8-bit cava stream (non-blocking fd)
+    def __init__(self, fd, size):
+        self.fd = fd
+        self.size = size
+        self.buf = bytearray(size * MAX_FRAMES_PER_READ)
+        self.view = memoryview(self.buf)
+        self.fill = 0 # Bytes of an incomplete frame at the start of buf
+
+    def reset(self):
+        self.fill = 0
+
+    def latest(self):
+        # bytes of the newest frame read now, None if no complete frame came
+        newest = None
+        while True:
+            try:
+                n = os.readv(self.fd, [self.view[self.fill:]])
+            except BlockingIOError:
+                break
+            if n == 0:
+                break
+            total = self.fill + n
+            full = total - total % self.size
+            if full:
+                newest = bytes(self.view[full - self.size:full])
+            self.fill = total - full
+            self.buf[:self.fill] = self.view[full:total]
+        return newest
+
+def render(frame):
+    # "" for silence (all bars at 0)
+    if frame.count(0) == len(frame):
+        return ""
+    return COLOR + frame.translate(LEVELS).decode("ascii").translate(GLYPH_TABLE) + "%{F-}"
+
+def emit(line):
+    print(line, flush=True)
+
+def play(reader, running, wake=()):
+    # Fixed rate while frames flow; after a stall it carries on from now
+    # instead of catching up. When the FIFO runs dry (cava asleep in the
+    # silence) it blocks until the next frame or a wake fd (cava exiting).
+    period = 1.0 / FPS
+    next_tick = time.monotonic()
+    last = None
+    while running():
+        frame = reader.latest()
+        if frame is None:
+            select.select([reader.fd, *wake], [], [])
+            next_tick = time.monotonic()
+            continue
+        line = render(frame)
+        if line != last:
+            emit(line)
+            last = line
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.monotonic()
+
+def write_config(path, fifo, source):
+    # cava.conf with this FIFO and source
+    lines = []
+    with open(TEMPLATE) as f:
+        for line in f:
+            key = line.split("=")[0].strip()
+            if key == "raw_target":
+                line = f"raw_target = {fifo}\n"
+            elif key == "source":
+                line = f"source = {source}\n"
+            elif key == "bars":
+                line = f"bars = {BARS}\n"
+            elif key == "framerate":
+                line = f"framerate = {FPS}\n"
+            lines.append(line)
+    with open(path, "w") as f:
+        f.writelines(lines)
+    return path
+
+class Cava:
+    def __init__(self):
+        self.source = "auto"
+        self.proc = None
+        self.have_monitor = threading.Event()
+        base = os.path.join(fanout.runtime_dir(), f"cava-bars-{os.getpid()}")
+        self.fifo = base + ".fifo"
+        self.config = base + ".conf"
+
+    def cleanup(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+        for path in (self.fifo, self.config):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def follow_monitor(self):
+        # Restart cava on the monitor of the new default sink
+        for monitor in audio_events.subscribe("monitor"):
+            if monitor and monitor != self.source:
+                self.source = monitor
+                if self.proc is not None:
+                    self.proc.terminate()
+            self.have_monitor.set()
+
+    def run(self):
+        atexit.register(self.cleanup)
+        os.mkfifo(self.fifo, 0o600)
+        # Read-write: never blocks on open and never sees EOF between cava runs
+        fd = os.open(self.fifo, os.O_RDWR | os.O_NONBLOCK)
+        reader = FrameReader(fd, BARS)
+        threading.Thread(target=self.follow_monitor, daemon=True).start()
+        self.have_monitor.wait(1) # Else 'auto' until the router answers
+        while True:
+            started = time.monotonic()
+            write_config(self.config, self.fifo, self.source)
+            try:
+                self.proc = subprocess.Popen(["cava", "-p", self.config],
+                                             stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL)
+            except FileNotFoundError:
+                emit("") # cava not installed: empty module
+                return
+            exited = os.pidfd_open(self.proc.pid)
+            try:
+                play(reader, lambda: self.proc.poll() is None, (exited,))
+            finally:
+                os.close(exited)
+            emit("")
+            reader.latest() # Drop what's left of this run
+            reader.reset()
+            if time.monotonic() - started < 2:
+                time.sleep(2) # Crashing at start (bad source...): don't spin
+
+def watch():
+    # Entry point
+    Cava().run()
+
+def main():
+    # polybar stops the script with SIGTERM: go through atexit (cava, FIFO)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        watch()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
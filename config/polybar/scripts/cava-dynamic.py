@@ -1,31 +1,16 @@
 #!/usr/bin/env python3
 import subprocess
 import os
-import time
-import re
+
+import audio_events
 
 # Cava Dynamic Input Switcher
-# Monitors PulseAudio events. When default sink changes, updates Cava config to listen to that sink's monitor.
+# Follows the default sink through the shared event router (audio_events.py).
+# When it changes, updates Cava config to listen to that sink's monitor.
 # Prevents fallback to Microphone.
 
 CONFIG_PATH = os.path.expanduser("~/.config/cava/config")
 
-def get_default_sink_monitor():
-    try:
-        # Get default sink name
-        sink_name = subprocess.check_output(["pactl", "get-default-sink"], text=True).strip()
-        
-        # Get monitor of that sink
-        # Usually it is simply <sink_name>.monitor, but let's verify using list-sinks
-        sinks_output = subprocess.check_output(["pactl", "list", "sinks", "short"], text=True)
-        
-        # Check if sink exists and get monitor name convention?
-        # PulseAudio convention: monitor source is named "<sink_name>.monitor"
-        monitor_name = f"{sink_name}.monitor"
-        return monitor_name
-    except:
-        return None
-
 def update_cava_config(monitor_name):
     if not monitor_name: return
     
@@ -53,26 +38,13 @@ def update_cava_config(monitor_name):
         subprocess.run(["pkill", "-USR1", "cava"])
 
 def main():
-    # Initial setup
-    current_monitor = get_default_sink_monitor()
-    update_cava_config(current_monitor)
-    
-    # Listen loop
-    process = subprocess.Popen(
-        ["pactl", "subscribe"],
-        stdout=subprocess.PIPE,
-        text=True
-    )
-    
-    for line in process.stdout:
-        # Event 'change' on 'server' or 'sink' usually implies default might have changed or sink appeared
-        if "sink" in line or "server" in line:
-            # Wait a split second for PA to stabilize
-            time.sleep(0.5)
-            new_monitor = get_default_sink_monitor()
-            if new_monitor and new_monitor != current_monitor:
-                update_cava_config(new_monitor)
-                current_monitor = new_monitor
+    # The router sends the current monitor first, then one line per change
+    # (merged per burst, so no waiting for PA to stabilize here)
+    current_monitor = None
+    for monitor in audio_events.subscribe("monitor"):
+        if monitor and monitor != current_monitor:
+            update_cava_config(monitor)
+            current_monitor = monitor
 
 if __name__ == "__main__":
     main()
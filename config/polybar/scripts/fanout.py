@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+import fcntl
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+
+# Line Fan-out over a Unix Socket
+# One producer process keeps the state and publishes ready-to-print lines
+# under a key (e.g. a monitor name). Each bar runs a thin reader that
+# subscribes to its key and copies the lines to stdout for polybar.
+#
+# Protocol (one request line per connection):
+#   sub <key>          -> latest line for <key>, then every new one. A reader
+#                         that stops reading is disconnected once its socket
+#                         buffer is full (the producer never waits on it); it
+#                         gets the latest line again when it reconnects.
+#   act <key> <args>   -> calls the producer's action handler, one reply line
+#                         ('error' if the handler raised)
+#
+# Usage (CLI reader, e.g. 'exec' of a polybar module with tail = true):
+#   fanout.py NAME KEY     (reconnects if the producer restarts)
+
+def runtime_dir():
+    base = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/polybar-{os.getuid()}"
+    path = os.path.join(base, "polybar")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+def socket_path(name):
+    return os.path.join(runtime_dir(), f"{name}.sock")
+
+class Server:
+    def __init__(self, name, on_action=None):
+        self.path = socket_path(name)
+        self.on_action = on_action
+        self.latest = {}      # key -> last published line
+        self.clients = {}     # key -> [sockets]
+        self.lock = threading.Lock()
+        self.sock = None
+        self.lock_fd = None
+
+    def start(self):
+        # Only one producer per name: the lock is released when the process dies,
+        # so a stale socket file left behind is safe to replace.
+        self.lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+            return False
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen(16)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return True
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            conn.settimeout(2)
+            request = conn.makefile("r", encoding="utf-8").readline().strip()
+            verb, _, rest = request.partition(" ")
+
+            if verb == "sub":
+                key = rest
+                conn.setblocking(False)
+                with self.lock:
+                    line = self.latest.get(key)
+                    if line is not None and not self._send(conn, line.encode() + b"\n"):
+                        return # Dropped (closed by _send)
+                    self.clients.setdefault(key, []).append(conn)
+                return
+
+            if verb == "act":
+                key, _, args = rest.partition(" ")
+                reply = ""
+                if self.on_action:
+                    try:
+                        reply = self.on_action(key, args.split()) or ""
+                    except Exception:
+                        # A failing action must not take the connection thread down silently
+                        print(f"fanout: {self.path}: act {key}: {traceback.format_exc().strip()}",
+                              file=sys.stderr, flush=True)
+                        reply = "error"
+                conn.sendall(str(reply).encode() + b"\n")
+        except OSError:
+            pass
+        conn.close()
+
+    def _send(self, conn, data):
+        # Non-blocking: False (and the reader is dropped) if it doesn't all fit
+        try:
+            if conn.send(data) == len(data):
+                return True
+        except OSError:
+            pass
+        conn.close()
+        return False
+
+    def publish(self, key, line):
+        # Thread safe. Identical lines are not re-sent.
+        with self.lock:
+            if self.latest.get(key) == line:
+                return
+            self.latest[key] = line
+            data = line.encode() + b"\n"
+            self.clients[key] = [conn for conn in self.clients.get(key, []) if self._send(conn, data)]
+
+def connect(name, request):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path(name))
+        sock.sendall(request.encode() + b"\n")
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def action(name, key, *args):
+    # Send an action to a running producer, returns its reply line
+    with connect(name, " ".join(("act", key) + args)) as sock:
+        return sock.makefile("r", encoding="utf-8").readline().strip()
+
+def attach(name, key, out=sys.stdout):
+    # Copy the lines for <key> to <out> until the producer goes away
+    with connect(name, f"sub {key}") as sock:
+        for line in sock.makefile("r", encoding="utf-8"):
+            out.write(line)
+            out.flush()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: fanout.py NAME KEY", file=sys.stderr)
+        sys.exit(1)
+    try:
+        while True:
+            try:
+                attach(sys.argv[1], sys.argv[2])
+            except OSError:
+                pass
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
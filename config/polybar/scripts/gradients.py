@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Shared Colour Gradients for the Bar Modules
+# Gradients are defined once as stops and turned into lookup tables of
+# ready-to-print '%{F#rrggbb}' strings at import time, so rendering a frame
+# is an index into a list (no float math, no string formatting).
+#
+# Stops are (position, (r, g, b)). Repeating a position makes a hard edge:
+# the value exactly at the edge takes the colour of the earlier stop.
+
+def hex_to_rgb(hex_col):
+    h = hex_col.lstrip('#')
+    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+
+def rgb_to_hex(rgb):
+    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+
+def fg(rgb):
+    return f"%{{F{rgb_to_hex(rgb)}}}"
+
+def interpolate(start_color, end_color, t):
+    return tuple(int(s + (e - s) * t) for s, e in zip(start_color, end_color))
+
+def color_at(stops, x):
+    if x <= stops[0][0]:
+        return stops[0][1]
+    for (p0, c0), (p1, c1) in zip(stops, stops[1:]):
+        if x <= p1:
+            if p1 == p0:
+                return c0
+            return interpolate(c0, c1, (x - p0) / (p1 - p0))
+    return stops[-1][1]
+
+class Gradient:
+    # Table of '%{F#rrggbb}' for lo..hi, quantised to 'step'
+    def __init__(self, stops, lo, hi, step=1.0):
+        self.lo = lo
+        self.scale = 1.0 / step
+        n = int(round((hi - lo) * self.scale)) + 1
+        self.codes = [fg(color_at(stops, lo + i * step)) for i in range(n)]
+        self.last = n - 1
+
+    def index(self, x):
+        i = int((x - self.lo) * self.scale)
+        if i < 0: return 0
+        if i > self.last: return self.last
+        return i
+
+    def __call__(self, x):
+        return self.codes[self.index(x)]
+
+class Thresholds:
+    # Step colouring for integer values 0..hi: [(min_value, code), ...]
+    # in increasing order, 'default' below the first one.
+    def __init__(self, steps, default="", hi=100):
+        self.codes = []
+        for v in range(hi + 1):
+            code = default
+            for start, c in steps:
+                if v >= start:
+                    code = c
+            self.codes.append(code)
+        self.last = hi
+
+    def __call__(self, x):
+        i = int(x)
+        if i < 0: return self.codes[0]
+        if i > self.last: return self.codes[self.last]
+        return self.codes[i]
+
+# --- Palette ---
+CYAN = (0, 188, 212)       # #00BCD4 (primary)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+ORANGE = (255, 165, 0)     # #FFA500
+RED = (255, 0, 0)
+YELLOW = (255, 235, 59)    # #FFEB3B
+SOFT_RED = (244, 67, 54)   # #F44336
+
+COLOR_WARN = "%{F#FFC07F}" # Pastel Orange
+COLOR_CRIT = "%{F#FF7A7A}" # Pastel Red
+
+# --- Shared Tables ---
+# Battery discharging: Turquoise (>75%) -> Orange (30%) -> Red (0%), per 0.1%
+BATTERY_DISCHARGE = Gradient([(0, RED), (30, ORANGE), (75, CYAN), (100, CYAN)], 0, 100, 0.1)
+
+# Battery charging text: fractional part of the percentage, White -> Green, per 0.01
+BATTERY_CHARGE_FRACTION = Gradient([(0, WHITE), (1, GREEN)], 0, 1, 0.01)
+
+# Temperature (°C): Cyan <=40, White <=52, White -> Yellow (75) -> Red (90), per 0.1°C
+TEMPERATURE = Gradient([(0, CYAN), (40, CYAN), (40, WHITE), (52, WHITE),
+                        (75, YELLOW), (90, SOFT_RED)], 0, 120, 0.1)
+
+# bspwm heatmap: window count 1 (White) .. 5+ (Red)
+WINDOW_HEAT = Gradient([(1, WHITE), (5, RED)], 0, 5, 1)
+
+# System monitor thresholds (percent)
+CPU = Thresholds([(60, COLOR_WARN), (75, COLOR_CRIT)])
+RAM = Thresholds([(55, COLOR_WARN), (75, COLOR_CRIT)])
+GPU = Thresholds([(60, COLOR_WARN), (75, COLOR_CRIT)])
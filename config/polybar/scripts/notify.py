@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+import atexit
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+
+# Desktop Notifications without notify-send
+# Sends org.freedesktop.Notifications.Notify straight over the session bus
+# (a minimal D-Bus client, no dbus-python needed) on one cached connection.
+# send() only queues the message and returns a handle at once: a sender
+# thread does the bus I/O, so a GLib main loop or a rofi menu never waits.
+# The queue is flushed at exit, so one-shot scripts don't lose the last
+# message.
+#
+# Replace ids: handle.update(...) replaces the same bubble, e.g.
+#   n = notify.send("Bluetooth", "Conectando...", icon="bluetooth")
+#   n.update("Bluetooth", "Conectado")
+#
+# Usage (CLI, for the shell scripts):
+#   notify.py [-a APP] [-i ICON] [-u low|normal|critical] [-t MS] [-p VALUE]
+#             [-r ID | -T TAG] [-P] SUMMARY [BODY]
+#   -p VALUE   progress bar hint (int:value)
+#   -r ID      replace notification ID
+#   -T TAG     replace the previous notification sent with the same tag
+#   -P         print the notification id
+
+BUS_NAME = "org.freedesktop.DBus"
+BUS_PATH = "/org/freedesktop/DBus"
+NOTIFY_NAME = "org.freedesktop.Notifications"
+NOTIFY_PATH = "/org/freedesktop/Notifications"
+NOTIFY_SIGNATURE = "susssasa{sv}i"
+
+URGENCY = {"low": 0, "normal": 1, "critical": 2}
+REPLY_TIMEOUT = 2 # seconds
+
+# --- D-Bus wire format ---
+METHOD_CALL, METHOD_RETURN, ERROR, SIGNAL = 1, 2, 3, 4
+NO_REPLY_EXPECTED = 0x1
+PATH, INTERFACE, MEMBER, ERROR_NAME, REPLY_SERIAL, DESTINATION, SENDER, SIGNATURE = range(1, 9)
+FIELD_TYPES = {PATH: "o", INTERFACE: "s", MEMBER: "s", ERROR_NAME: "s", REPLY_SERIAL: "u",
+               DESTINATION: "s", SENDER: "s", SIGNATURE: "g"}
+
+ALIGN = {"y": 1, "b": 4, "n": 2, "q": 2, "i": 4, "u": 4, "x": 8, "t": 8, "d": 8,
+         "s": 4, "o": 4, "g": 1, "a": 4, "(": 8, "{": 8, "v": 1, "h": 4}
+FIXED = {"y": "B", "b": "I", "n": "h", "q": "H", "i": "i", "u": "I", "x": "q", "t": "Q", "d": "d", "h": "I"}
+
+class DBusError(Exception):
+    pass
+
+def type_end(sig, i):
+    # Index right after the complete type starting at sig[i]
+    c = sig[i]
+    if c == "a":
+        return type_end(sig, i + 1)
+    if c in "({":
+        depth = 0
+        while True:
+            if sig[i] in "({":
+                depth += 1
+            elif sig[i] in ")}":
+                depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+    return i + 1
+
+def split_types(sig):
+    # "susa{sv}" -> ["s", "u", "s", "a{sv}"]
+    types = []
+    i = 0
+    while i < len(sig):
+        j = type_end(sig, i)
+        types.append(sig[i:j])
+        i = j
+    return types
+
+class Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def pad(self, n):
+        self.buf += b"\0" * (-len(self.buf) % n)
+
+    def write(self, t, v):
+        # Variants are (signature, value), dicts for a{..}, tuples for structs
+        c = t[0]
+        self.pad(ALIGN[c])
+        if c in FIXED:
+            self.buf += struct.pack("<" + FIXED[c], v)
+        elif c in "so":
+            data = v.encode()
+            self.buf += struct.pack("<I", len(data)) + data + b"\0"
+        elif c == "g":
+            data = v.encode()
+            self.buf += bytes((len(data),)) + data + b"\0"
+        elif c == "v":
+            self.write("g", v[0])
+            self.write(v[0], v[1])
+        elif c == "a":
+            elem = t[1:]
+            at = len(self.buf)
+            self.buf += b"\0\0\0\0"
+            self.pad(ALIGN[elem[0]])
+            start = len(self.buf)
+            for item in (v.items() if elem[0] == "{" else v):
+                self.write(elem, item)
+            struct.pack_into("<I", self.buf, at, len(self.buf) - start)
+        elif c in "({":
+            for sub, value in zip(split_types(t[1:-1]), v):
+                self.write(sub, value)
+
+class Reader:
+    def __init__(self, data, endian="<"):
+        self.data = data
+        self.pos = 0
+        self.endian = endian
+
+    def read(self, t):
+        c = t[0]
+        self.pos += -self.pos % ALIGN[c]
+        if c in FIXED:
+            fmt = self.endian + FIXED[c]
+            v = struct.unpack_from(fmt, self.data, self.pos)[0]
+            self.pos += struct.calcsize(fmt)
+            return v
+        if c in "so":
+            n = struct.unpack_from(self.endian + "I", self.data, self.pos)[0]
+            v = bytes(self.data[self.pos + 4:self.pos + 4 + n]).decode(errors="replace")
+            self.pos += 4 + n + 1
+            return v
+        if c == "g":
+            n = self.data[self.pos]
+            v = bytes(self.data[self.pos + 1:self.pos + 1 + n]).decode()
+            self.pos += n + 2
+            return v
+        if c == "v":
+            sig = self.read("g")
+            return (sig, self.read(sig))
+        if c == "a":
+            n = self.read("u")
+            elem = t[1:]
+            self.pos += -self.pos % ALIGN[elem[0]]
+            end = self.pos + n
+            items = []
+            while self.pos < end:
+                items.append(self.read(elem))
+            return dict(items) if elem[0] == "{" else items
+        if c in "({":
+            return tuple(self.read(sub) for sub in split_types(t[1:-1]))
+        raise DBusError(f"unsupported type {t!r}")
+
+class Message:
+    def __init__(self, type, flags, serial, fields, args):
+        self.type = type
+        self.flags = flags
+        self.serial = serial
+        self.fields = fields
+        self.args = args
+
+def encode_message(type, serial, fields, signature="", args=(), flags=0):
+    body = Writer()
+    for t, v in zip(split_types(signature), args):
+        body.write(t, v)
+    fields = dict(fields)
+    if signature:
+        fields[SIGNATURE] = signature
+    header = Writer()
+    header.buf += struct.pack("<cBBBII", b"l", type, flags, 1, len(body.buf), serial)
+    header.write("a(yv)", [(code, (FIELD_TYPES[code], v)) for code, v in fields.items()])
+    header.pad(8)
+    return bytes(header.buf + body.buf)
+
+# --- Connection ---
+
+def session_address():
+    address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+    if address:
+        return address
+    return f"unix:path={os.environ.get('XDG_RUNTIME_DIR', f'/run/user/{os.getuid()}')}/bus"
+
+def unescape(value):
+    out = bytearray()
+    i = 0
+    while i < len(value):
+        if value[i] == "%":
+            out.append(int(value[i + 1:i + 3], 16))
+            i += 3
+        else:
+            out += value[i].encode()
+            i += 1
+    return out.decode()
+
+def open_socket(address):
+    # First usable 'unix:path=' / 'unix:abstract=' entry
+    for entry in address.split(";"):
+        transport, _, params = entry.partition(":")
+        if transport != "unix":
+            continue
+        opts = dict(p.split("=", 1) for p in params.split(",") if "=" in p)
+        if "path" in opts:
+            target = unescape(opts["path"])
+        elif "abstract" in opts:
+            target = "\0" + unescape(opts["abstract"])
+        else:
+            continue
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        sock.settimeout(REPLY_TIMEOUT)
+        try:
+            sock.connect(target)
+            return sock
+        except OSError:
+            sock.close()
+    raise OSError(f"no usable D-Bus address in {address!r}")
+
+class Connection:
+    def __init__(self, address=None):
+        self.sock = open_socket(address or session_address())
+        self.serial = 0
+        self.rbuf = b""
+        self.queued = [] # Method calls read while waiting for a reply
+        try:
+            self._auth()
+            self.unique_name = self.call(BUS_NAME, BUS_PATH, BUS_NAME, "Hello")[0]
+        except (OSError, DBusError):
+            self.sock.close()
+            raise
+
+    def _auth(self):
+        uid = str(os.getuid()).encode().hex()
+        self.sock.sendall(b"\0AUTH EXTERNAL " + uid.encode() + b"\r\n")
+        line = self._read_line()
+        if not line.startswith(b"OK"):
+            raise DBusError(f"authentication rejected: {line!r}")
+        self.sock.sendall(b"BEGIN\r\n")
+
+    def _read_line(self):
+        while b"\r\n" not in self.rbuf:
+            data = self.sock.recv(4096)
+            if not data:
+                raise OSError("bus closed the connection")
+            self.rbuf += data
+        line, _, self.rbuf = self.rbuf.partition(b"\r\n")
+        return line
+
+    def _read_exact(self, n):
+        while len(self.rbuf) < n:
+            data = self.sock.recv(max(4096, n - len(self.rbuf)))
+            if not data:
+                raise OSError("bus closed the connection")
+            self.rbuf += data
+        data, self.rbuf = self.rbuf[:n], self.rbuf[n:]
+        return data
+
+    def read_message(self):
+        if self.queued:
+            return self.queued.pop(0)
+        return self._read_wire()
+
+    def _read_wire(self):
+        fixed = self._read_exact(16)
+        endian = "<" if fixed[:1] == b"l" else ">"
+        type, flags, _, body_len, serial, fields_len = struct.unpack(endian + "xBBBIII", fixed)
+        rest = self._read_exact(fields_len + (-(16 + fields_len) % 8) + body_len)
+        header = Reader(fixed + rest, endian)
+        header.pos = 12
+        fields = {code: value for code, (_, value) in header.read("a(yv)")}
+        body = Reader(rest[len(rest) - body_len:], endian)
+        args = tuple(body.read(t) for t in split_types(fields.get(SIGNATURE, "")))
+        return Message(type, flags, serial, fields, args)
+
+    def send(self, type, fields, signature="", args=(), flags=0):
+        self.serial += 1
+        self.sock.sendall(encode_message(type, self.serial, fields, signature, args, flags))
+        return self.serial
+
+    def call(self, dest, path, interface, member, signature="", args=()):
+        serial = self.send(METHOD_CALL, {PATH: path, INTERFACE: interface, MEMBER: member,
+                                         DESTINATION: dest}, signature, args)
+        while True:
+            msg = self._read_wire()
+            if msg.type in (METHOD_RETURN, ERROR) and msg.fields.get(REPLY_SERIAL) == serial:
+                if msg.type == ERROR:
+                    raise DBusError(f"{msg.fields.get(ERROR_NAME)}: {' '.join(map(str, msg.args))}")
+                return msg.args
+            # Only calls to us are kept for read_message(): signals (NameAcquired,
+            # NotificationClosed...) and stale replies would pile up for good on
+            # a resident connection
+            if msg.type == METHOD_CALL:
+                self.queued.append(msg)
+
+    def reply(self, msg, signature="", args=()):
+        self.send(METHOD_RETURN, {REPLY_SERIAL: msg.serial, DESTINATION: msg.fields[SENDER]},
+                  signature, args, NO_REPLY_EXPECTED)
+
+    def close(self):
+        self.sock.close()
+
+# --- Notifications ---
+
+class Notification:
+    # Handle returned by send(); id is filled in by the sender thread
+    def __init__(self):
+        self.id = 0
+        self.done = threading.Event()
+
+    def update(self, summary, body="", **kwargs):
+        # Replace this bubble
+        return send(summary, body, replaces=self, **kwargs)
+
+    def wait(self, timeout=REPLY_TIMEOUT):
+        self.done.wait(timeout)
+        return self.id
+
+def notify_args(summary, body, icon, app, urgency, timeout, replaces_id, hints, progress):
+    all_hints = dict(hints or {})
+    if urgency is not None:
+        all_hints["urgency"] = ("y", URGENCY.get(urgency, urgency))
+    if progress is not None:
+        all_hints["value"] = ("i", int(progress))
+    return (app, replaces_id, icon, summary, body, [], all_hints, timeout)
+
+def check_args(args):
+    # ValueError now rather than a failed marshal in the sender thread
+    try:
+        encode_message(METHOD_CALL, 1, {}, NOTIFY_SIGNATURE, args)
+    except (struct.error, KeyError, TypeError, AttributeError, IndexError, ValueError) as e:
+        raise ValueError(f"bad notification arguments: {e!r}") from None
+
+class Sender:
+    def __init__(self, address=None):
+        self.address = address
+        self.conn = None
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _notify(self, args):
+        # One reconnect if the cached connection went away (new session bus)
+        for attempt in range(2):
+            try:
+                if self.conn is None:
+                    self.conn = Connection(self.address)
+                return self.conn.call(NOTIFY_NAME, NOTIFY_PATH, NOTIFY_NAME, "Notify", NOTIFY_SIGNATURE, args)[0]
+            except OSError:
+                if self.conn is not None:
+                    self.conn.close()
+                self.conn = None
+        return 0
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if isinstance(item, threading.Event):
+                item.set() # flush() marker
+                continue
+            handle, replaces, args = item
+            if isinstance(replaces, Notification):
+                replaces = replaces.wait()
+            try:
+                handle.id = self._notify((args[0], replaces) + args[2:])
+            except DBusError:
+                pass # No notification daemon
+            except Exception as e:
+                # Never let one message stop the thread (later sends would be lost)
+                print(f"notify: {e!r}", file=sys.stderr)
+            handle.done.set()
+
+    def flush(self, timeout=REPLY_TIMEOUT):
+        marker = threading.Event()
+        self.queue.put(marker)
+        marker.wait(timeout)
+
+_sender = None
+_sender_lock = threading.Lock()
+
+def sender():
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = Sender()
+            atexit.register(_sender.flush)
+        return _sender
+
+def send(summary, body="", icon="", app="", urgency=None, timeout=-1, replaces=0, hints=None, progress=None):
+    # Queue a notification, returns its Notification handle at once.
+    # replaces: a notification id or a previous handle
+    # Raises ValueError for arguments that can't be sent (urgency, hints...)
+    args = notify_args(summary, body, icon, app, urgency, timeout, 0, hints, progress)
+    check_args(args)
+    handle = Notification()
+    sender().queue.put((handle, replaces, args))
+    return handle
+
+def flush(timeout=REPLY_TIMEOUT):
+    if _sender is not None:
+        _sender.flush(timeout)
+
+# --- CLI ---
+
+USAGE = ("usage: notify.py [-a APP] [-i ICON] [-u low|normal|critical] [-t MS] [-p VALUE] "
+         "[-r ID | -T TAG] [-P] SUMMARY [BODY]")
+
+def tag_file(tag):
+    import fanout
+    return os.path.join(fanout.runtime_dir(), f"notify-{tag}.id")
+
+def main():
+    args = sys.argv[1:]
+    opts = {"app": "", "icon": "", "urgency": None, "timeout": -1, "progress": None}
+    replaces = 0
+    tag = None
+    print_id = False
+    flags = {"-a": "app", "-i": "icon", "-u": "urgency", "-t": "timeout", "-p": "progress"}
+    positional = []
+    try:
+        while args:
+            arg = args.pop(0)
+            if arg in flags:
+                opts[flags[arg]] = args.pop(0)
+            elif arg == "-r":
+                replaces = int(args.pop(0))
+            elif arg == "-T":
+                tag = args.pop(0)
+            elif arg == "-P":
+                print_id = True
+            else:
+                positional.append(arg)
+        opts["timeout"] = int(opts["timeout"])
+    except (IndexError, ValueError):
+        positional = []
+    if not positional or len(positional) > 2:
+        print(USAGE, file=sys.stderr)
+        return 1
+
+    if tag:
+        try:
+            with open(tag_file(tag)) as f:
+                replaces = int(f.read())
+        except (OSError, ValueError):
+            pass
+
+    try:
+        handle = send(*positional, replaces=replaces, **opts)
+    except ValueError as e:
+        print(f"notify.py: {e}", file=sys.stderr)
+        return 1
+    notification_id = handle.wait()
+    if not notification_id:
+        return 1
+    if tag:
+        with open(tag_file(tag), "w") as f:
+            f.write(str(notification_id))
+    if print_id:
+        print(notification_id)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+
+import fanout
+
+# Polybar Module Host
+# One resident interpreter for all the script modules instead of a fresh
+# Python process per poll. Each module is loaded as a plugin from its own
+# script file and runs on its schedule (timer thread), its event stream
+# (thread) or the shared GLib/D-Bus main loop. Every slot is published on
+# the 'host' fan-out socket; each bar's polybar-relay.py hands it to the
+# bar's custom/ipc module ('fanout.py host <slot>' prints it by hand).
+#
+# Usage:
+#   polybar-host.py [slot...]            Run the host (all slots by default)
+#   polybar-host.py action SLOT VERB     Send a click action to a running host
+
+FANOUT_NAME = "host"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# slot: (script, kind, entry point, interval in seconds, actions)
+# - poll:     entry() returns the line to show, called every 'interval'
+# - stream:   entry() blocks and calls module.emit(line) for every update
+# - glib:     entry(bus) installs its sources on the shared main loop and
+#             calls module.emit(line)
+# - producer: entry(publish) blocks and publishes its own keys (bspwm)
+# - service:  entry() blocks serving the module's own fan-out socket (the
+#             audio event router, the volume control service); started
+#             first, so the other slots find them instead of spawning a
+#             detached copy. Still their own sockets: the click scripts and
+#             cava talk to them too, and they run alone when the host is down.
+# Actions map a verb to a module function; the slot is redrawn afterwards.
+PLUGINS = {
+    "audio":       ("audio_events.py", "service", "serve", None, {}),
+    "volume-ctl":  ("volume_service.py", "service", "serve", None, {}),
+    "cpu":         ("system-monitor.py", "poll", "get_cpu_history", 2, {"detail": "show_cpu_detail"}),
+    "memory":      ("system-monitor.py", "stream", "watch_memory", None, {}),
+    "gpu":         ("system-monitor.py", "poll", "get_gpu", 2, {}),
+    "temperature": ("temperature-dynamic.py", "stream", "watch", None, {"toggle": "toggle"}),
+    "bluetooth":   ("bluetooth-status.py", "poll", "get_bluetooth_status", 10, {}),
+    "battery":     ("battery-dynamic.py", "glib", "setup", None, {"details": "show_details", "stats": "show_stats"}),
+    "volume":      ("volume-dynamic.py", "stream", "watch", None, {}),
+    "bspwm":       ("bspwm-dynamic.py", "producer", "run", None, {}),
+}
+
+SERVICE_START_TIMEOUT = 1 # s
+
+def log(msg):
+    print(f"polybar-host: {msg}", file=sys.stderr, flush=True)
+
+# Scripts are loaded once per file, slots of the same script share the module
+_modules = {}
+
+def load_script(filename):
+    if filename not in _modules:
+        name = filename[:-3].replace("-", "_")
+        if "-" not in filename:
+            # Also imported by other scripts (audio_events): one shared copy
+            module = importlib.import_module(name)
+        else:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        _modules[filename] = module
+    return _modules[filename]
+
+class Host:
+    def __init__(self, slots):
+        self.slots = slots
+        self.server = fanout.Server(FANOUT_NAME, on_action=self.on_action)
+        self.pollers = {}   # slot -> (function, wake event)
+        self.modules = {}   # slot -> module
+        self.glib_plugins = []
+        self.bus = None
+        self.glib = None    # gi.repository.GLib once the main loop is set up
+
+    def publish(self, slot, line):
+        if line is None:
+            line = ""
+        self.server.publish(slot, line)
+
+    def on_action(self, slot, args):
+        entry = PLUGINS.get(slot)
+        module = self.modules.get(slot)
+        if not entry or module is None or not args:
+            return "unknown"
+        func = entry[4].get(args[0])
+        if func is None:
+            return "unknown"
+        call = lambda: getattr(module, func)(*args[1:])
+        if entry[1] == "glib":
+            # This runs on a fan-out connection thread, the module's state
+            # belongs to the main loop: hand the call over to it
+            if self.glib is None:
+                return "error"
+            self.glib.idle_add(self._main_loop_action, slot, call)
+            return "ok"
+        call()
+        if slot in self.pollers:
+            self.pollers[slot][1].set()
+        return "ok"
+
+    def _main_loop_action(self, slot, call):
+        try:
+            call()
+        except Exception:
+            log(f"{slot}: {traceback.format_exc().strip()}")
+        return False # Once
+
+    def _poll_loop(self, slot, func, interval, wake):
+        while True:
+            try:
+                self.publish(slot, func())
+            except Exception:
+                log(f"{slot}: {traceback.format_exc().strip()}")
+            wake.wait(interval)
+            wake.clear()
+
+    def _stream_loop(self, slot, func):
+        # Restart the stream if it ends (e.g. pactl went away)
+        while True:
+            try:
+                func()
+            except Exception:
+                log(f"{slot}: {traceback.format_exc().strip()}")
+            time.sleep(2)
+
+    def start_slot(self, slot):
+        script, kind, entry, interval, _ = PLUGINS[slot]
+        module = load_script(script)
+        func = getattr(module, entry)
+        self.modules[slot] = module
+
+        if kind == "poll":
+            wake = threading.Event()
+            self.pollers[slot] = (func, wake)
+            threading.Thread(target=self._poll_loop, args=(slot, func, interval, wake), daemon=True).start()
+        elif kind == "stream":
+            module.emit = lambda line, slot=slot: self.publish(slot, line)
+            threading.Thread(target=self._stream_loop, args=(slot, func), daemon=True).start()
+        elif kind == "glib":
+            module.emit = lambda line, slot=slot: self.publish(slot, line)
+            self.glib_plugins.append((slot, func))
+        elif kind == "service":
+            # serve() returns at once if a standalone copy holds the socket:
+            # the loop retries, and takes over when that one exits
+            threading.Thread(target=self._stream_loop, args=(slot, func), daemon=True).start()
+            self._wait_listening(module.FANOUT_NAME)
+        elif kind == "producer":
+            # Same socket and keys as 'bspwm-dynamic.py --producer'
+            server = fanout.Server(module.FANOUT_NAME)
+            if not server.start():
+                log(f"{slot}: another producer is running, skipped")
+                return
+            emit = module.publish_monitors(server.publish)
+            threading.Thread(target=self._stream_loop, args=(slot, lambda: func(emit)), daemon=True).start()
+
+    def _wait_listening(self, name):
+        deadline = time.monotonic() + SERVICE_START_TIMEOUT
+        while time.monotonic() < deadline:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                try:
+                    sock.connect(fanout.socket_path(name))
+                    return
+                except OSError:
+                    time.sleep(0.01)
+        log(f"{name}: not listening after {SERVICE_START_TIMEOUT} s")
+
+    def setup_main_loop(self):
+        # One GLib loop and one system bus connection shared by all plugins.
+        # Must happen before any plugin touches D-Bus, so that the shared
+        # bus connection is attached to the loop.
+        try:
+            import dbus
+            import dbus.mainloop.glib
+            from gi.repository import GLib
+        except ImportError:
+            return None
+
+        dbus.mainloop.glib.threads_init()
+        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+        self.bus = dbus.SystemBus()
+        self.glib = GLib
+        return GLib.MainLoop()
+
+    def run(self):
+        if not self.server.start():
+            log("already running")
+            return 1
+
+        loop = self.setup_main_loop()
+
+        # Services first (see PLUGINS)
+        for slot in sorted(self.slots, key=lambda slot: PLUGINS[slot][1] != "service"):
+            try:
+                self.start_slot(slot)
+            except Exception:
+                # Missing optional dependency (dbus, gi...) only disables that slot
+                log(f"{slot}: disabled: {traceback.format_exc().strip()}")
+
+        if loop is None:
+            if self.glib_plugins:
+                log("GLib/D-Bus not available, event-loop plugins disabled")
+            threading.Event().wait()
+            return 0
+
+        for slot, func in self.glib_plugins:
+            try:
+                func(self.bus)
+            except Exception:
+                log(f"{slot}: disabled: {traceback.format_exc().strip()}")
+
+        loop.run()
+        return 0
+
+def main():
+    args = sys.argv[1:]
+
+    if args[:1] == ["action"]:
+        if len(args) < 3:
+            print("usage: polybar-host.py action SLOT VERB [ARGS...]", file=sys.stderr)
+            return 1
+        try:
+            reply = fanout.action(FANOUT_NAME, args[1], *args[2:])
+        except OSError:
+            return 1
+        return 0 if reply == "ok" else 1
+
+    unknown = [a for a in args if a not in PLUGINS]
+    if unknown:
+        print(f"unknown slot(s): {' '.join(unknown)} (known: {' '.join(PLUGINS)})", file=sys.stderr)
+        return 1
+
+    try:
+        return Host(args or list(PLUGINS)).run()
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import os
+import select
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import fanout
+
+# Bar Relay
+# One process per bar instead of one fanout.py reader per module. It
+# subscribes to every key the bar shows (polybar-host.py slots and the
+# bspwm producer), keeps only the newest line of each, and hands it to the
+# bar's custom/ipc module through polybar's own IPC socket
+# ('#module.send.text', polybar >= 3.6): one short socket write per update,
+# no fork. If the socket is there but doesn't take the message,
+# polybar-msg is used instead. Exits with its bar.
+#
+# Usage (launch.sh, right after starting the bar): polybar-relay.py PID [MONITOR]
+
+# custom/ipc module -> (fan-out name, key); key None: the bar's monitor
+MODULES = {
+    "bspwm":       ("bspwm", None),
+    "cpu":         ("host", "cpu"),
+    "memory":      ("host", "memory"),
+    "nvidia":      ("host", "gpu"),
+    "temperature": ("host", "temperature"),
+    "bluetooth":   ("host", "bluetooth"),
+    "battery":     ("host", "battery"),
+    "pulseaudio":  ("host", "volume"),
+}
+ALL_MONITORS = "*" # bspwm-dynamic.py key of a single bar showing every monitor
+
+RECONNECT = 1      # s before re-subscribing after a producer went away
+RETRY = 0.2        # s between deliveries while the bar isn't ready
+ALIVE_CHECK = 5    # s between checks that the bar is still running
+IPC_TIMEOUT = 1    # s
+
+# polybar IPC (version 0): magic, version, payload size, type; then payload
+IPC_HEADER = struct.Struct("<7sBIB")
+IPC_MAGIC = b"polyipc"
+IPC_ACTION = 2
+IPC_OK = 0
+
+def ipc_socket_path(pid):
+    # Same directory polybar uses
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    directory = os.path.join(base, "polybar") if base else f"/tmp/polybar-{os.getuid()}"
+    return os.path.join(directory, f"ipc.{pid}.sock")
+
+class Bar:
+    def __init__(self, pid):
+        self.pid = pid
+        self.path = ipc_socket_path(pid)
+
+    def alive(self):
+        try:
+            os.kill(self.pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def _read_exact(self, sock, n):
+        data = b""
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            if not chunk:
+                raise OSError("polybar closed the IPC connection")
+            data += chunk
+        return data
+
+    def _ipc(self, action):
+        payload = action.encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(IPC_TIMEOUT)
+            sock.connect(self.path)
+            sock.sendall(IPC_HEADER.pack(IPC_MAGIC, 0, len(payload), IPC_ACTION) + payload)
+            magic, _, size, type = IPC_HEADER.unpack(self._read_exact(sock, IPC_HEADER.size))
+            self._read_exact(sock, size)
+            return magic == IPC_MAGIC and type == IPC_OK
+
+    def send(self, module, line):
+        # True once the bar took it, False if it isn't ready yet
+        action = f"#{module}.send.{line}"
+        if not os.path.exists(self.path):
+            return False # Bar still starting (or IPC disabled)
+        try:
+            if self._ipc(action):
+                return True
+        except OSError:
+            pass
+        try:
+            return subprocess.run(["polybar-msg", "-p", str(self.pid), "action", action],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+        except OSError:
+            return False
+
+class Feed:
+    # Subscription of one module to its producer key
+    def __init__(self, module, name, key):
+        self.module = module
+        self.name = name
+        self.key = key
+        self.sock = None
+        self.buf = b""
+        self.retry_at = 0
+
+    def connect(self, now):
+        try:
+            self.sock = fanout.connect(self.name, f"sub {self.key}")
+        except OSError:
+            self.retry_at = now + RECONNECT
+
+    def drop(self, now):
+        self.sock.close()
+        self.sock = None
+        self.buf = b""
+        self.retry_at = now + RECONNECT
+
+    def read(self, now):
+        # Newest complete line received, None if none
+        try:
+            data = self.sock.recv(65536)
+        except OSError:
+            data = b""
+        if not data:
+            self.drop(now)
+            return None
+        self.buf += data
+        if b"\n" not in self.buf:
+            return None
+        lines, _, self.buf = self.buf.rpartition(b"\n")
+        return lines.rpartition(b"\n")[2].decode(errors="replace")
+
+def relay(bar, feeds):
+    pending = {} # module -> newest line not delivered yet
+    last_check = time.monotonic()
+    while True:
+        now = time.monotonic()
+        for feed in feeds:
+            if feed.sock is None and now >= feed.retry_at:
+                feed.connect(now)
+        waiting = pending or any(feed.sock is None for feed in feeds)
+        by_sock = {feed.sock: feed for feed in feeds if feed.sock is not None}
+        ready, _, _ = select.select(list(by_sock), [], [], RETRY if waiting else ALIVE_CHECK)
+        now = time.monotonic()
+        for sock in ready:
+            feed = by_sock[sock]
+            line = feed.read(now)
+            if line is not None:
+                pending[feed.module] = line
+        for module, line in list(pending.items()):
+            if bar.send(module, line):
+                del pending[module]
+        if not ready or now - last_check >= ALIVE_CHECK:
+            if not bar.alive():
+                return
+            last_check = now
+
+def main():
+    args = sys.argv[1:]
+    if not args or not args[0].isdigit():
+        print("usage: polybar-relay.py PID [MONITOR]", file=sys.stderr)
+        return 1
+    monitor = args[1] if len(args) > 1 and args[1] else ALL_MONITORS
+    feeds = [Feed(module, name, key or monitor) for module, (name, key) in MODULES.items()]
+    try:
+        relay(Bar(int(args[0])), feeds)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+import os
+import socket
+import struct
+import sys
+
+# PulseAudio / PipeWire Client without pactl
+# A minimal client for the sound server's native protocol (the one libpulse
+# speaks, also served by pipewire-pulse): one connection, subscribed to the
+# sink and server events, with the default sink's volume and mute read from
+# the server's replies. No pactl fork and no text parsing per event.
+#
+# Usage:
+#   conn = pulse.Connection()
+#   conn.subscribe(pulse.MASK_SINK | pulse.MASK_SERVER)
+#   conn.sink()                 -> Sink (default sink: volume %, muted...)
+#   conn.next_event()           -> (facility, type, index), blocks
+#   conn.set_sink_volume(sink, 70) / conn.set_sink_mute(sink, True)
+#
+#   ./pulse.py [info|watch]
+#
+# Server: $PULSE_SERVER ('unix:/path'), else $XDG_RUNTIME_DIR/pulse/native.
+# Authentication: the user's credentials on the socket (SCM_CREDENTIALS),
+# plus the cookie if there's one (PipeWire doesn't check it).
+
+PROTOCOL_VERSION = 32
+REPLY_TIMEOUT = 2 # seconds
+COOKIE_SIZE = 256
+VOLUME_NORM = 0x10000 # 100%
+INVALID_INDEX = 0xFFFFFFFF
+DEFAULT_SINK = "@DEFAULT_SINK@"
+
+# Commands
+ERROR, TIMEOUT, REPLY = 0, 1, 2
+AUTH, SET_CLIENT_NAME = 8, 9
+GET_SERVER_INFO, GET_SINK_INFO = 20, 21
+SUBSCRIBE, SET_SINK_VOLUME, SET_SINK_MUTE = 35, 36, 39
+SUBSCRIBE_EVENT = 66
+
+# Subscription masks / event facilities and types
+MASK_SINK, MASK_SOURCE, MASK_SINK_INPUT, MASK_SERVER = 0x0001, 0x0002, 0x0004, 0x0080
+FACILITY_SINK, FACILITY_SOURCE, FACILITY_SINK_INPUT, FACILITY_SERVER = 0, 1, 2, 7
+FACILITY_MASK, TYPE_MASK = 0x0F, 0x30
+EVENT_NEW, EVENT_CHANGE, EVENT_REMOVE = 0x00, 0x10, 0x20
+
+# --- Wire format ---
+# Packet: 20-byte descriptor (length, channel, offset hi/lo, flags; big
+# endian) + a tagstruct: every value is preceded by a one-byte type tag.
+DESCRIPTOR = struct.Struct(">IIIII")
+CONTROL_CHANNEL = 0xFFFFFFFF
+
+class PulseError(Exception):
+    pass
+
+class TagWriter:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def u32(self, v):
+        self.buf += b"L" + struct.pack(">I", v)
+        return self
+
+    def string(self, v):
+        if v is None:
+            self.buf += b"N"
+        else:
+            self.buf += b"t" + v.encode() + b"\0"
+        return self
+
+    def boolean(self, v):
+        self.buf += b"1" if v else b"0"
+        return self
+
+    def arbitrary(self, data):
+        self.buf += b"x" + struct.pack(">I", len(data)) + data
+        return self
+
+    def sample_spec(self, fmt, channels, rate):
+        self.buf += b"a" + struct.pack(">BBI", fmt, channels, rate)
+        return self
+
+    def channel_map(self, positions):
+        self.buf += b"m" + bytes((len(positions),)) + bytes(positions)
+        return self
+
+    def cvolume(self, volumes):
+        self.buf += b"v" + bytes((len(volumes),)) + struct.pack(f">{len(volumes)}I", *volumes)
+        return self
+
+    def usec(self, v):
+        self.buf += b"U" + struct.pack(">Q", v)
+        return self
+
+    def proplist(self, props):
+        self.buf += b"P"
+        for key, value in props.items():
+            data = value.encode() + b"\0"
+            self.string(key).u32(len(data)).arbitrary(data)
+        self.buf += b"N"
+        return self
+
+class TagReader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _tag(self, expected):
+        tag = self.data[self.pos:self.pos + 1]
+        if tag not in expected:
+            raise PulseError(f"expected tag {expected!r}, got {tag!r}")
+        self.pos += 1
+        return tag
+
+    def _unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def u32(self):
+        self._tag(b"L")
+        return self._unpack(">I")[0]
+
+    def string(self):
+        if self._tag((b"t", b"N")) == b"N":
+            return None
+        end = self.data.index(b"\0", self.pos)
+        v = bytes(self.data[self.pos:end]).decode(errors="replace")
+        self.pos = end + 1
+        return v
+
+    def boolean(self):
+        return self._tag((b"1", b"0")) == b"1"
+
+    def arbitrary(self):
+        self._tag(b"x")
+        n = self._unpack(">I")[0]
+        self.pos += n
+        return bytes(self.data[self.pos - n:self.pos])
+
+    def sample_spec(self):
+        self._tag(b"a")
+        return self._unpack(">BBI")
+
+    def channel_map(self):
+        self._tag(b"m")
+        n = self._unpack(">B")[0]
+        return self._unpack(f">{n}B")
+
+    def cvolume(self):
+        self._tag(b"v")
+        n = self._unpack(">B")[0]
+        return self._unpack(f">{n}I")
+
+def packet(command, tag, body=None):
+    payload = TagWriter().u32(command).u32(tag).buf + (body.buf if body else b"")
+    return DESCRIPTOR.pack(len(payload), CONTROL_CHANNEL, 0, 0, 0) + payload
+
+def percent(volume):
+    return (volume * 100 + VOLUME_NORM // 2) // VOLUME_NORM
+
+class Sink:
+    def __init__(self, index, name, description, channels, muted, monitor):
+        self.index = index
+        self.name = name
+        self.description = description
+        self.channels = channels   # Raw volume per channel
+        self.muted = muted
+        self.monitor = monitor     # Monitor source name (e.g. for cava)
+
+    @property
+    def volume(self):
+        # Percent of the loudest channel, like the volume sliders
+        return percent(max(self.channels)) if self.channels else 0
+
+def parse_sink(r):
+    # Only the leading fields, which are the same in every protocol version
+    index = r.u32()
+    name = r.string()
+    description = r.string()
+    r.sample_spec()
+    r.channel_map()
+    r.u32() # Owner module
+    channels = r.cvolume()
+    muted = r.boolean()
+    r.u32() # Monitor source index
+    monitor = r.string()
+    return Sink(index, name, description, channels, muted, monitor)
+
+# --- Connection ---
+
+def server_path():
+    server = os.environ.get("PULSE_SERVER", "")
+    for entry in server.split():
+        if entry.startswith("unix:"):
+            return entry[5:]
+        if entry.startswith("/"):
+            return entry
+    runtime = os.environ.get("PULSE_RUNTIME_PATH") or \
+        os.path.join(os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}"), "pulse")
+    return os.path.join(runtime, "native")
+
+def read_cookie():
+    paths = [os.environ.get("PULSE_COOKIE"),
+             os.path.expanduser("~/.config/pulse/cookie"),
+             os.path.expanduser("~/.pulse-cookie")]
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                cookie = f.read(COOKIE_SIZE)
+            if len(cookie) == COOKIE_SIZE:
+                return cookie
+        except (OSError, TypeError):
+            pass
+    return bytes(COOKIE_SIZE)
+
+class Connection:
+    def __init__(self, path=None, name="polybar"):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        self.sock.settimeout(REPLY_TIMEOUT)
+        self.tag = 0
+        self.rbuf = b""
+        self.events = [] # Events read while waiting for a reply
+        try:
+            self.sock.connect(path or server_path())
+            self._auth()
+            self.call(SET_CLIENT_NAME, TagWriter().proplist({"application.name": name}))
+        except (OSError, PulseError):
+            self.sock.close()
+            raise
+
+    def _auth(self):
+        body = TagWriter().u32(PROTOCOL_VERSION).arbitrary(read_cookie())
+        tag = self._next_tag()
+        data = packet(AUTH, tag, body)
+        if hasattr(socket, "SCM_CREDENTIALS"):
+            creds = struct.pack("iII", os.getpid(), os.getuid(), os.getgid())
+            self.sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_CREDENTIALS, creds)])
+        else:
+            self.sock.sendall(data)
+        r = self._wait_reply(tag)
+        self.server_version = r.u32() & 0xFFFF # High bits: shm/memfd flags
+
+    def _next_tag(self):
+        self.tag = (self.tag + 1) & 0x7FFFFFFF
+        return self.tag
+
+    def _fill(self, n):
+        # Buffer at least n bytes; nothing is consumed, so a read timing out
+        # halfway through a packet loses nothing
+        while len(self.rbuf) < n:
+            data = self.sock.recv(max(4096, n - len(self.rbuf)))
+            if not data:
+                raise OSError("sound server closed the connection")
+            self.rbuf += data
+
+    def read_packet(self):
+        # (command, tag, reader over the rest), control packets only
+        while True:
+            self._fill(DESCRIPTOR.size)
+            length, channel, _, _, _ = DESCRIPTOR.unpack_from(self.rbuf)
+            end = DESCRIPTOR.size + length
+            self._fill(end)
+            payload, self.rbuf = self.rbuf[DESCRIPTOR.size:end], self.rbuf[end:]
+            if channel == CONTROL_CHANNEL:
+                r = TagReader(payload)
+                return r.u32(), r.u32(), r
+
+    def _wait_reply(self, tag):
+        while True:
+            command, reply_tag, r = self.read_packet()
+            if command == SUBSCRIBE_EVENT:
+                self.events.append((r.u32(), r.u32()))
+            elif command in (REPLY, ERROR) and reply_tag == tag:
+                if command == ERROR:
+                    raise PulseError(f"server error {r.u32()}")
+                return r
+            elif command == TIMEOUT and reply_tag == tag:
+                raise PulseError("server timeout")
+
+    def call(self, command, body=None):
+        tag = self._next_tag()
+        self.sock.sendall(packet(command, tag, body))
+        return self._wait_reply(tag)
+
+    def subscribe(self, mask):
+        self.call(SUBSCRIBE, TagWriter().u32(mask))
+
+    def next_event(self, timeout=None):
+        # (facility, type, index); None if nothing came within timeout
+        # (0: only what's already buffered or readable right away)
+        while not self.events:
+            self.sock.settimeout(timeout)
+            try:
+                command, _, r = self.read_packet()
+            except (socket.timeout, BlockingIOError):
+                return None
+            finally:
+                self.sock.settimeout(REPLY_TIMEOUT)
+            if command == SUBSCRIBE_EVENT:
+                self.events.append((r.u32(), r.u32()))
+        event, index = self.events.pop(0)
+        return event & FACILITY_MASK, event & TYPE_MASK, index
+
+    def server_info(self):
+        # {"default_sink": ..., "default_source": ...}
+        r = self.call(GET_SERVER_INFO)
+        for _ in range(4): # Package name/version, user, host
+            r.string()
+        r.sample_spec()
+        return {"default_sink": r.string(), "default_source": r.string()}
+
+    def sink(self, name=DEFAULT_SINK):
+        return parse_sink(self.call(GET_SINK_INFO, TagWriter().u32(INVALID_INDEX).string(name)))
+
+    def set_sink_volume(self, sink, volume):
+        # volume: percent, same on every channel
+        raw = (int(volume) * VOLUME_NORM + 50) // 100
+        body = TagWriter().u32(sink.index).string(None).cvolume([raw] * max(len(sink.channels), 1))
+        self.call(SET_SINK_VOLUME, body)
+
+    def set_sink_mute(self, sink, muted):
+        self.call(SET_SINK_MUTE, TagWriter().u32(sink.index).string(None).boolean(muted))
+
+    def close(self):
+        self.sock.close()
+
+def describe(sink):
+    state = "muted" if sink.muted else f"{sink.volume}%"
+    return f"{sink.name} ({sink.description}): {state}, monitor {sink.monitor}"
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "info"
+    try:
+        conn = Connection()
+        if cmd == "info":
+            print(describe(conn.sink()))
+        elif cmd == "watch":
+            conn.subscribe(MASK_SINK | MASK_SERVER)
+            print(describe(conn.sink()), flush=True)
+            while True:
+                conn.next_event()
+                print(describe(conn.sink()), flush=True)
+        else:
+            print("usage: pulse.py [info|watch]", file=sys.stderr)
+            return 1
+    except (OSError, PulseError) as e:
+        print(f"pulse: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
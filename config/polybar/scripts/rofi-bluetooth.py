@@ -6,6 +6,8 @@ import re
 import time
 import shutil
 
+import notify
+
 # Bluetooth Rofi Manager
 # A robust replacement for the bash script to provide a "Manager-like" experience.
 
@@ -206,7 +208,7 @@ def handle_scan():
     cache_file = "/tmp/bt_scan_cache"
     
     # Notify
-    subprocess.Popen(["notify-send", "Bluetooth", "Escaneando (3s)...", "-i", "bluetooth"])
+    progress = notify.send("Bluetooth", "Escaneando (3s)...", icon="bluetooth")
     
     # Create Expect script provided by user feedback that works
     expect_script_path = "/tmp/bt_scan.exp"
@@ -234,7 +236,7 @@ send "exit\\r"
     with open(cache_file, "w") as f:
         f.write(output)
     
-    subprocess.Popen(["notify-send", "Bluetooth", "Escaneo finalizado", "-i", "bluetooth"])
+    progress.update("Bluetooth", "Escaneo finalizado", icon="bluetooth")
 
 def device_submenu(mac, name):
     # Check current status
@@ -331,51 +333,51 @@ if __name__ == "__main__":
                 MAC = None
             elif "󰅖 Desconectar" in value:
                 run_cmd(["bluetoothctl", "disconnect", MAC])
-                subprocess.Popen(["notify-send", "Bluetooth", f"Desconectado: {MAC}", "-i", "bluetooth"])
+                notify.send("Bluetooth", f"Desconectado: {MAC}", icon="bluetooth")
                 # Close menu as requested by user
                 break
             elif "󰂱 Conectar" in value:
-                subprocess.Popen(["notify-send", "Bluetooth", f"Conectando a {MAC}...", "-i", "bluetooth"])
+                progress = notify.send("Bluetooth", f"Conectando a {MAC}...", icon="bluetooth")
                 res = subprocess.run(["bluetoothctl", "connect", MAC], capture_output=True, text=True)
                 if res.returncode == 0:
-                    subprocess.Popen(["notify-send", "Bluetooth", f"Conectado: {MAC}", "-i", "bluetooth", "-u", "normal"])
+                    progress.update("Bluetooth", f"Conectado: {MAC}", icon="bluetooth", urgency="normal")
                     # Auto-trust so it persists in list even if disconnected
                     run_cmd(["bluetoothctl", "trust", MAC])
                     # Close menu as requested by user
                     break
                 else:
                     err = res.stderr.strip() or res.stdout.strip()
-                    subprocess.Popen(["notify-send", "Bluetooth", f"Falló conexión: {err}", "-i", "dialog-error", "-u", "critical"])
+                    progress.update("Bluetooth", f"Falló conexión: {err}", icon="dialog-error", urgency="critical")
                     MAC = None 
             elif " Desvincular" in value:
                 run_cmd(["bluetoothctl", "remove", MAC])
-                subprocess.Popen(["notify-send", "Bluetooth", f"Desvinculado: {MAC}", "-i", "bluetooth"])
+                notify.send("Bluetooth", f"Desvinculado: {MAC}", icon="bluetooth")
                 MAC = None # Device gone, return to main
             elif " Vincular" in value:
-                subprocess.Popen(["notify-send", "Bluetooth", f"Vinculando {MAC}...", "-i", "bluetooth"])
+                progress = notify.send("Bluetooth", f"Vinculando {MAC}...", icon="bluetooth")
                 res = subprocess.run(["bluetoothctl", "pair", MAC], capture_output=True, text=True)
                 if res.returncode == 0:
-                    subprocess.Popen(["notify-send", "Bluetooth", f"Vinculado: {MAC}", "-i", "bluetooth", "-u", "normal"])
+                    progress.update("Bluetooth", f"Vinculado: {MAC}", icon="bluetooth", urgency="normal")
                     # Auto-trust on pair
                     run_cmd(["bluetoothctl", "trust", MAC])
                     
                     # Auto-Connect attempt
-                    subprocess.Popen(["notify-send", "Bluetooth", f"Auto-conectando...", "-i", "bluetooth"])
+                    progress.update("Bluetooth", f"Vinculado: {MAC}. Auto-conectando...", icon="bluetooth")
                     run_cmd(["bluetoothctl", "connect", MAC])
                 else:
                     err = res.stderr.strip() or res.stdout.strip()
-                    subprocess.Popen(["notify-send", "Bluetooth", f"Falló vinculación: {err}", "-i", "dialog-error", "-u", "critical"])
+                    progress.update("Bluetooth", f"Falló vinculación: {err}", icon="dialog-error", urgency="critical")
                     MAC = None # Go back on error
                 
                 # Success path: Stay in submenu
                 time.sleep(1.0) # Longer wait for Pair+Trust+Connect sequence
             elif " Quitar Confianza" in value:
                 run_cmd(["bluetoothctl", "untrust", MAC])
-                subprocess.Popen(["notify-send", "Bluetooth", f"Confianza retirada: {MAC}", "-i", "bluetooth"])
+                notify.send("Bluetooth", f"Confianza retirada: {MAC}", icon="bluetooth")
                 time.sleep(0.5)
             elif " Confiar" in value:
                 run_cmd(["bluetoothctl", "trust", MAC])
-                subprocess.Popen(["notify-send", "Bluetooth", f"Dispositivo de Confianza: {MAC}", "-i", "bluetooth"])
+                notify.send("Bluetooth", f"Dispositivo de Confianza: {MAC}", icon="bluetooth")
                 time.sleep(0.5)
             else:
                 # Device Selection
@@ -4,6 +4,8 @@ import sys
 import os
 import shutil
 
+import notify
+
 # Rofi Wifi Manager for Polybar
 # Advanced logic for Submenus and Actions
 
@@ -130,17 +132,17 @@ def submenu(net):
     if "Desconectar" in choice:
         # Use connection down instead of device disconnect to avoid needing interface name (wlan0)
         run_cmd(["nmcli", "connection", "down", "id", ssid]) 
-        subprocess.Popen(["notify-send", "WiFi", f"Desconectado de {ssid}", "-i", "network-wireless-disconnected"])
+        notify.send("WiFi", f"Desconectado de {ssid}", icon="network-wireless-disconnected")
         
     elif "Conectar" in choice:
         if net["saved"]:
             # Known network, just up
-            subprocess.Popen(["notify-send", "WiFi", f"Conectando a {ssid}...", "-i", "network-wireless-acquiring"])
+            progress = notify.send("WiFi", f"Conectando a {ssid}...", icon="network-wireless-acquiring")
             res = subprocess.run(["nmcli", "connection", "up", "id", ssid], capture_output=True, text=True)
             if res.returncode == 0:
-                subprocess.Popen(["notify-send", "WiFi", f"Conectado: {ssid}", "-i", "network-wireless-connected"])
+                progress.update("WiFi", f"Conectado: {ssid}", icon="network-wireless-connected")
             else:
-                 subprocess.Popen(["notify-send", "WiFi", f"Error: {res.stderr}", "-i", "dialog-error"])
+                 progress.update("WiFi", f"Error: {res.stderr}", icon="dialog-error")
         else:
             # New Network -> Password?
             # Check security
@@ -152,23 +154,23 @@ def submenu(net):
                 
                 if not password: return
                 
-                subprocess.Popen(["notify-send", "WiFi", f"Conectando a {ssid}...", "-i", "network-wireless-acquiring"])
+                progress = notify.send("WiFi", f"Conectando a {ssid}...", icon="network-wireless-acquiring")
                 res = subprocess.run(["nmcli", "device", "wifi", "connect", ssid, "password", password], capture_output=True, text=True)
                 
                 if res.returncode == 0:
-                    subprocess.Popen(["notify-send", "WiFi", f"Conectado: {ssid}", "-i", "network-wireless-connected"])
+                    progress.update("WiFi", f"Conectado: {ssid}", icon="network-wireless-connected")
                 else:
-                    subprocess.Popen(["notify-send", "WiFi", f"Error: {res.stderr}", "-i", "dialog-error"])
+                    progress.update("WiFi", f"Error: {res.stderr}", icon="dialog-error")
             else:
                 # Open Network
-                subprocess.Popen(["notify-send", "WiFi", f"Conectando a {ssid} (Open)...", "-i", "network-wireless-acquiring"])
+                progress = notify.send("WiFi", f"Conectando a {ssid} (Open)...", icon="network-wireless-acquiring")
                 res = subprocess.run(["nmcli", "device", "wifi", "connect", ssid], capture_output=True, text=True)
                 if res.returncode == 0:
-                     subprocess.Popen(["notify-send", "WiFi", f"Conectado: {ssid}", "-i", "network-wireless-connected"])
+                     progress.update("WiFi", f"Conectado: {ssid}", icon="network-wireless-connected")
 
     elif "Olvidar" in choice:
         run_cmd(["nmcli", "connection", "delete", "id", ssid])
-        subprocess.Popen(["notify-send", "WiFi", f"Olvidada: {ssid}", "-i", "network-wireless-disconnected"])
+        notify.send("WiFi", f"Olvidada: {ssid}", icon="network-wireless-disconnected")
 
 def main():
     networks = get_networks()
@@ -224,10 +226,10 @@ def main():
         status = run_cmd(["nmcli", "radio", "wifi"])
         if "enabled" in status:
             run_cmd(["nmcli", "radio", "wifi", "off"])
-            subprocess.Popen(["notify-send", "WiFi", "Desactivado", "-i", "network-wireless-disconnected"])
+            notify.send("WiFi", "Desactivado", icon="network-wireless-disconnected")
         else:
             run_cmd(["nmcli", "radio", "wifi", "on"])
-            subprocess.Popen(["notify-send", "WiFi", "Activado", "-i", "network-wireless-connected"])
+            notify.send("WiFi", "Activado", icon="network-wireless-connected")
         return
 
     # Extract SSID
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+
+import sysfs
+
+# Temperature / Fan Sensor Index
+# One discovery pass over class/hwmon and class/thermal builds an index of
+# the labelled sensors:
+#   {"id": "coretemp/Package id 0", "device": "cpu", "chip": "coretemp",
+#    "label": "Package id 0", "kind": "temp", "path": "class/hwmon/hwmon4/temp1_input",
+#    "trips": {"max": 80000, "crit": 100000}}
+# (temperatures in m°C, fans in RPM, paths relative to the sysfs root). The
+# index is cached in ~/.cache/polybar/sensors.json and reused as long as the
+# hwmon/thermal entries still point at the same devices (one listdir and a
+# readlink per entry instead of reading every name, label and trip point).
+# Reading the selected sensors then costs one pread each (see sysfs.py).
+#
+# Selection ('spec'):
+#   max                    every temperature sensor
+#   cpu, gpu, nvme, acpi   the temperature sensors of that device class
+#   coretemp/Core *        sensor ids, fnmatch patterns allowed
+#
+# Usage:
+#   index = sensors.load_index()
+#   reader = sensors.Reader(sensors.select(index, "cpu"))
+#   reader.max()                            -> 54.0 (°C, None if unreadable)
+#
+#   ./sensors.py [list|read [SPEC]|rescan]
+
+CACHE_VERSION = 1
+
+# hwmon 'name' / thermal zone 'type' -> device class
+DEVICE_CLASSES = {
+    "coretemp": "cpu",
+    "k10temp": "cpu",
+    "zenpower": "cpu",
+    "x86_pkg_temp": "cpu",
+    "cpu_thermal": "cpu",
+    "amdgpu": "gpu",
+    "radeon": "gpu",
+    "nouveau": "gpu",
+    "i915": "gpu",
+    "nvme": "nvme",
+    "drivetemp": "disk",
+    "acpitz": "acpi",
+}
+
+def cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "polybar", "sensors.json")
+
+def read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def read_number(path):
+    try:
+        return int(read_text(path))
+    except (TypeError, ValueError):
+        return None
+
+def device_class(chip):
+    if chip.startswith("iwlwifi"):
+        return "wifi"
+    return DEVICE_CLASSES.get(chip, chip)
+
+def entries(cls):
+    try:
+        return sorted(os.listdir(os.path.join(sysfs.SYSFS_ROOT, "class", cls)))
+    except OSError:
+        return []
+
+def signature():
+    # What the cached index depends on: the entries and the devices they point to
+    sig = []
+    for cls in ("hwmon", "thermal"):
+        for entry in entries(cls):
+            try:
+                target = os.readlink(os.path.join(sysfs.SYSFS_ROOT, "class", cls, entry))
+            except OSError:
+                target = "" # Plain directory (fake tree)
+            sig.append(f"{cls}/{entry}={target}")
+    return sig
+
+def _hwmon_sensors(entry):
+    rel = os.path.join("class", "hwmon", entry)
+    directory = os.path.join(sysfs.SYSFS_ROOT, rel)
+    chip = read_text(os.path.join(directory, "name"))
+    if chip is None:
+        return []
+    found = []
+    for name in sorted(os.listdir(directory)):
+        prefix, _, suffix = name.partition("_")
+        if suffix != "input" or not prefix.startswith(("temp", "fan")):
+            continue
+        kind = "temp" if prefix.startswith("temp") else "fan"
+        label = read_text(os.path.join(directory, f"{prefix}_label")) or prefix
+        trips = {}
+        if kind == "temp":
+            for trip in ("max", "crit", "emergency"):
+                value = read_number(os.path.join(directory, f"{prefix}_{trip}"))
+                if value:
+                    trips[trip] = value
+        found.append({"chip": chip, "label": label, "kind": kind,
+                      "path": os.path.join(rel, name), "trips": trips})
+    return found
+
+def _thermal_sensor(entry, hwmon_chips):
+    if not entry.startswith("thermal_zone"):
+        return None # cooling_deviceN
+    rel = os.path.join("class", "thermal", entry)
+    directory = os.path.join(sysfs.SYSFS_ROOT, rel)
+    zone_type = read_text(os.path.join(directory, "type"))
+    if zone_type is None or zone_type in hwmon_chips:
+        return None # Also registered as hwmon (acpitz...): already indexed
+    trips = {}
+    for name in os.listdir(directory):
+        if name.startswith("trip_point_") and name.endswith("_type"):
+            trip_type = read_text(os.path.join(directory, name))
+            value = read_number(os.path.join(directory, name[:-len("_type")] + "_temp"))
+            if trip_type and value and value > trips.get(trip_type, 0):
+                trips[trip_type] = value
+    return {"chip": zone_type, "label": entry, "kind": "temp",
+            "path": os.path.join(rel, "temp"), "trips": trips}
+
+def discover():
+    found = []
+    for entry in entries("hwmon"):
+        found.extend(_hwmon_sensors(entry))
+    hwmon_chips = {s["chip"] for s in found}
+    for entry in entries("thermal"):
+        sensor = _thermal_sensor(entry, hwmon_chips)
+        if sensor:
+            found.append(sensor)
+
+    seen = {}
+    for sensor in found:
+        sensor_id = f"{sensor['chip']}/{sensor['label']}"
+        seen[sensor_id] = seen.get(sensor_id, 0) + 1
+        if seen[sensor_id] > 1:
+            sensor_id += f"#{seen[sensor_id]}" # Two NVMe drives...
+        sensor["id"] = sensor_id
+        sensor["device"] = device_class(sensor["chip"])
+    return found
+
+def load_index(rescan=False):
+    path = cache_path()
+    sig = signature()
+    if not rescan:
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached.get("version") == CACHE_VERSION and cached.get("root") == sysfs.SYSFS_ROOT \
+                    and cached.get("signature") == sig:
+                return cached["sensors"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    index = discover()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"version": CACHE_VERSION, "root": sysfs.SYSFS_ROOT,
+                       "signature": sig, "sensors": index}, f)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass # Rediscovered next time
+    return index
+
+def select(index, spec="max"):
+    temps = [s for s in index if s["kind"] == "temp"]
+    if spec == "max":
+        return temps
+    chosen = [s for s in temps if s["device"] == spec]
+    if not chosen:
+        import fnmatch # Only for ids/patterns (pulls in re)
+        chosen = [s for s in index if fnmatch.fnmatchcase(s["id"], spec)]
+    return chosen
+
+class Reader:
+    # Batched read of a fixed set of sensors
+    def __init__(self, sensors):
+        self.sensors = sensors
+        self.attrs = [sysfs.attribute(s["path"]) for s in sensors]
+
+    def read(self):
+        # [value or None], temperatures in °C, fans in RPM
+        values = []
+        for sensor, attr in zip(self.sensors, self.attrs):
+            raw = attr.read_int()
+            if raw is not None and sensor["kind"] == "temp":
+                raw /= 1000.0
+            values.append(raw)
+        return values
+
+    def max(self):
+        values = [v for v, s in zip(self.read(), self.sensors) if v is not None and s["kind"] == "temp"]
+        return max(values) if values else None
+
+def main():
+    args = sys.argv[1:]
+    cmd = args[0] if args else "list"
+
+    if cmd in ("list", "rescan"):
+        for s in load_index(rescan=cmd == "rescan"):
+            trips = " ".join(f"{k}={v / 1000:.0f}" for k, v in sorted(s["trips"].items()))
+            print(f"{s['id']:<32} {s['device']:<6} {s['kind']:<5} {s['path']}  {trips}".rstrip())
+    elif cmd == "read":
+        chosen = select(load_index(), args[1] if len(args) > 1 else "max")
+        for s, value in zip(chosen, Reader(chosen).read()):
+            unit = "°C" if s["kind"] == "temp" else " RPM"
+            print(f"{s['id']:<32} {'-' if value is None else f'{value:g}{unit}'}")
+    else:
+        print("usage: sensors.py [list|read [SPEC]|rescan]", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
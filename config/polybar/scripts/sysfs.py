@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import os
+import threading
+
+# Persistent sysfs Reader
+# sysfs attributes regenerate their value on every read at offset 0, so a
+# file only has to be opened once: each attribute keeps its descriptor and
+# is re-read with preadv() at offset 0 into a reused buffer. If the device
+# goes away (battery removed, module reloaded) the read fails, and the
+# attribute is re-opened transparently on the next read.
+#
+# Usage:
+#   temp = sysfs.attribute("class/thermal/thermal_zone0/temp")
+#   temp.read_int()                      -> 54000 (None if unavailable)
+#   bat = sysfs.Group("class/power_supply/BAT0", "energy_now", "status")
+#   bat.read()                           -> {"energy_now": "35120000", "status": "Discharging"}
+#
+# Relative paths are taken from SYSFS_ROOT, which can be redirected to a fake
+# tree (benchmarks) with POLYBAR_SYSFS_ROOT.
+
+SYSFS_ROOT = os.environ.get("POLYBAR_SYSFS_ROOT", "/sys")
+BUF_SIZE = 4096 # One page: the most a sysfs attribute returns
+
+def path_of(path):
+    return path if os.path.isabs(path) else os.path.join(SYSFS_ROOT, path)
+
+class Attribute:
+    def __init__(self, path):
+        self.path = path_of(path)
+        self.fd = None
+        self.buf = bytearray(BUF_SIZE)
+        self.view = memoryview(self.buf)
+        self.lock = threading.Lock()
+
+    def _open(self):
+        try:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            self.fd = None
+        return self.fd is not None
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def read_bytes(self):
+        # Raw value without the trailing newline, None if unavailable
+        with self.lock:
+            for _ in range(2):
+                if self.fd is None and not self._open():
+                    return None
+                try:
+                    n = os.preadv(self.fd, [self.buf], 0)
+                    if n and self.buf[n - 1] == 10: # Trailing newline
+                        n -= 1
+                    return bytes(self.view[:n]) # The only copy
+                except OSError:
+                    # Stale descriptor (ENODEV...): re-open once
+                    self.close()
+            return None
+
+    def read(self):
+        value = self.read_bytes()
+        return value.decode(errors="replace") if value is not None else None
+
+    def read_int(self):
+        value = self.read_bytes()
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+# One Attribute per path, shared by every module of the process
+_attributes = {}
+_attributes_lock = threading.Lock()
+
+def attribute(path):
+    path = path_of(path)
+    with _attributes_lock:
+        attr = _attributes.get(path)
+        if attr is None:
+            attr = _attributes[path] = Attribute(path)
+        return attr
+
+class Group:
+    # Several attributes of one device directory, read in one batch
+    def __init__(self, directory, *names):
+        self.names = names
+        self.attrs = [attribute(os.path.join(path_of(directory), name)) for name in names]
+
+    def read(self):
+        # {name: value or None}
+        return {name: attr.read() for name, attr in zip(self.names, self.attrs)}
+
+    def read_ints(self):
+        return {name: attr.read_int() for name, attr in zip(self.names, self.attrs)}
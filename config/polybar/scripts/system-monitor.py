@@ -1,92 +1,686 @@
 #!/usr/bin/env python3
+import heapq
+import os
+import select
 import sys
 import subprocess
+import threading
 import time
+from array import array
+
+import gradients
+import notify
+import sysfs
 
 # System Color Monitor
-# Usage: ./system-monitor.py [cpu|ram|gpu]
+# Usage: ./system-monitor.py [cpu|cpu-detail|ram|gpu|gpu-detail]
+#        ./system-monitor.py stream [cpu|ram]   (resident, sparkline, tail = true)
+#        ./system-monitor.py memory             (resident, PSI triggers, tail = true)
+
+# /proc and /sys can be redirected to fake trees (benchmarks)
+PROC_ROOT = os.environ.get("POLYBAR_PROC_ROOT", "/proc")
+SYSFS_ROOT = sysfs.SYSFS_ROOT
 
 COLOR_NORMAL = "" # Inherit default (Turquoise)
-COLOR_WARN = "%{F#FFC07F}" # Pastel Orange
-COLOR_CRIT = "%{F#FF7A7A}" # Pastel Red
+COLOR_WARN = gradients.COLOR_WARN # Pastel Orange
+COLOR_CRIT = gradients.COLOR_CRIT # Pastel Red
 COLOR_END = "%{F-}"
 
-def get_color(val, warn, crit):
-    if val >= crit:
-        return COLOR_CRIT
-    elif val >= warn:
-        return COLOR_WARN
-    else:
-        return COLOR_NORMAL
+# Ready-to-print labels for 0..100%, colour by threshold (see gradients.py)
+def build_labels(colors):
+    return [f"{colors(v)}{v}%{COLOR_END}" for v in range(101)]
+
+CPU_LABELS = build_labels(gradients.CPU) # 0-59 Normal, 60-74 Warn, 75+ Crit
+RAM_LABELS = build_labels(gradients.RAM) # 0-54 Normal, 55-74 Warn, 75+ Crit
+GPU_LABELS = build_labels(gradients.GPU) # 0-59 Normal, 60-74 Warn, 75+ Crit
+
+def label(labels, val):
+    return labels[min(max(int(val), 0), 100)]
+
+# --- CPU Sampler ---
+# /proc/stat counters are cumulative, so usage is the delta between two
+# snapshots. Instead of sleeping between two reads, the previous snapshot is
+# kept (in memory when resident, in a tmpfs state file when one-shot) and
+# every call returns the delta since the last one straight away.
+# Columns: user nice system idle iowait irq softirq steal (guest and
+# guest_nice are already counted in user/nice).
+
+CPU_FIELDS = 8
+IDLE, IOWAIT, SOFTIRQ, STEAL = 3, 4, 6, 7
+
+def read_cpu_stat():
+    # Single read of /proc/stat: {"cpu": [...], "cpu0": [...], ...}
+    stat = {}
+    with open(f'{PROC_ROOT}/stat', 'r') as f:
+        for line in f:
+            if not line.startswith('cpu'):
+                break
+            parts = line.split()
+            stat[parts[0]] = [int(p) for p in parts[1:CPU_FIELDS + 1]]
+    return stat
+
+def cpu_shares(prev, cur):
+    # Percentages of the elapsed ticks
+    delta = [c - p for c, p in zip(cur, prev)]
+    total = sum(delta)
+    if total <= 0:
+        return None
+    return {
+        "usage": 100.0 * (total - delta[IDLE] - delta[IOWAIT]) / total,
+        "iowait": 100.0 * delta[IOWAIT] / total,
+        "softirq": 100.0 * delta[SOFTIRQ] / total,
+        "steal": 100.0 * delta[STEAL] / total,
+    }
+
+def state_dir():
+    # tmpfs: no disk writes for the one-shot snapshot
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/dev/shm"
+    return base if os.path.isdir(base) else "/tmp"
+
+class CpuSampler:
+    def __init__(self, state_file=None):
+        self.state_file = state_file
+        self.prev = None
+
+    def _load(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return {parts[0]: [int(p) for p in parts[1:]] for parts in map(str.split, f) if parts}
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, stat):
+        tmp = f"{self.state_file}.{os.getpid()}"
+        try:
+            with open(tmp, 'w') as f:
+                f.write("".join(f"{name} {' '.join(map(str, v))}\n" for name, v in stat.items()))
+            os.replace(tmp, self.state_file)
+        except OSError:
+            pass
+
+    def sample(self):
+        # Shares since the previous call (since boot on the very first one)
+        cur = read_cpu_stat()
+        prev = self.prev
+        if prev is None and self.state_file:
+            prev = self._load()
+        if prev is None:
+            prev = {}
+
+        self.prev = cur
+        if self.state_file:
+            self._save(cur)
+
+        zero = [0] * CPU_FIELDS
+        result = cpu_shares(prev.get("cpu", zero), cur.get("cpu", zero))
+        if result is None:
+            return None
+        result["cores"] = []
+        for name, values in cur.items():
+            if name == "cpu":
+                continue
+            core = cpu_shares(prev.get(name, zero), values)
+            result["cores"].append(core["usage"] if core else 0.0)
+        return result
+
+# In memory by default (resident); main() switches to the state file
+cpu_sampler = CpuSampler()
 
 def get_cpu():
-    # Read /proc/stat
-    def read_stat():
-        with open('/proc/stat', 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                if line.startswith('cpu '):
-                    parts = line.split()
-                    # user, nice, system, idle, iowait, irq, softirq, steal
-                    parts = [int(p) for p in parts[1:]]
-                    idle = parts[3] + parts[4] # idle + iowait
-                    total = sum(parts)
-                    return idle, total
-        return 0, 0
-
-    idle1, total1 = read_stat()
-    time.sleep(0.5)
-    idle2, total2 = read_stat()
+    shares = cpu_sampler.sample()
+    if shares is None: return "0%"
     
-    total_delta = total2 - total1
-    idle_delta = idle2 - idle1
-    
-    if total_delta == 0: return "0%"
-    
-    cpu_usage = 100.0 * (1.0 - idle_delta / total_delta)
-    
-    # Logic: 0-59 Normal, 60-74 Warn, 75+ Crit
-    col = get_color(cpu_usage, 60, 75)
-    
-    return f"{col}{int(cpu_usage)}%{COLOR_END}"
+    return label(CPU_LABELS, shares["usage"])
 
-def get_ram():
-    # Read /proc/meminfo
-    mem_total = 0
-    mem_avail = 0
+def get_cpu_detail():
+    # e.g. "cpu 23% io 1% si 0% st 0% | 31 12 40 9"
+    shares = cpu_sampler.sample()
+    if shares is None: return ""
     
-    with open('/proc/meminfo', 'r') as f:
+    cores = " ".join(f"{int(c)}" for c in shares["cores"])
+    return (f"cpu {int(shares['usage'])}% io {int(shares['iowait'])}% "
+            f"si {int(shares['softirq'])}% st {int(shares['steal'])}% | {cores}")
+
+CPU_DETAIL_WINDOW = 0.5 # s measured for the click notification
+
+def show_cpu_detail():
+    # Click (polybar-host.py action cpu detail): the detail line over the
+    # last CPU_DETAIL_WINDOW, not since the previous click
+    cpu_sampler.sample()
+    time.sleep(CPU_DETAIL_WINDOW)
+    detail = get_cpu_detail()
+    if detail:
+        notify.send("CPU", detail, app="cpu")
+
+# Fields kept from /proc/meminfo (kB), all taken in a single pass
+MEMINFO_FIELDS = {"MemTotal", "MemAvailable", "SwapTotal", "SwapFree", "Zswap", "Zswapped"}
+
+def read_meminfo():
+    info = {}
+    with open(f'{PROC_ROOT}/meminfo', 'r') as f:
         for line in f:
-            if line.startswith('MemTotal:'):
-                mem_total = int(line.split()[1])
-            elif line.startswith('MemAvailable:'):
-                mem_avail = int(line.split()[1])
+            key, _, rest = line.partition(':')
+            if key in MEMINFO_FIELDS:
+                info[key] = int(rest.split()[0])
+    return info
+
+def ram_percent(info):
+    mem_total = info.get("MemTotal", 0)
+    if mem_total == 0: return None
     
-    if mem_total == 0: return "0%"
+    used = mem_total - info.get("MemAvailable", 0)
+    return (used / mem_total) * 100.0
+
+def read_ram_percent():
+    return ram_percent(read_meminfo())
+
+def emit(line):
+    # Output hook (polybar-host.py replaces it to publish the line)
+    print(line, flush=True)
+
+def get_ram():
+    percent = read_ram_percent()
+    if percent is None: return "0%"
     
-    used = mem_total - mem_avail
-    percent = (used / mem_total) * 100.0
+    return label(RAM_LABELS, percent)
+
+# --- Top Processes ---
+# When CPU or RAM turns critical the bar names the worst offenders:
+#   91% ▃▅██ ▲97 · cc1plus 98% · firefox 41%
+# A resident scanner walks /proc/[pid]/stat with os.scandir (one raw read per
+# pid, no file object) and keeps, per pid, the start time, comm and previous
+# tick count: comm is only decoded for new pids (or a reused pid, whose start
+# time changes) and CPU is the tick delta since the previous scan, in % of
+# one core. CPU scans already run at the warning level, so the baseline is
+# there when it turns critical; RSS needs no baseline.
+
+TOP_PROCESSES = 3
+SCAN_MIN_INTERVAL = 1.0 # s: slots rendering together share one scan
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# Fields after "pid (comm) ": state=0 ... utime=11 stime=12 starttime=19 rss=21
+UTIME, STIME, STARTTIME, RSS = 11, 12, 19, 21
+
+def format_size(size):
+    if size >= 1 << 30:
+        return f"{size / (1 << 30):.1f}G"
+    return f"{size >> 20}M"
+
+class ProcessScanner:
+    def __init__(self):
+        self.known = {}       # pid -> (starttime, comm, ticks)
+        self.procs = []       # [(cpu %, rss bytes, comm)] of the last scan
+        self.last_scan = None
+        self.lock = threading.Lock()
+
+    def scan(self):
+        now = time.monotonic()
+        ticks_per_core = (now - self.last_scan) * CLK_TCK if self.last_scan else 0
+        known = self.known
+        current = {}
+        procs = []
+        with os.scandir(PROC_ROOT) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                try:
+                    fd = os.open(f"{entry.path}/stat", os.O_RDONLY)
+                except OSError:
+                    continue # Exited meanwhile
+                try:
+                    data = os.read(fd, 1024)
+                except OSError:
+                    continue
+                finally:
+                    os.close(fd)
+                end = data.rfind(b")")
+                fields = data[end + 2:].split()
+                try:
+                    ticks = int(fields[UTIME]) + int(fields[STIME])
+                    start = fields[STARTTIME]
+                    rss = int(fields[RSS]) * PAGE_SIZE
+                except (IndexError, ValueError):
+                    continue
+                pid = int(name)
+                prev = known.get(pid)
+                if prev is not None and prev[0] == start:
+                    comm = prev[1]
+                    cpu = 100.0 * (ticks - prev[2]) / ticks_per_core if ticks_per_core else 0.0
+                else:
+                    comm = data[data.find(b"(") + 1:end].decode(errors="replace")
+                    cpu = 0.0
+                current[pid] = (start, comm, ticks)
+                procs.append((cpu, rss, comm))
+        self.known = current # Drops the pids that exited
+        self.procs = procs
+        self.last_scan = now
+
+    def refresh(self):
+        with self.lock:
+            if self.last_scan is None or time.monotonic() - self.last_scan >= SCAN_MIN_INTERVAL:
+                self.scan()
+
+    def top(self, kind, n=TOP_PROCESSES):
+        # kind: "cpu" or "ram"
+        self.refresh()
+        if kind == "cpu":
+            procs = heapq.nlargest(n, self.procs, key=lambda p: p[0])
+            return [f"{comm} {int(cpu)}%" for cpu, _, comm in procs if cpu >= 1]
+        procs = heapq.nlargest(n, self.procs, key=lambda p: p[1])
+        return [f"{comm} {format_size(rss)}" for _, rss, comm in procs if rss]
+
+scanner = ProcessScanner()
+
+def offenders(kind, value):
+    # " · name 98% · ..." while 'value' is critical, "" otherwise
+    colors = gradients.CPU if kind == "cpu" else gradients.RAM
+    color = colors(value)
+    if color == COLOR_CRIT:
+        names = scanner.top(kind)
+        return "".join(f" · {n}" for n in names)
+    if color != COLOR_NORMAL and kind == "cpu":
+        scanner.refresh() # Keep the tick baseline warm
+    return ""
+
+# --- Memory Pressure ---
+# Resident memory mode driven by kernel PSI triggers instead of a timer:
+# one trigger per /proc/pressure file descriptor, woken with poll(POLLPRI)
+# when the stall time in a window crosses the threshold. While under
+# pressure the averages are re-checked every PRESSURE_RECHECK seconds until
+# they fall back; when calm the line is only refreshed every MEMORY_REFRESH
+# seconds. Only changed lines are emitted.
+# Without PSI (or trigger permission) it falls back to reading the averages
+# every PRESSURE_RECHECK seconds.
+# Compressed swap: zram devices (/sys/block/zram*/mm_stat, compressed size
+# and ratio), else zswap (meminfo; on a zram system its fields read 0).
+#   62% sw 8% zr 310M x3.4            calm
+#   62% sw 8% zr 310M x3.4 psi 12/4   memory some / io full avg10 (coloured)
+#   62% sw 8% zs 310M                 zswap instead of zram
+
+PSI_WINDOW_US = 2000000 # Unprivileged triggers need a multiple of 2 s
+# (resource, line, stall µs per window, avg10 % that counts as pressure, level)
+PSI_TRIGGERS = [
+    ("memory", "some", 100000, 5.0, 1),
+    ("io", "full", 100000, 5.0, 1),
+    ("memory", "full", 40000, 2.0, 2),
+]
+PRESSURE_RECHECK = 2
+MEMORY_REFRESH = 30
+
+PRESSURE_COLORS = [COLOR_NORMAL, COLOR_WARN, COLOR_CRIT]
+
+def read_pressure(resource):
+    # {"some": avg10, "full": avg10}
+    avg = {}
+    try:
+        with open(f'{PROC_ROOT}/pressure/{resource}', 'r') as f:
+            for line in f:
+                kind, _, fields = line.partition(' ')
+                avg[kind] = float(fields.split()[0].partition('=')[2])
+    except (OSError, ValueError, IndexError):
+        pass
+    return avg
+
+def pressure_level():
+    # (level 0-2, memory some avg10, io full avg10)
+    avgs = {resource: read_pressure(resource) for resource in ("memory", "io")}
+    level = 0
+    for resource, kind, _, limit, lvl in PSI_TRIGGERS:
+        if avgs[resource].get(kind, 0.0) >= limit:
+            level = max(level, lvl)
+    return level, avgs["memory"].get("some", 0.0), avgs["io"].get("full", 0.0)
+
+class PressureTriggers:
+    # fds: already open stand-ins for the pressure files, one per PSI_TRIGGERS
+    # entry (benchmarks); by default they are opened under PROC_ROOT
+    def __init__(self, fds=None):
+        self.poller = select.poll()
+        self.fds = []
+        if fds is None and PROC_ROOT != "/proc":
+            return # Fake tree (benchmarks): a regular file, writing would clobber it
+        try:
+            for i, (resource, kind, stall_us, _, _) in enumerate(PSI_TRIGGERS):
+                if fds is None:
+                    fd = os.open(f'{PROC_ROOT}/pressure/{resource}', os.O_RDWR | os.O_NONBLOCK)
+                else:
+                    fd = fds[i]
+                self.fds.append(fd)
+                os.write(fd, f"{kind} {stall_us} {PSI_WINDOW_US}\0".encode())
+                self.poller.register(fd, select.POLLPRI)
+        except OSError:
+            self.close()
+
+    def close(self):
+        for fd in self.fds:
+            os.close(fd)
+        self.fds = []
+
+    def wait(self, timeout):
+        # True if a trigger fired before the timeout
+        if not self.fds:
+            time.sleep(min(timeout, PRESSURE_RECHECK))
+            return False
+        events = self.poller.poll(timeout * 1000)
+        if any(ev & (select.POLLERR | select.POLLNVAL) for _, ev in events):
+            self.close() # e.g. the cgroup went away: fall back to polling
+        return bool(events)
+
+# mm_stat: orig_data_size compr_data_size mem_used_total ... (bytes)
+_zram = None # [sysfs.Attribute] of the zram devices, looked up on first use
+
+def zram_attributes():
+    global _zram
+    if _zram is None:
+        try:
+            names = sorted(n for n in os.listdir(f"{SYSFS_ROOT}/block") if n.startswith("zram"))
+        except OSError:
+            names = []
+        _zram = [sysfs.attribute(f"{SYSFS_ROOT}/block/{n}/mm_stat") for n in names]
+    return _zram
+
+def read_zram():
+    # (original bytes, compressed bytes) over all devices, None without zram
+    attrs = zram_attributes()
+    if not attrs:
+        return None
+    orig = compr = 0
+    for attr in attrs:
+        fields = (attr.read_bytes() or b"").split()
+        if len(fields) >= 2:
+            orig += int(fields[0])
+            compr += int(fields[1])
+    return orig, compr
+
+def compressed_swap(info):
+    zram = read_zram()
+    if zram is not None:
+        orig, compr = zram
+        return f" zr {format_size(compr)} x{orig / compr:.1f}" if compr else ""
+    if info.get("Zswapped"):
+        return f" zs {info.get('Zswap', 0) >> 10}M"
+    return ""
+
+def get_memory(level=0, mem_some=0.0, io_full=0.0):
+    info = read_meminfo()
+    percent = ram_percent(info)
+    if percent is None: return "0%"
     
-    # Logic: 0-54 Normal, 55-74 Warn, 75+ Crit
-    col = get_color(percent, 55, 75)
+    if level:
+        text = f"{PRESSURE_COLORS[level]}{int(percent)}%{COLOR_END}"
+    else:
+        text = label(RAM_LABELS, percent)
     
-    return f"{col}{int(percent)}%{COLOR_END}"
+    swap_total = info.get("SwapTotal", 0)
+    swap_used = swap_total - info.get("SwapFree", 0)
+    if swap_total and swap_used * 100 >= swap_total:
+        text += f" sw {swap_used * 100 // swap_total}%"
+    text += compressed_swap(info)
+    if level:
+        text += f" {PRESSURE_COLORS[level]}psi {int(mem_some)}/{int(io_full)}{COLOR_END}"
+    return text + offenders("ram", 100 if level == 2 else percent)
 
-def get_gpu():
+def watch_memory(triggers=None):
+    if triggers is None:
+        triggers = PressureTriggers()
+    last = None
+    while True:
+        level, mem_some, io_full = pressure_level()
+        line = get_memory(level, mem_some, io_full)
+        if line != last:
+            emit(line)
+            last = line
+        triggers.wait(PRESSURE_RECHECK if level else MEMORY_REFRESH)
+
+# --- History ---
+# A resident sampler reads CPU and RAM every SAMPLE_INTERVAL (one /proc read
+# each) into fixed-size ring buffers, so spikes between two bar refreshes
+# aren't lost. The bar shows the short-window average, a block sparkline of
+# the recent past and the peak held over the whole buffer:
+#   23% ▁▂▅█▃▂▁▁ ▲87
+
+SAMPLE_INTERVAL = 0.25   # seconds
+HISTORY_SIZE = 128       # samples (32 s): peak-hold window
+AVERAGE_SAMPLES = 8      # 2 s: main value
+SPARK_WIDTH = 8          # characters
+SPARK_SAMPLES = 4        # samples per character (max of them, keeps spikes)
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+SPARK_CHARS = [SPARK_BLOCKS[min(v * len(SPARK_BLOCKS) // 100, len(SPARK_BLOCKS) - 1)] for v in range(101)]
+
+class History:
+    # Ring buffer of floats backed by an array (no per-sample objects)
+    def __init__(self, size=HISTORY_SIZE):
+        self.buf = array('f', bytes(4 * size))
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def push(self, value):
+        self.buf[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def last(self, n):
+        # Most recent n samples, oldest first
+        n = min(n, self.count)
+        start = (self.pos - n) % self.size
+        if start + n <= self.size:
+            return self.buf[start:start + n]
+        return self.buf[start:] + self.buf[:(start + n) % self.size]
+
+    def mean(self, n):
+        values = self.last(n)
+        return sum(values) / len(values) if values else 0.0
+
+    def peak(self):
+        return max(self.last(self.count), default=0.0)
+
+def sparkline(history, width=SPARK_WIDTH, per_char=SPARK_SAMPLES):
+    values = history.last(width * per_char)
+    chars = []
+    for i in range(0, len(values), per_char):
+        v = int(max(values[i:i + per_char]))
+        chars.append(SPARK_CHARS[min(max(v, 0), 100)])
+    return "".join(chars).rjust(width, SPARK_BLOCKS[0])
+
+class ResidentSampler:
+    # Background sampling thread, started on first use
+    def __init__(self):
+        self.cpu = History()
+        self.ram = History()
+        self.cpu_sampler = CpuSampler()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.sample()
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def sample(self):
+        shares = self.cpu_sampler.sample()
+        ram = read_ram_percent()
+        with self.lock:
+            if shares is not None:
+                self.cpu.push(shares["usage"])
+            if ram is not None:
+                self.ram.push(ram)
+
+    def _loop(self):
+        while True:
+            time.sleep(SAMPLE_INTERVAL)
+            try:
+                self.sample()
+            except OSError:
+                pass
+
+    def render(self, history, labels, kind):
+        self.start()
+        with self.lock:
+            if not history.count:
+                return ""
+            value = history.mean(AVERAGE_SAMPLES)
+            spark = sparkline(history)
+            peak = int(history.peak())
+        return f"{label(labels, value)} {spark} ▲{peak}{offenders(kind, value)}"
+
+resident = ResidentSampler()
+
+def get_cpu_history():
+    return resident.render(resident.cpu, CPU_LABELS, "cpu")
+
+def get_ram_history():
+    return resident.render(resident.ram, RAM_LABELS, "ram")
+
+# --- GPU ---
+# Resident: cards with DRM sysfs telemetry (amdgpu, recent i915/xe) are read
+# straight from sysfs; NVIDIA cards from one long-running 'nvidia-smi -lms'
+# stream whose latest line is kept, instead of forking nvidia-smi per poll.
+# One-shot (main): sysfs, or a single nvidia-smi query.
+# nvidia-smi failing right away (driver not loaded...) is retried with a
+# growing delay, then left alone: the module shows nothing, like without GPU.
+# Readings: {"usage": %, "mem_used": MiB, "mem_total": MiB, "temp": °C},
+# fields the card doesn't report are None.
+
+GPU_QUERY = "utilization.gpu,memory.used,memory.total,temperature.gpu"
+GPU_STREAM_MS = 2000
+GPU_RESTART_DELAY = 5   # s, doubled after every run that printed nothing
+GPU_MAX_FAILURES = 5    # such runs in a row: give up, no GPU
+
+def gpu_field(value):
     try:
-        # nvidia-smi --query-gpu=utilization.gpu --format=csv,noheader,nounits
-        output = subprocess.check_output(
-            ["nvidia-smi", "--query-gpu=utilization.gpu", "--format=csv,noheader,nounits"],
-            text=True
-        ).strip()
-        usage = int(output)
-        
-        # Logic: 0-59 Normal, 60-74 Warn, 75+ Crit
-        col = get_color(usage, 60, 75)
-        
-        return f"{col}{usage}%{COLOR_END}"
-    except:
-        return ""
+        return int(float(value))
+    except ValueError:
+        return None # "[N/A]", "[Not Supported]"
+
+def parse_gpu_line(line):
+    # "37, 1024, 8192, 45"
+    fields = [gpu_field(v) for v in line.split(",")]
+    if len(fields) < 4 or fields[0] is None:
+        return None
+    return {"usage": fields[0], "mem_used": fields[1], "mem_total": fields[2], "temp": fields[3]}
+
+def find_drm_device():
+    # (device attributes, temperature attribute) of the first card with
+    # gpu_busy_percent, kept open (see sysfs.py)
+    base = f"{SYSFS_ROOT}/class/drm"
+    try:
+        cards = sorted(n for n in os.listdir(base) if n.startswith("card") and "-" not in n)
+    except OSError:
+        return None
+    for card in cards:
+        device = f"{base}/{card}/device"
+        if not os.path.exists(f"{device}/gpu_busy_percent"):
+            continue
+        temp = None
+        try:
+            for hwmon in sorted(os.listdir(f"{device}/hwmon")):
+                if os.path.exists(f"{device}/hwmon/{hwmon}/temp1_input"):
+                    temp = f"{device}/hwmon/{hwmon}/temp1_input"
+                    break
+        except OSError:
+            pass
+        attrs = sysfs.Group(device, "gpu_busy_percent", "mem_info_vram_used", "mem_info_vram_total")
+        return attrs, sysfs.attribute(temp) if temp else None
+    return None
+
+def read_drm(drm):
+    attrs, temp_attr = drm
+    values = attrs.read_ints()
+    usage = values["gpu_busy_percent"]
+    if usage is None:
+        return None
+    used = values["mem_info_vram_used"]
+    total = values["mem_info_vram_total"]
+    temp = temp_attr.read_int() if temp_attr else None
+    return {
+        "usage": usage,
+        "mem_used": used >> 20 if used is not None else None,
+        "mem_total": total >> 20 if total is not None else None,
+        "temp": temp // 1000 if temp is not None else None,
+    }
+
+def nvidia_smi_command(stream):
+    cmd = ["nvidia-smi", "-i", "0", f"--query-gpu={GPU_QUERY}", "--format=csv,noheader,nounits"]
+    if stream:
+        cmd += ["-lms", str(GPU_STREAM_MS)]
+    return cmd
+
+class GpuMonitor:
+    def __init__(self, stream=True):
+        self.stream = stream
+        self.drm = None
+        self.latest = None
+        self.ready = threading.Event()
+        self.started = False
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        self.drm = find_drm_device()
+        if self.drm is None and self.stream:
+            threading.Thread(target=self._stream_loop, daemon=True).start()
+            # nvidia-smi prints its first line right away
+            self.ready.wait(1)
+
+    def _stream_loop(self):
+        # Restart the stream if nvidia-smi exits (driver reload...)
+        failures = 0
+        while failures < GPU_MAX_FAILURES:
+            try:
+                proc = subprocess.Popen(nvidia_smi_command(True), stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True)
+            except OSError:
+                break # No nvidia-smi: no NVIDIA card
+            streamed = False
+            for line in proc.stdout:
+                self.latest = parse_gpu_line(line)
+                streamed = True
+                self.ready.set()
+            proc.wait()
+            self.latest = None
+            failures = 0 if streamed else failures + 1
+            self.ready.set()
+            if failures < GPU_MAX_FAILURES:
+                time.sleep(GPU_RESTART_DELAY * 2 ** max(failures - 1, 0))
+        self.ready.set()
+
+    def read(self):
+        self.start()
+        if self.drm is not None:
+            return read_drm(self.drm)
+        if self.stream:
+            return self.latest
+        try:
+            return parse_gpu_line(subprocess.check_output(nvidia_smi_command(False), text=True,
+                                                          stderr=subprocess.DEVNULL))
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+# Streaming by default (resident); main() switches to a single query
+gpu_monitor = GpuMonitor()
+
+def get_gpu():
+    gpu = gpu_monitor.read()
+    if gpu is None: return ""
+    
+    return label(GPU_LABELS, gpu["usage"])
+
+def get_gpu_detail():
+    # e.g. "gpu 37% mem 1024/8192 MiB 45°C"
+    gpu = gpu_monitor.read()
+    if gpu is None: return ""
+    
+    parts = [f"gpu {gpu['usage']}%"]
+    if gpu["mem_used"] is not None and gpu["mem_total"]:
+        parts.append(f"mem {gpu['mem_used']}/{gpu['mem_total']} MiB")
+    if gpu["temp"] is not None:
+        parts.append(f"{gpu['temp']}°C")
+    return " ".join(parts)
 
 def main():
     if len(sys.argv) < 2:
@@ -94,12 +688,30 @@ def main():
         
     mode = sys.argv[1]
     
-    if mode == "cpu":
+    global cpu_sampler, gpu_monitor
+    if mode in ("cpu", "cpu-detail"):
+        # One-shot: the previous snapshot lives in a tmpfs state file
+        cpu_sampler = CpuSampler(os.path.join(state_dir(), f"polybar-cpu-{os.getuid()}.stat"))
+    elif mode in ("gpu", "gpu-detail"):
+        gpu_monitor = GpuMonitor(stream=False)
+    
+    if mode == "stream":
+        render = get_ram_history if sys.argv[2:3] == ["ram"] else get_cpu_history
+        while True:
+            print(render(), flush=True)
+            time.sleep(2)
+    elif mode == "memory":
+        watch_memory()
+    elif mode == "cpu":
         print(get_cpu())
+    elif mode == "cpu-detail":
+        print(get_cpu_detail())
     elif mode == "ram":
         print(get_ram())
     elif mode == "gpu":
         print(get_gpu())
+    elif mode == "gpu-detail":
+        print(get_gpu_detail())
 
 if __name__ == "__main__":
     main()
@@ -1,78 +1,136 @@
 #!/usr/bin/env python3
 import sys
-import os
+import threading
 
-# Configuration
-THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
-STATE_FILE = "/tmp/polybar_temp_state"
+import fanout
+import gradients
+import sensors
+
+# Temperature for Polybar
+# Resident (polybar-host.py slot 'temperature', or './temperature-dynamic.py
+# stream' with tail = true): reads the sensor every INTERVAL and only emits
+# when the rendered line changes. The shown value follows the sensor with a
+# HYSTERESIS dead band, so a reading wobbling around a colour edge (40°C,
+# 52°C) or an integer boundary doesn't make the module flicker.
+# The click toggle goes to the running process as a fan-out action: the
+# host's 'temperature' slot, or the 'temperature' socket of a standalone
+# stream.
+#
+# Usage: ./temperature-dynamic.py [stream|toggle]   (no argument: print once)
 
-# Colors
-COLOR_CYAN = (0, 188, 212)   # #00BCD4
-COLOR_WHITE = (255, 255, 255) # #FFFFFF
-COLOR_YELLOW = (255, 235, 59) # #FFEB3B
-COLOR_RED = (244, 67, 54)     # #F44336
+FANOUT_NAME = "temperature" # Standalone stream
 
-ICON = ""
+# Configuration
+# Sensors shown (hottest of them), see sensors.py: 'max', a device class
+# ('cpu', 'gpu', 'nvme'...) or sensor ids/patterns ('coretemp/Package id 0').
+# './sensors.py list' shows what this machine has.
+SENSOR = "cpu"
+INTERVAL = 2      # seconds
+HYSTERESIS = 1.0  # °C the reading must move before the display follows
 
-def hex_string(rgb):
-    return "#%02x%02x%02x" % rgb
+# Colors: Cyan (<=40) -> White (<=52) -> Yellow (75) -> Red (90), see gradients.py
+ICON = ""
 
-def interpolate(start_color, end_color, t):
-    r = int(start_color[0] + (end_color[0] - start_color[0]) * t)
-    g = int(start_color[1] + (end_color[1] - start_color[1]) * t)
-    b = int(start_color[2] + (end_color[2] - start_color[2]) * t)
-    return (r, g, b)
+# State
+# Default: Text Hidden (Icon only). Toggle to show text.
+show_text = False
+shown_temp = None  # Value on display (°C), moves by HYSTERESIS steps
+wake = threading.Event()
+reader = None      # sensors.Reader, built on the first read
 
 def get_color(temp):
-    # 0 - 40: Cyan
-    if temp <= 40:
-        return COLOR_CYAN
-    # 41 - 52: White
-    elif temp <= 52:
-        return COLOR_WHITE
-    # 52 - 75: White -> Yellow
-    elif temp <= 75:
-        t = (temp - 52) / (75 - 52)
-        return interpolate(COLOR_WHITE, COLOR_YELLOW, t)
-    # 75 - 90: Yellow -> Red
-    elif temp <= 90:
-        t = (temp - 75) / (90 - 75)
-        return interpolate(COLOR_YELLOW, COLOR_RED, t)
-    # > 90: Red
-    else:
-        return COLOR_RED
+    return gradients.TEMPERATURE(temp)
+
+def toggle(*_):
+    # Host / standalone action
+    global show_text
+    show_text = not show_text
+    wake.set()
+
+def read_temp():
+    global reader
+    if reader is None:
+        index = sensors.load_index()
+        # No sensor of that class on this machine: the hottest one
+        reader = sensors.Reader(sensors.select(index, SENSOR) or sensors.select(index, "max"))
+    return reader.max()
+
+def smooth(temp_c):
+    # Dead band: small moves around the shown value are ignored
+    global shown_temp
+    if shown_temp is None or abs(temp_c - shown_temp) >= HYSTERESIS:
+        shown_temp = temp_c
+    return shown_temp
+
+def render(temp_c):
+    color = get_color(temp_c)
 
-def main():
-    # Handle click script (toggle state)
-    if len(sys.argv) > 1 and sys.argv[1] == "toggle":
-        if os.path.exists(STATE_FILE):
-             os.remove(STATE_FILE)
-        else:
-             open(STATE_FILE, 'w').close()
-        return
-
-    # Read State
-    # Default: Text Hidden (Icon only). Toggle to show text.
-    show_text = os.path.exists(STATE_FILE)
-
-    try:
-        with open(THERMAL_ZONE, 'r') as f:
-            temp_millis = int(f.read().strip())
-            temp_c = temp_millis / 1000.0
-    except:
-        return
-
-    color_rgb = get_color(temp_c)
-    color_hex = hex_string(color_rgb)
-    
     # Construct Output
     # The whole module is clickable via polybar config, so we just output content
-    output = f"%{{F{color_hex}}}{ICON}%{{F-}}"
-    
+    output = f"{color}{ICON}%{{F-}}"
+
     if show_text:
-        output += f" %{{F{color_hex}}}{int(temp_c)}°C%{{F-}}"
-        
-    print(output)
+        output += f" {color}{int(temp_c)}°C%{{F-}}"
+
+    return output
+
+def get_output():
+    temp_c = read_temp()
+    if temp_c is None:
+        return None
+    return render(smooth(temp_c))
+
+def emit(line):
+    # Output hook (polybar-host.py replaces it to publish the line)
+    print(line, flush=True)
+
+def watch():
+    last = None
+    while True:
+        line = get_output()
+        if line is not None and line != last:
+            emit(line)
+            last = line
+        wake.wait(INTERVAL)
+        wake.clear()
+
+def on_action(key, args):
+    # Actions of the standalone stream (same request as the host slot's)
+    if key != "temperature" or args[:1] != ["toggle"]:
+        return "unknown"
+    toggle()
+    return "ok"
+
+def send_toggle():
+    # To the host if it's running, else to a standalone stream
+    for name in ("host", FANOUT_NAME):
+        try:
+            if fanout.action(name, "temperature", "toggle") == "ok":
+                return True
+        except OSError:
+            pass
+    return False
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else None
+
+    # Handle click script (toggle state)
+    if mode == "toggle":
+        return 0 if send_toggle() else 1
+
+    if mode == "stream":
+        # Only the first stream takes clicks (one socket per name)
+        fanout.Server(FANOUT_NAME, on_action=on_action).start()
+        try:
+            watch()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    output = get_output()
+    if output is not None:
+        print(output)
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import select
+import socket
+import sys
+
+# Kernel uevent Listener
+# The kernel broadcasts device events (add/remove/change, e.g. a charger
+# plugged in or a battery capacity update) on a NETLINK_KOBJECT_UEVENT
+# socket. The listener is non-blocking and meant to sit in an event loop
+# (GLib IO watch, select/poll): when its fd is readable, read() drains the
+# pending events of the wanted subsystems.
+#
+# Message format: "ACTION@DEVPATH\0KEY=VALUE\0KEY=VALUE\0..."
+# Messages re-broadcast by udev ("libudev\0" + binary header) are ignored.
+#
+# Any datagram socket can stand in for the netlink one (e.g. one end of a
+# socketpair), so events can be injected without a kernel.
+#
+# Usage: ./uevent.py [subsystem...]   Print events (all subsystems by default)
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1 # Kernel broadcasts (group 2 is udev)
+RECV_SIZE = 16384
+
+def parse(data):
+    # {"ACTION": "change", "DEVPATH": ..., "SUBSYSTEM": ..., ...} or None
+    parts = data.split(b"\0")
+    if b"@" not in parts[0]:
+        return None
+    event = {}
+    for part in parts[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            event[key.decode(errors="replace")] = value.decode(errors="replace")
+    return event
+
+def open_socket():
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC | socket.SOCK_NONBLOCK,
+                         NETLINK_KOBJECT_UEVENT)
+    try:
+        sock.bind((0, KERNEL_GROUP))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+class Listener:
+    def __init__(self, subsystems=(), sock=None):
+        # Raises OSError if netlink isn't available (containers...)
+        self.sock = sock if sock is not None else open_socket()
+        self.sock.setblocking(False)
+        self.subsystems = set(subsystems)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read(self):
+        # All pending events of the wanted subsystems, never blocks
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                break
+            event = parse(data)
+            if event is None:
+                continue
+            if not self.subsystems or event.get("SUBSYSTEM") in self.subsystems:
+                events.append(event)
+        return events
+
+    def close(self):
+        self.sock.close()
+
+if __name__ == "__main__":
+    try:
+        listener = Listener(sys.argv[1:])
+        while True:
+            select.select([listener], [], [])
+            for event in listener.read():
+                print(" ".join(f"{k}={v}" for k, v in event.items()), flush=True)
+    except KeyboardInterrupt:
+        pass
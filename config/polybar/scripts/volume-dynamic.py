@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
-import subprocess
-import re
 import sys
 
+import audio_events
+
 # Dynamic Volume for Polybar
 # Colors:
 # - 0-99%: Normal
 # - 100-149%: Pastel Orange
 # - 150%: Pastel Red
+#
+# Volume and mute come from the shared event router (audio_events.py, one
+# sound server subscription for all the audio scripts): a line per burst of
+# changes on the default sink, no pactl fork here.
 
 COLOR_NORMAL = "" # Inherit
 COLOR_WARN = "%{F#FFC07F}" # Pastel Orange
@@ -15,54 +19,45 @@ COLOR_CRIT = "%{F#FF7A7A}" # Pastel Red
 COLOR_MUTED = "%{F#707880}" # Gray
 COLOR_END = "%{F-}"
 
-def get_volume_info():
-    try:
-        # Get default sink volume
-        # Output format: "Volume: front-left: 65536 / 100% / 0.00 dB,   front-right: 65536 / 100% / 0.00 dB"
-        # We need to find the percentage.
-        
-        # Check Mute first
-        mute_out = subprocess.check_output(["pactl", "get-sink-mute", "@DEFAULT_SINK@"], text=True).strip()
-        if "yes" in mute_out:
-            return f"{COLOR_MUTED}muted{COLOR_END}"
-            
-        vol_out = subprocess.check_output(["pactl", "get-sink-volume", "@DEFAULT_SINK@"], text=True).strip()
-        
-        # Extract percentage (take the first one found, assuming channels match)
-        match = re.search(r"(\d+)%", vol_out)
-        if match:
-            vol = int(match.group(1))
-            
-            # Icon always Turquoise (#00BCD4)
-            icon_str = "%{F#00BCD4}  %{F-}"
-            color = COLOR_NORMAL
-            
-            if vol > 150:
-                color = COLOR_CRIT
-            elif vol > 100:
-                color = COLOR_WARN
-                
-            return f"{icon_str}{color}{vol}%{COLOR_END}"
-            
-        return "N/A"
-    except Exception as e:
-        return "Err"
+def format_volume(vol, muted):
+    if muted:
+        return f"{COLOR_MUTED}muted{COLOR_END}"
+
+    # Icon always Turquoise (#00BCD4)
+    icon_str = "%{F#00BCD4}  %{F-}"
+    color = COLOR_NORMAL
+
+    if vol > 150:
+        color = COLOR_CRIT
+    elif vol > 100:
+        color = COLOR_WARN
+
+    return f"{icon_str}{color}{vol}%{COLOR_END}"
+
+last_line = None
+
+def emit(line):
+    # Output hook (polybar-host.py replaces it to publish the line)
+    print(line, flush=True)
+
+def show(line):
+    global last_line
+    if line != last_line:
+        emit(line)
+        last_line = line
+
+def watch():
+    # Entry point (polybar-host.py slot 'volume')
+    for state in audio_events.subscribe("sink"):
+        volume, _, muted = state.partition(" ")
+        show(format_volume(int(volume), muted == "yes"))
 
 def main():
-    # Initial print
-    print(get_volume_info(), flush=True)
-    
-    # Listen to events
-    process = subprocess.Popen(
-        ["pactl", "subscribe"],
-        stdout=subprocess.PIPE,
-        text=True
-    )
-    
-    for line in process.stdout:
-        # We only care about sink/server changes
-        if "sink" in line or "server" in line:
-            print(get_volume_info(), flush=True)
+    try:
+        watch()
+    except KeyboardInterrupt:
+        pass
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
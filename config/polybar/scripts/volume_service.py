@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+import os
+import sys
+import threading
+import time
+
+import fanout
+
+# Volume Control Service
+# Resident process behind volume.sh (scroll, media keys) and
+# volume-slider.sh. Requests come in on the 'volume' fan-out socket and are
+# only recorded: relative steps add up, a slider value replaces whatever is
+# pending. A worker applies them at most once per FRAME: read the sink, the
+# snap-to-5 steps in memory, one set-volume (and set-mute if needed), one
+# notification updated in place. Fast scrolling therefore stops as soon as
+# the wheel does, instead of draining a queue of scripts.
+#
+# Sound server: native connection (pulse.py), else pactl.
+# Latency (request received -> volume applied) is kept for 'stats'.
+#
+# Usage:
+#   volume_service.py up|down|mute|set N   Send to the service (started if needed)
+#   volume_service.py get                  Current volume
+#   volume_service.py slider               Values from stdin (yad --print-partial)
+#   volume_service.py stats                Requests, frames, server calls, latency
+#   volume_service.py serve                Run the service
+
+FANOUT_NAME = "volume"
+STEP = 5           # %, volume snaps to multiples of it
+MAX_VOLUME = 200   # %
+FRAME = 0.02       # s, at most one apply per frame
+IDLE_CHECK = 60    # s without requests between checks that the session is still there
+START_TIMEOUT = 1  # s waiting for a service started on demand
+LATENCY_SAMPLES = 256
+
+NOTIFY_APP = "Volume"
+NOTIFY_TIMEOUT = 2500 # ms
+
+# Pending mute operation: None, "toggle", "on" or "off"
+MUTE_AFTER_TOGGLE = {None: "toggle", "toggle": None, "on": "off", "off": "on"}
+
+def snap_up(vol):
+    # Next multiple of STEP
+    return min((vol // STEP + 1) * STEP, MAX_VOLUME)
+
+def snap_down(vol):
+    # Previous multiple of STEP
+    return max((vol - 1) // STEP * STEP, 0)
+
+# pulse, notify, subprocess and re are imported on first use: the client
+# side (one process per scroll tick) only needs fanout.
+
+class NativeBackend:
+    def __init__(self):
+        import pulse
+        self.conn = pulse.Connection(name="polybar-volume-service")
+        self.sink = None
+
+    def get(self):
+        self.sink = self.conn.sink()
+        return self.sink.volume, self.sink.muted
+
+    def set_volume(self, volume):
+        self.conn.set_sink_volume(self.sink, volume)
+
+    def set_mute(self, muted):
+        self.conn.set_sink_mute(self.sink, muted)
+
+    def close(self):
+        self.conn.close()
+
+class PactlBackend:
+    def _pactl(self, *args):
+        import subprocess
+        return subprocess.check_output(["pactl", *args], text=True).strip()
+
+    def get(self):
+        import re
+        muted = "yes" in self._pactl("get-sink-mute", "@DEFAULT_SINK@")
+        match = re.search(r"(\d+)%", self._pactl("get-sink-volume", "@DEFAULT_SINK@"))
+        return (int(match.group(1)) if match else 0), muted
+
+    def set_volume(self, volume):
+        self._pactl("set-sink-volume", "@DEFAULT_SINK@", f"{volume}%")
+
+    def set_mute(self, muted):
+        self._pactl("set-sink-mute", "@DEFAULT_SINK@", "1" if muted else "0")
+
+    def close(self):
+        pass
+
+def open_backend():
+    try:
+        return NativeBackend()
+    except Exception:
+        return PactlBackend()
+
+def notification_args(volume, muted):
+    # Same bubble as the old volume.sh (icon by level, progress bar)
+    if muted:
+        return "Muted", "audio-volume-muted"
+    if volume < 30:
+        icon = "audio-volume-low"
+    elif volume < 70:
+        icon = "audio-volume-medium"
+    else:
+        icon = "audio-volume-high"
+    return f"Volume: {volume}%", icon
+
+class Service:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.backend = None
+        self.notification = None
+        # Pending
+        self.target = None  # Absolute volume (slider)
+        self.steps = 0      # Relative snap steps, + up / - down
+        self.mute = None    # See MUTE_AFTER_TOGGLE
+        self.notify = False
+        self.received = []  # Arrival times of the pending requests
+        # Stats
+        self.requests = 0
+        self.frames = 0
+        self.calls = 0
+        self.latencies = []
+
+    def on_action(self, verb, args):
+        with self.lock:
+            if verb == "up":
+                self.steps += 1
+                self.mute = "off" # Scrolling up unmutes
+                self.notify = True
+            elif verb == "down":
+                self.steps -= 1
+                self.notify = True
+            elif verb == "mute":
+                self.mute = MUTE_AFTER_TOGGLE[self.mute]
+                self.notify = True
+            elif verb == "set" and args and args[0].isdigit():
+                self.target = min(int(args[0]), MAX_VOLUME)
+                self.steps = 0
+            elif verb == "get":
+                return self.current()
+            elif verb == "stats":
+                return self.stats()
+            else:
+                return "unknown"
+            self.requests += 1
+            self.received.append(time.monotonic())
+        self.wake.set()
+        return "ok"
+
+    def current(self):
+        # Called with the lock held
+        try:
+            return str(self._backend().get()[0])
+        except Exception:
+            self._drop_backend()
+            return ""
+
+    def _backend(self):
+        if self.backend is None:
+            self.backend = open_backend()
+        return self.backend
+
+    def _drop_backend(self):
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = None
+
+    def apply(self):
+        with self.lock:
+            target, steps, mute, notify, received = self.target, self.steps, self.mute, self.notify, self.received
+            self.target, self.steps, self.mute, self.notify, self.received = None, 0, None, False, []
+            if not received:
+                return
+            try:
+                backend = self._backend()
+                volume, muted = backend.get()
+                new_volume = volume if target is None else target
+                for _ in range(abs(steps)):
+                    new_volume = snap_up(new_volume) if steps > 0 else snap_down(new_volume)
+                new_muted = {None: muted, "toggle": not muted, "on": True, "off": False}[mute]
+                if new_volume != volume:
+                    backend.set_volume(new_volume)
+                    self.calls += 1
+                if new_muted != muted:
+                    backend.set_mute(new_muted)
+                    self.calls += 1
+            except Exception:
+                self._drop_backend() # Reconnect on the next request
+                return
+            done = time.monotonic()
+            self.frames += 1
+            self.latencies = (self.latencies + [done - t for t in received])[-LATENCY_SAMPLES:]
+
+        if notify:
+            self.show(new_volume, new_muted)
+
+    def show(self, volume, muted):
+        import notify
+        summary, icon = notification_args(volume, muted)
+        kwargs = dict(icon=icon, app=NOTIFY_APP, urgency="low", timeout=NOTIFY_TIMEOUT, progress=volume)
+        if self.notification is None:
+            self.notification = notify.send(summary, **kwargs)
+        else:
+            self.notification = self.notification.update(summary, **kwargs)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        if lat:
+            timing = f"latency p50 {lat[len(lat) // 2] * 1000:.1f} ms max {lat[-1] * 1000:.1f} ms"
+        else:
+            timing = "latency -"
+        return f"requests {self.requests} frames {self.frames} calls {self.calls} {timing}"
+
+    def run(self, alive):
+        while True:
+            if not self.wake.wait(IDLE_CHECK):
+                if not alive():
+                    return
+                continue
+            self.wake.clear()
+            self.apply()
+            time.sleep(FRAME) # Whatever arrives meanwhile goes in the next frame
+
+def serve():
+    service = Service()
+    server = fanout.Server(FANOUT_NAME, on_action=service.on_action)
+    if not server.start():
+        return 1 # Already running
+    # The runtime dir (and the socket in it) goes away at logout
+    service.run(lambda: os.path.exists(server.path))
+    return 0
+
+# --- Client ---
+
+def start_service():
+    import subprocess
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve"], start_new_session=True,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def send(verb, *args):
+    # Reply of the service, starting it on the first failure
+    deadline = None
+    while True:
+        try:
+            return fanout.action(FANOUT_NAME, verb, *args)
+        except OSError:
+            if deadline is None:
+                start_service()
+                deadline = time.monotonic() + START_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise
+            time.sleep(0.02)
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print("usage: volume_service.py up|down|mute|set N|get|slider|stats|serve", file=sys.stderr)
+        return 1
+    try:
+        if args[0] == "serve":
+            return serve()
+        if args[0] == "slider":
+            for line in sys.stdin:
+                value = line.strip().split(".")[0] # yad may print decimals
+                if value.isdigit():
+                    send("set", value)
+            return 0
+        reply = send(*args)
+    except OSError as e:
+        print(f"volume_service: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    if args[0] in ("get", "stats"):
+        print(reply)
+    return 0 if reply not in ("unknown", "") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())